@@ -35,6 +35,15 @@ CALIBRATION_FILE = BASE_DIR / "data" / "last_calibration.json"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 (BASE_DIR / "data").mkdir(parents=True, exist_ok=True)
 
+# Live reconstruction needs the JScaner core modules (not shipped with the standalone scanner)
+sys.path.insert(0, str(BASE_DIR / "src"))
+try:
+    from core.reconstruction import StereoReconstructor
+    from core.streaming import StreamingReconstruction
+    HAS_LIVE_RECONSTRUCTION = True
+except ImportError:
+    HAS_LIVE_RECONSTRUCTION = False
+
 
 class KinectScanner:
     """Kinect v1 Scanner - Captures and exports 3D scan images."""
@@ -56,6 +65,8 @@ class KinectScanner:
         self.calibration = self._load_calibration()
         self.frame_count = 0
         self.captured_images: List[Dict[str, str]] = []
+        # Live reconstruction fed by capture_frame (see start_live_reconstruction)
+        self.streaming = None
         
         print(f"[KinectScanner] Initializing with camera ID: {camera_id}")
         print(f"[KinectScanner] Output directory: {self.output_dir}")
@@ -165,6 +176,8 @@ class KinectScanner:
             })
             
             print(f"[CAPTURED] {frame_name}.jpg ({image_path.stat().st_size // 1024} KB)")
+            if self.streaming is not None and self.streaming.is_running and not self.streaming.submit(frame):
+                print("[LIVE] Reconstruction is behind, frame not added to the live cloud")
             return (str(image_path), str(metadata_path))
             
         except Exception as e:
@@ -195,6 +208,8 @@ class KinectScanner:
             if result:
                 results.append(result)
                 remaining = count - i - 1
+                if self.streaming is not None and self.streaming.is_running:
+                    print(f"[LIVE] {self.live_status()}")
                 if remaining > 0:
                     print(f"[SEQUENCE] {remaining} frames remaining...")
                     time.sleep(interval)
@@ -202,6 +217,44 @@ class KinectScanner:
         print(f"[SEQUENCE] Completed: {len(results)} frames captured\n")
         return results
     
+    def start_live_reconstruction(self) -> bool:
+        """
+        Reconstruct captured frames on a background worker while capturing.
+        
+        Returns:
+            True if live reconstruction is running
+        """
+        if not HAS_LIVE_RECONSTRUCTION:
+            print("[ERROR] Live reconstruction needs the JScaner src/core modules")
+            return False
+        if self.calibration is None:
+            print("[ERROR] Live reconstruction needs a calibration (data/last_calibration.json)")
+            return False
+        
+        if self.streaming is None:
+            reconstructor = StereoReconstructor(feature_backend="orb")
+            reconstructor.load_calibration(self.calibration)
+            self.streaming = StreamingReconstruction(reconstructor)
+        self.streaming.start()
+        print("[LIVE] Live reconstruction started")
+        return True
+    
+    def stop_live_reconstruction(self):
+        """Finish the queued frames and stop live reconstruction."""
+        if self.streaming is None:
+            return
+        points = self.streaming.stop()
+        print(f"[LIVE] Stopped: {self.live_status()}")
+        print(f"[LIVE] {len(points)} sparse points")
+    
+    def live_status(self) -> str:
+        """One-line summary of the live reconstruction."""
+        if self.streaming is None:
+            return "live reconstruction off"
+        status = self.streaming.status()
+        return (f"{status['registered']}/{status['frames']} frames registered, {status['points']} points, "
+                f"{status['coverage']:.0%} coverage - {status['message']}")
+    
     def get_camera_info(self) -> Dict:
         """Get camera information and properties."""
         if not self.cap:
@@ -262,6 +315,7 @@ def print_help():
     print("  a <count>  - Auto-capture sequence (default: 20 frames)")
     print("  i          - Show camera info")
     print("  s          - Save manifest file")
+    print("  l          - Toggle live reconstruction / show its status")
     print("  q          - Quit")
     print("")
 
@@ -344,12 +398,22 @@ def main():
                     print(f"  {key}: {value}")
                 print()
             
+            elif cmd == 'l':
+                if scanner.streaming is not None and scanner.streaming.is_running:
+                    if arg == 'stop':
+                        scanner.stop_live_reconstruction()
+                    else:
+                        print(f"[LIVE] {scanner.live_status()} ('l stop' to stop)")
+                else:
+                    scanner.start_live_reconstruction()
+            
             elif cmd == 's':
                 scanner.export_manifest()
                 print(f"[INFO] {scanner.get_captured_count()} images ready for processing\n")
             
             elif cmd == 'q':
                 print("\n[SHUTDOWN] Saving manifest and exiting...")
+                scanner.stop_live_reconstruction()
                 if scanner.captured_images:
                     scanner.export_manifest()
                 scanner.disconnect()
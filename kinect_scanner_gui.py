@@ -44,6 +44,15 @@ CALIBRATION_FILE = BASE_DIR / "data" / "last_calibration.json"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 (BASE_DIR / "data").mkdir(parents=True, exist_ok=True)
 
+# Live reconstruction needs the JScaner core modules (not shipped with the standalone scanner)
+sys.path.insert(0, str(BASE_DIR / "src"))
+try:
+    from core.reconstruction import StereoReconstructor
+    from core.streaming import StreamingReconstruction
+    HAS_LIVE_RECONSTRUCTION = True
+except ImportError:
+    HAS_LIVE_RECONSTRUCTION = False
+
 
 class CameraDetector:
     """Detect and enumerate available cameras."""
@@ -135,6 +144,8 @@ class KinectScannerGUI:
         self.batch_interval = 1.0
         self.is_batch_capturing = False
         self.calibration = self._load_calibration()
+        # Live reconstruction of captured frames (toggled from the GUI)
+        self.streaming = None
         
         # UI Variables
         self.status_var = StringVar(value="Ready")
@@ -285,6 +296,20 @@ class KinectScannerGUI:
         stop_batch_button.pack(fill=X, pady=5)
         self.stop_batch_button = stop_batch_button
         
+        live_button = Button(
+            left_panel,
+            text="🧊 Start Live Reconstruction",
+            command=self._toggle_live_reconstruction,
+            font=("Arial", 10, "bold"),
+            bg="#607D8B",
+            fg="white",
+            padx=15,
+            pady=8,
+            state="normal" if HAS_LIVE_RECONSTRUCTION and self.calibration else "disabled"
+        )
+        live_button.pack(fill=X, pady=5)
+        self.live_button = live_button
+        
         # Middle panel: Status and stats
         middle_panel = Frame(control_frame)
         middle_panel.pack(side=LEFT, fill=BOTH, expand=True, padx=5)
@@ -304,6 +329,12 @@ class KinectScannerGUI:
         count_display = Label(count_frame, textvariable=self.capture_count_var, font=("Arial", 10, "bold"), fg="blue")
         count_display.pack(side=LEFT, padx=5)
         
+        live_frame = Frame(middle_panel)
+        live_frame.pack(fill=X, pady=5)
+        Label(live_frame, text="Live Reconstruction:", font=("Arial", 10, "bold")).pack(side=LEFT, padx=5)
+        self.live_status_var = StringVar(value="off")
+        Label(live_frame, textvariable=self.live_status_var, font=("Arial", 10), fg="purple").pack(side=LEFT, padx=5)
+        
         # Right panel: Utility buttons
         right_panel = Frame(control_frame)
         right_panel.pack(side=RIGHT, fill=BOTH, expand=True, padx=5)
@@ -445,6 +476,20 @@ class KinectScannerGUI:
                             2
                         )
                     
+                    if self.streaming is not None and self.streaming.is_running:
+                        live = self.streaming.status()
+                        cv2.putText(
+                            display_frame,
+                            f"Points: {live['points']}  Coverage: {live['coverage']:.0%}",
+                            (10, 110),
+                            cv2.FONT_HERSHEY_SIMPLEX,
+                            0.8,
+                            (255, 0, 255),
+                            2
+                        )
+                        self.live_status_var.set(f"{live['registered']}/{live['frames']} frames, "
+                                                 f"{live['points']} points, {live['coverage']:.0%} coverage")
+                    
                     # Convert for tkinter
                     frame_rgb = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB)
                     pil_image = Image.fromarray(frame_rgb)
@@ -474,6 +519,7 @@ class KinectScannerGUI:
             filepath = self.output_dir / filename
             
             cv2.imwrite(str(filepath), frame)
+            self._submit_live(frame)
             self.captured_count += 1
             self.capture_count_var.set(str(self.captured_count))
             self._update_status(f"✓ Captured: {filename}")
@@ -523,6 +569,7 @@ class KinectScannerGUI:
                     filepath = self.output_dir / filename
                     
                     cv2.imwrite(str(filepath), frame)
+                    self._submit_live(frame)
                     self.captured_count += 1
                     self.batch_count = i + 1
                     self.capture_count_var.set(str(self.captured_count))
@@ -548,6 +595,38 @@ class KinectScannerGUI:
         self.is_batch_capturing = False
         self._update_status("Batch capture stopped")
     
+    def _toggle_live_reconstruction(self):
+        """Start or stop reconstructing captured frames on a background worker."""
+        if self.streaming is not None and self.streaming.is_running:
+            self.live_button.config(state="disabled")
+            self._update_status("Finishing live reconstruction...")
+            threading.Thread(target=self._stop_live_worker, daemon=True).start()
+            return
+        
+        try:
+            if self.streaming is None:
+                reconstructor = StereoReconstructor(feature_backend="orb")
+                reconstructor.load_calibration(self.calibration)
+                self.streaming = StreamingReconstruction(reconstructor)
+            self.streaming.start()
+            self.live_button.config(text="⏹ Stop Live Reconstruction")
+            self.live_status_var.set("waiting for frames")
+            self._update_status("✓ Live reconstruction started")
+        except Exception as e:
+            messagebox.showerror("Live Reconstruction Error", str(e))
+    
+    def _stop_live_worker(self):
+        """Drain the live reconstruction queue without blocking the GUI."""
+        points = self.streaming.stop()
+        self.live_button.config(text="🧊 Start Live Reconstruction", state="normal")
+        self._update_status(f"✓ Live reconstruction stopped: {len(points)} points")
+    
+    def _submit_live(self, frame):
+        """Hand a captured frame to the live reconstruction, if running."""
+        if self.streaming is not None and self.streaming.is_running:
+            if not self.streaming.submit(frame):
+                print("[LIVE] Reconstruction is behind, frame not added to the live cloud")
+    
     def _export_manifest(self):
         """Export manifest of captured images."""
         try:
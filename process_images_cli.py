@@ -17,6 +17,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from core.grid_calibration import GridDetector
 from core.reconstruction import StereoReconstructor
+from core.feature_cache import FeatureStore
 from core.stl_export import STLExporter
 
 class ImageProcessor:
@@ -28,7 +29,10 @@ class ImageProcessor:
         self.images = []
         self.metadata = []
         self.grid_detector = GridDetector()
-        self.reconstructor = StereoReconstructor()
+        # Persist features next to the images so re-runs skip detection,
+        # and extract features on all cores
+        self.reconstructor = StereoReconstructor(feature_store=FeatureStore(cache_dir=captured_dir),
+                                                 n_workers=os.cpu_count() or 1)
         self.stl_exporter = STLExporter()
         self.calibration_data = None
         
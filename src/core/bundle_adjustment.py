@@ -0,0 +1,249 @@
+"""
+Bundle Adjustment Module
+
+Jointly refines camera poses and 3D points by minimising reprojection error
+with SciPy's trust-region least squares. The Jacobian sparsity pattern is
+passed explicitly so finite differencing and the LSMR solver only touch the
+non-zero blocks, which keeps hundreds of views and tens of thousands of
+points tractable on a CPU.
+"""
+
+import time
+import numpy as np
+from typing import Dict, Optional, Tuple
+from scipy.optimize import least_squares
+from scipy.sparse import coo_matrix
+import cv2
+
+
+class _BudgetExceeded(Exception):
+    """Raised from the residual function when the time budget runs out."""
+
+
+def _rotate(points: np.ndarray, rvecs: np.ndarray) -> np.ndarray:
+    """Rotate points by axis-angle vectors (Rodrigues formula, one vector per point)."""
+    theta = np.linalg.norm(rvecs, axis=1)[:, np.newaxis]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        axis = np.nan_to_num(rvecs / theta)
+    dot = np.sum(points * axis, axis=1)[:, np.newaxis]
+    cos_theta = np.cos(theta)
+    sin_theta = np.sin(theta)
+    return cos_theta * points + sin_theta * np.cross(axis, points) + dot * (1 - cos_theta) * axis
+
+
+class BundleAdjuster:
+    """Sparse bundle adjustment of camera poses and 3D points."""
+
+    def __init__(self, max_evaluations: int = 50, time_budget: Optional[float] = 120.0,
+                 loss: str = "huber", f_scale: float = 2.0, ftol: float = 1e-6):
+        """
+        Initialize bundle adjuster.
+
+        Args:
+            max_evaluations: Maximum number of cost evaluations by the solver (SciPy's max_nfev;
+                the calls that build the finite-difference Jacobian are not counted)
+            time_budget: Wall-clock limit in seconds (None for no limit)
+            loss: Robust loss passed to scipy least_squares ('linear', 'huber', 'soft_l1', ...)
+            f_scale: Inlier scale of the robust loss in pixels
+            ftol: Relative cost change at which the solver stops
+        """
+        self.max_evaluations = max_evaluations
+        self.time_budget = time_budget
+        self.loss = loss
+        self.f_scale = f_scale
+        self.ftol = ftol
+
+    def adjust(self, camera_matrix: np.ndarray, poses: Dict[int, Tuple[np.ndarray, np.ndarray]],
+               points: np.ndarray, obs_views: np.ndarray, obs_points: np.ndarray,
+               obs_xy: np.ndarray, fixed_views: Optional[list] = None,
+               turntable_axis: Optional[Tuple[np.ndarray, np.ndarray]] = None
+               ) -> Tuple[Dict[int, Tuple[np.ndarray, np.ndarray]], np.ndarray, Dict]:
+        """
+        Refine poses and points.
+
+        Args:
+            camera_matrix: 3x3 camera intrinsic matrix
+            poses: World-to-camera (R, t) for each view index
+            points: (P, 3) world points
+            obs_views: View index of each observation
+            obs_points: Point index of each observation
+            obs_xy: (K, 2) observed pixel coordinates
+            fixed_views: Views whose pose is held constant (default: the first view, to fix the gauge)
+            turntable_axis: Optional (axis direction, point on the axis) that every free pose rotates
+                about; each free view is then refined by its angle alone instead of a 6-DOF pose, and
+                the axis by its tilt and sideways position (the report holds the refined pair)
+
+        Returns:
+            Tuple of (refined poses, refined points, report dictionary). The report counts
+            'evaluations' (cost evaluations, bounded by max_evaluations), 'iterations'
+            (Jacobian evaluations, one per accepted trust-region step) and 'residual_calls'
+            (every call including Jacobian differencing); the first two are None when the
+            time budget stopped the solver
+        """
+        views = sorted(poses)
+        if fixed_views is None:
+            fixed_views = views[:1]
+        free_views = [v for v in views if v not in fixed_views]
+
+        # Per-view pose parameters (rvec, t) and the slot each view's pose lives in
+        view_slot = {v: i for i, v in enumerate(views)}
+        camera_params = np.zeros((len(views), 6))
+        for v, (R, t) in poses.items():
+            camera_params[view_slot[v], :3] = cv2.Rodrigues(np.asarray(R, np.float64))[0].ravel()
+            camera_params[view_slot[v], 3:] = np.asarray(t, np.float64).ravel()
+
+        obs_slots = np.array([view_slot[v] for v in obs_views], dtype=np.int64) if len(obs_views) else np.empty(0, np.int64)
+        obs_points = np.asarray(obs_points, dtype=np.int64)
+        obs_xy = np.asarray(obs_xy, dtype=np.float64)
+        free_mask = np.zeros(len(views), dtype=bool)
+        free_mask[[view_slot[v] for v in free_views]] = True
+        free_slots = np.flatnonzero(free_mask)
+        n_free = len(free_slots)
+        n_points = len(points)
+
+        # Turntable poses R = Rot(axis, angle), t = c - R c: one angle per free view, plus three
+        # shared parameters tilting the axis and moving it sideways (its distance sets the scale)
+        pose_size, shared_size = 6, 0
+        free_params = camera_params[free_slots].ravel()
+        if turntable_axis is not None:
+            axis0 = np.asarray(turntable_axis[0], np.float64).ravel()
+            axis0 = axis0 / np.linalg.norm(axis0)
+            center0 = np.asarray(turntable_axis[1], np.float64).ravel()
+            center0 = center0 - (center0 @ axis0) * axis0
+            radius = np.linalg.norm(center0)
+            tilt = np.linalg.svd(axis0[np.newaxis])[2][1:]
+            sideways = np.cross(axis0, center0) / max(radius, 1e-12)
+            pose_size, shared_size = 1, 3
+            free_params = np.append(camera_params[free_slots, :3] @ axis0, np.zeros(shared_size))
+
+        def turntable(shared):
+            axis = axis0 + shared[:2] @ tilt
+            axis /= np.linalg.norm(axis)
+            center = center0 + shared[2] * sideways
+            center -= (center @ axis) * axis
+            return axis, center * radius / max(np.linalg.norm(center), 1e-12)
+
+        fx, fy = camera_matrix[0, 0], camera_matrix[1, 1]
+        cx, cy = camera_matrix[0, 2], camera_matrix[1, 2]
+
+        def unpack(x):
+            cams = camera_params.copy()
+            if turntable_axis is None:
+                cams[free_slots] = x[:n_free * 6].reshape(n_free, 6)
+            else:
+                axis, center = turntable(x[n_free:n_free + shared_size])
+                rvecs = np.outer(x[:n_free], axis)
+                cams[free_slots, :3] = rvecs
+                cams[free_slots, 3:] = center - _rotate(np.tile(center, (n_free, 1)), rvecs)
+            return cams, x[n_free * pose_size + shared_size:].reshape(n_points, 3)
+
+        def project(cams, pts):
+            cam = cams[obs_slots]
+            p = _rotate(pts[obs_points], cam[:, :3]) + cam[:, 3:]
+            z = p[:, 2]
+            z = np.where(np.abs(z) < 1e-12, 1e-12, z)
+            return np.column_stack([fx * p[:, 0] / z + cx, fy * p[:, 1] / z + cy])
+
+        x0 = np.hstack([free_params, np.asarray(points, np.float64).ravel()])
+        initial = (project(camera_params, np.asarray(points, np.float64)) - obs_xy).ravel()
+        report = {
+            'views': len(views),
+            'points': n_points,
+            'observations': len(obs_xy),
+            'initial_rms': float(np.sqrt(np.mean(initial ** 2))) if len(initial) else 0.0
+        }
+
+        start = time.perf_counter()
+        best = {'cost': 0.5 * float(initial @ initial), 'x': x0, 'calls': 0}
+
+        def residuals(x):
+            best['calls'] += 1
+            cams, pts = unpack(x)
+            r = (project(cams, pts) - obs_xy).ravel()
+            cost = 0.5 * float(r @ r)
+            if cost < best['cost']:
+                best['cost'] = cost
+                best['x'] = x.copy()
+            if self.time_budget is not None and time.perf_counter() - start > self.time_budget:
+                raise _BudgetExceeded()
+            return r
+
+        if len(obs_xy) == 0:
+            report.update(final_rms=0.0, iterations=0, evaluations=0, residual_calls=0, time=0.0,
+                          stopped_by='no_observations')
+            return poses, points, report
+
+        try:
+            result = least_squares(
+                residuals, x0, jac_sparsity=self._sparsity(obs_slots, obs_points, free_mask, n_points,
+                                                               pose_size, shared_size),
+                method='trf', x_scale='jac', tr_solver='lsmr', loss=self.loss, f_scale=self.f_scale,
+                ftol=self.ftol, max_nfev=self.max_evaluations
+            )
+            x = result.x
+            iterations, evaluations = int(result.njev), int(result.nfev)
+            stopped_by = 'converged' if result.status > 0 else 'max_evaluations'
+        except _BudgetExceeded:
+            # Keep the lowest-cost parameters evaluated before the budget ran out
+            x = best['x']
+            iterations = evaluations = None
+            stopped_by = 'time_budget'
+
+        cams, refined_points = unpack(x)
+        final = (project(cams, refined_points) - obs_xy).ravel()
+        report.update(final_rms=float(np.sqrt(np.mean(final ** 2))), iterations=iterations,
+                      evaluations=evaluations, residual_calls=best['calls'],
+                      time=time.perf_counter() - start, stopped_by=stopped_by)
+
+        if turntable_axis is not None:
+            report['turntable_axis'] = turntable(x[n_free:n_free + shared_size])
+
+        refined_poses = {}
+        for v in views:
+            params = cams[view_slot[v]]
+            refined_poses[v] = (cv2.Rodrigues(params[:3].reshape(3, 1))[0], params[3:].reshape(3, 1))
+        return refined_poses, refined_points, report
+
+    @staticmethod
+    def _sparsity(obs_slots: np.ndarray, obs_points: np.ndarray, free_mask: np.ndarray,
+                  n_points: int, pose_size: int = 6, shared_size: int = 0) -> coo_matrix:
+        """
+        Build the Jacobian sparsity pattern: each residual depends on one pose and one point,
+        and residuals of free views also on the shared parameters.
+        """
+        n_obs = len(obs_slots)
+        free_index = np.cumsum(free_mask) - 1
+        n_free = int(free_mask.sum())
+
+        rows = []
+        cols = []
+        obs = np.arange(n_obs)
+
+        # Pose blocks (only for views that are being optimised)
+        has_pose = free_mask[obs_slots]
+        pose_obs = obs[has_pose]
+        pose_cols = free_index[obs_slots[has_pose]] * pose_size
+        for axis in range(2):
+            for k in range(pose_size):
+                rows.append(2 * pose_obs + axis)
+                cols.append(pose_cols + k)
+            for k in range(shared_size):
+                rows.append(2 * pose_obs + axis)
+                cols.append(np.full(len(pose_obs), n_free * pose_size + k))
+
+        # Point blocks
+        for axis in range(2):
+            for k in range(3):
+                rows.append(2 * obs + axis)
+                cols.append(n_free * pose_size + shared_size + obs_points * 3 + k)
+
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        return coo_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)),
+                          shape=(2 * n_obs, n_free * pose_size + shared_size + n_points * 3))
+
+    def summary(self, report: Dict) -> str:
+        """Human-readable summary of a bundle adjustment report."""
+        return (f"{report['views']} views, {report['points']} points, {report['observations']} observations: "
+                f"RMS {report['initial_rms']:.3f}px -> {report['final_rms']:.3f}px "
+                f"in {report['time']:.1f}s ({report['stopped_by']})")
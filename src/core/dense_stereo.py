@@ -0,0 +1,153 @@
+"""
+Dense Stereo Module
+
+Turns posed image pairs into dense point clouds: each pair is rectified with
+the camera calibration, disparities are computed with semi-global block
+matching (SGBM) on overlapping horizontal tiles in a thread pool, and the
+disparity map is reprojected to 3D. OpenCV releases the GIL inside SGBM, so
+the tiles run on all cores without process overhead.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class DenseStereo:
+    """Rectified SGBM stereo on posed image pairs."""
+
+    def __init__(self, num_disparities: int = 128, block_size: int = 5, min_disparity: int = 0,
+                 tile_rows: int = 4, overlap: int = 32, n_threads: Optional[int] = None,
+                 stride: int = 2):
+        """
+        Initialize dense stereo.
+
+        Args:
+            num_disparities: Disparity search range in pixels (rounded up to a multiple of 16)
+            block_size: SGBM matching block size (odd)
+            min_disparity: Smallest disparity searched
+            tile_rows: Number of horizontal tiles each rectified pair is split into
+            overlap: Rows shared by neighbouring tiles, discarded when stitching
+            n_threads: Worker threads for the tiles (default: all cores)
+            stride: Keep every stride-th pixel in each direction when reprojecting
+        """
+        self.num_disparities = int(np.ceil(num_disparities / 16) * 16)
+        self.block_size = block_size
+        self.min_disparity = min_disparity
+        self.tile_rows = max(1, tile_rows)
+        self.overlap = overlap
+        self.n_threads = n_threads or os.cpu_count() or 1
+        self.stride = max(1, stride)
+
+    def _create_matcher(self, channels: int):
+        """Create an SGBM matcher (one per tile, matchers are not shared between threads)."""
+        return cv2.StereoSGBM_create(
+            minDisparity=self.min_disparity,
+            numDisparities=self.num_disparities,
+            blockSize=self.block_size,
+            P1=8 * channels * self.block_size ** 2,
+            P2=32 * channels * self.block_size ** 2,
+            disp12MaxDiff=1,
+            uniquenessRatio=10,
+            speckleWindowSize=100,
+            speckleRange=2,
+            mode=cv2.STEREO_SGBM_MODE_SGBM_3WAY
+        )
+
+    def compute_disparity(self, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        """
+        Compute the disparity map of a rectified pair tile by tile.
+
+        Args:
+            left: Rectified left image
+            right: Rectified right image
+
+        Returns:
+            Float32 disparity map in pixels (values below min_disparity are invalid)
+        """
+        height = left.shape[0]
+        channels = left.shape[2] if left.ndim == 3 else 1
+        bounds = np.linspace(0, height, self.tile_rows + 1).astype(int)
+
+        def run(tile):
+            top, bottom = bounds[tile], bounds[tile + 1]
+            # Compute an enlarged band so block aggregation near the seams sees real context
+            start, end = max(0, top - self.overlap), min(height, bottom + self.overlap)
+            disparity = self._create_matcher(channels).compute(left[start:end], right[start:end])
+            return disparity[top - start:bottom - start]
+
+        if self.tile_rows == 1 or self.n_threads == 1:
+            tiles = [run(tile) for tile in range(self.tile_rows)]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.n_threads, self.tile_rows)) as executor:
+                tiles = list(executor.map(run, range(self.tile_rows)))
+
+        # SGBM returns fixed-point disparities with 4 fractional bits
+        return np.vstack(tiles).astype(np.float32) / 16.0
+
+    def reconstruct_pair(self, image1: np.ndarray, image2: np.ndarray, camera_matrix: np.ndarray,
+                         distortion_coefficients: Optional[np.ndarray], R: np.ndarray,
+                         t: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Dense points of a posed pair, in the first camera's frame.
+
+        Args:
+            image1: First image
+            image2: Second image
+            camera_matrix: 3x3 camera intrinsic matrix
+            distortion_coefficients: Lens distortion coefficients (None for no distortion)
+            R: Rotation from the first to the second camera
+            t: Translation from the first to the second camera
+
+        Returns:
+            Tuple of ((N, 3) points, (N, 3) uint8 BGR colours); empty if the pair cannot be rectified
+        """
+        R = np.asarray(R, dtype=np.float64)
+        t = np.asarray(t, dtype=np.float64).reshape(3, 1)
+        empty = (np.empty((0, 3)), np.empty((0, 3), dtype=np.uint8))
+
+        # Horizontal rectification needs a mostly sideways baseline
+        if abs(t[0, 0]) < max(abs(t[1, 0]), abs(t[2, 0])):
+            return empty
+
+        # The left camera of a rectified pair sees the other one at negative x
+        swapped = t[0, 0] > 0
+        if swapped:
+            image1, image2 = image2, image1
+            R, t = R.T, -R.T @ t
+
+        camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        size = (image1.shape[1], image1.shape[0])
+        R1, R2, P1, P2, Q, _, _ = cv2.stereoRectify(camera_matrix, distortion_coefficients,
+                                                    camera_matrix, distortion_coefficients,
+                                                    size, R, t, flags=cv2.CALIB_ZERO_DISPARITY, alpha=0)
+        map1 = cv2.initUndistortRectifyMap(camera_matrix, distortion_coefficients, R1, P1, size, cv2.CV_16SC2)
+        map2 = cv2.initUndistortRectifyMap(camera_matrix, distortion_coefficients, R2, P2, size, cv2.CV_16SC2)
+        left = cv2.remap(image1, *map1, cv2.INTER_LINEAR)
+        right = cv2.remap(image2, *map2, cv2.INTER_LINEAR)
+
+        disparity = self.compute_disparity(left, right)
+        disparity = disparity[::self.stride, ::self.stride]
+        valid = disparity > self.min_disparity
+
+        # Reproject sampled pixels with Q: [x y d 1] -> homogeneous rectified-frame point
+        rows, cols = np.nonzero(valid)
+        pixels = np.column_stack([cols * self.stride, rows * self.stride, disparity[valid],
+                                  np.ones(len(rows))])
+        homogeneous = pixels @ Q.T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            points = homogeneous[:, :3] / homogeneous[:, 3:]
+        finite = np.all(np.isfinite(points), axis=1) & (points[:, 2] > 0)
+        points = points[finite]
+        colors = left[::self.stride, ::self.stride][valid][finite]
+        if colors.ndim == 1:
+            colors = np.repeat(colors[:, np.newaxis], 3, axis=1)
+
+        # Rectified left frame -> left camera -> first camera
+        points = points @ R1
+        if swapped:
+            points = points @ R.T + t.ravel()
+        return points, colors
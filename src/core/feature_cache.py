@@ -0,0 +1,113 @@
+"""
+Feature Cache Module
+
+Stores detected keypoints and descriptors keyed by image content so that each
+image only goes through feature detection once, even when it takes part in
+several image pairs or when a session is reconstructed again.
+"""
+
+import os
+import hashlib
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from .features import Features
+
+
+def image_key(image: np.ndarray, detector: str = "sift") -> str:
+    """
+    Build a cache key from the image content and the detector name.
+
+    Args:
+        image: Input image
+        detector: Name of the feature detector the entry belongs to
+
+    Returns:
+        Hex digest of the image data suffixed with the detector name
+    """
+    digest = hashlib.sha1()
+    digest.update(f"{image.shape}{image.dtype}".encode())
+    digest.update(np.ascontiguousarray(image).data)
+    return f"{digest.hexdigest()}_{detector}"
+
+
+class FeatureStore:
+    """In-memory LRU cache of image features with optional .npz persistence."""
+
+    def __init__(self, max_entries: Optional[int] = None, cache_dir: Optional[str] = None):
+        """
+        Initialize feature store.
+
+        Args:
+            max_entries: Maximum number of images kept in memory (None keeps every image)
+            cache_dir: Directory for persisted .npz files (None keeps features in memory only)
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def _cache_path(self, key: str) -> str:
+        """Path of the persisted feature file for a cache key."""
+        return os.path.join(self.cache_dir, f"features_{key}.npz")
+
+    def get(self, key: str) -> Optional[Features]:
+        """
+        Look up features for a cache key.
+
+        Args:
+            key: Cache key from image_key()
+
+        Returns:
+            Cached features, or None if not cached
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+        if self.cache_dir is not None and os.path.exists(self._cache_path(key)):
+            try:
+                features = Features.load(self._cache_path(key))
+                self._remember(key, features)
+                self.hits += 1
+                return features
+            except Exception as e:
+                print(f"Failed to load cached features {key}: {e}")
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, features: Features):
+        """
+        Store features for a cache key.
+
+        Args:
+            key: Cache key from image_key()
+            features: Detected features
+        """
+        self._remember(key, features)
+
+        if self.cache_dir is not None:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                features.save(self._cache_path(key))
+            except Exception as e:
+                print(f"Failed to persist features {key}: {e}")
+
+    def _remember(self, key: str, entry: Features):
+        """Insert an entry in memory, evicting the least recently used one when full."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while self.max_entries is not None and len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all in-memory entries (persisted files are kept)."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
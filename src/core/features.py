@@ -0,0 +1,190 @@
+"""
+Feature Data Types Module
+
+Compact array-backed containers for image features and feature matches.
+Both types hold plain NumPy arrays only, so they pickle cheaply across process
+boundaries and can be saved to (and memory-mapped from) uncompressed .npz files.
+"""
+
+import struct
+import zipfile
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+# Supported feature detectors; ORB and AKAZE produce binary descriptors
+FEATURE_BACKENDS = ('sift', 'orb', 'akaze')
+BINARY_BACKENDS = ('orb', 'akaze')
+
+
+def create_detector(backend: str = "sift", max_features: int = 5000):
+    """
+    Create an OpenCV feature detector.
+
+    Args:
+        backend: Detector name ('sift', 'orb' or 'akaze')
+        max_features: Keypoint budget for ORB
+
+    Returns:
+        OpenCV Feature2D instance
+    """
+    if backend == "sift":
+        return cv2.SIFT_create()
+    if backend == "orb":
+        return cv2.ORB_create(nfeatures=max_features)
+    if backend == "akaze":
+        return cv2.AKAZE_create()
+    raise ValueError(f"Unknown feature backend: {backend} (expected one of {FEATURE_BACKENDS})")
+
+
+def _load_npz(path: str, mmap_mode: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """
+    Load arrays from an uncompressed .npz file, optionally memory-mapped.
+
+    np.load ignores mmap_mode for .npz archives, so stored members are mapped
+    directly at their offset inside the archive instead.
+    """
+    if mmap_mode is None:
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"Cannot memory-map compressed member {info.filename} in {path}")
+
+            # Skip the local file header to reach the .npy member
+            f.seek(info.header_offset)
+            header = f.read(30)
+            name_length, extra_length = struct.unpack('<HH', header[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if int(np.prod(shape)) == 0:
+                arrays[name] = np.empty(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(path, dtype=dtype, mode=mmap_mode, offset=f.tell(),
+                                         shape=shape, order='F' if fortran_order else 'C')
+    return arrays
+
+
+class Features:
+    """Keypoint coordinates and descriptors of one image."""
+
+    def __init__(self, points: np.ndarray, descriptors: Optional[np.ndarray], key: Optional[str] = None):
+        """
+        Initialize features.
+
+        Args:
+            points: Keypoint coordinates as an (N, 2) array
+            descriptors: Descriptor matrix with one row per keypoint (None when nothing was detected)
+            key: Cache key of the source image, if known
+        """
+        self.points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+        if descriptors is None:
+            descriptors = np.empty((0, 0), dtype=np.float32)
+        self.descriptors = descriptors
+        self.key = key
+
+    @classmethod
+    def from_keypoints(cls, keypoints: List[cv2.KeyPoint], descriptors: Optional[np.ndarray]) -> 'Features':
+        """Create features from OpenCV keypoints and descriptors."""
+        if not keypoints:
+            return cls(np.empty((0, 2), dtype=np.float32), None)
+        return cls(cv2.KeyPoint_convert(keypoints), descriptors)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def save(self, path: str):
+        """Save features to an uncompressed .npz file."""
+        np.savez(path, points=self.points, descriptors=self.descriptors)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = None) -> 'Features':
+        """
+        Load features saved with save().
+
+        Args:
+            path: Path of the .npz file
+            mmap_mode: Memory-map mode passed to np.memmap ('r', 'c', ...), or None to read into memory
+
+        Returns:
+            Loaded features
+        """
+        data = _load_npz(path, mmap_mode)
+        return cls(data['points'], data['descriptors'])
+
+
+class Matches:
+    """Feature correspondences between two images."""
+
+    def __init__(self, pairs: np.ndarray, distances: np.ndarray):
+        """
+        Initialize matches.
+
+        Args:
+            pairs: (M, 2) array of (query index, train index) pairs
+            distances: Descriptor distance of each match
+        """
+        self.pairs = np.asarray(pairs, dtype=np.int32).reshape(-1, 2)
+        self.distances = np.asarray(distances, dtype=np.float32).reshape(-1)
+
+    @classmethod
+    def empty(cls) -> 'Matches':
+        """Create an empty match set."""
+        return cls(np.empty((0, 2), dtype=np.int32), np.empty(0, dtype=np.float32))
+
+    @property
+    def query_idx(self) -> np.ndarray:
+        """Indices into the first image's features."""
+        return self.pairs[:, 0]
+
+    @property
+    def train_idx(self) -> np.ndarray:
+        """Indices into the second image's features."""
+        return self.pairs[:, 1]
+
+    def __len__(self) -> int:
+        return len(self.pairs)
+
+    def save(self, path: str):
+        """Save matches to an uncompressed .npz file."""
+        np.savez(path, pairs=self.pairs, distances=self.distances)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = None) -> 'Matches':
+        """Load matches saved with save(), optionally memory-mapped."""
+        data = _load_npz(path, mmap_mode)
+        return cls(data['pairs'], data['distances'])
+
+
+def ratio_test(indices: np.ndarray, distances: np.ndarray, ratio_threshold: float = 0.7) -> Matches:
+    """
+    Apply Lowe's ratio test to k-nearest-neighbour results in one vectorized pass.
+
+    Args:
+        indices: (M, 2) train indices of the two nearest neighbours of each query descriptor
+        distances: (M, 2) distances of the two nearest neighbours
+        ratio_threshold: Lowe's ratio test threshold
+
+    Returns:
+        Matches that pass the test
+    """
+    if len(indices) == 0:
+        return Matches.empty()
+
+    indices = np.asarray(indices).reshape(-1, 2)
+    distances = np.asarray(distances, dtype=np.float32).reshape(-1, 2)
+
+    good = (indices[:, 1] >= 0) & (distances[:, 0] < ratio_threshold * distances[:, 1])
+    query = np.flatnonzero(good)
+    return Matches(np.column_stack([query, indices[good, 0]]), distances[good, 0])
@@ -0,0 +1,241 @@
+"""
+Depth Map Fusion Module
+
+Merges per-view depth maps (from dense stereo or PatchMatch MVS) into one
+point cloud. Every depth pixel is projected into the neighbouring views and
+kept only when enough of them observe a consistent depth; the agreeing
+observations are averaged into one point and marked as used, so each surface
+point is emitted once. Depth maps are fused as they arrive: neighbours come
+from a sliding window of views, a view's map and used-pixel mask are dropped
+once it leaves the window, and pixels are processed in fixed-size chunks, so
+peak memory is independent of the number of views.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+
+def scaled_camera_matrix(camera_matrix: np.ndarray, image_size: Tuple[int, int],
+                         shape: Tuple[int, int]) -> np.ndarray:
+    """
+    Camera matrix of a map resampled from the full image size.
+
+    Args:
+        camera_matrix: 3x3 intrinsics at full image size
+        image_size: Full image size (width, height)
+        shape: Map shape (height, width)
+
+    Returns:
+        3x3 intrinsics for the map's pixel grid
+    """
+    K = np.asarray(camera_matrix, dtype=np.float64).copy()
+    sx, sy = shape[1] / image_size[0], shape[0] / image_size[1]
+    K[0] *= sx
+    K[1] *= sy
+    K[0, 2] += 0.5 * sx - 0.5
+    K[1, 2] += 0.5 * sy - 0.5
+    return K
+
+
+def depth_map_from_points(points: np.ndarray, camera_matrix: np.ndarray, image_size: Tuple[int, int],
+                          scale: float = 1.0) -> np.ndarray:
+    """
+    Rasterise camera-frame points into a depth map, keeping the nearest point per pixel.
+
+    Args:
+        points: (N, 3) points in the camera frame
+        camera_matrix: 3x3 intrinsics at full image size
+        image_size: Full image size (width, height)
+        scale: Map resolution relative to the image (e.g. 0.5 for points sampled every 2nd pixel)
+
+    Returns:
+        Float32 depth map (0 = no point)
+    """
+    shape = (max(1, int(round(image_size[1] * scale))), max(1, int(round(image_size[0] * scale))))
+    K = scaled_camera_matrix(camera_matrix, image_size, shape)
+    depth = np.full(shape[0] * shape[1], np.inf)
+
+    points = points[points[:, 2] > 0]
+    projected = points @ K.T
+    u = np.round(projected[:, 0] / projected[:, 2]).astype(np.int64)
+    v = np.round(projected[:, 1] / projected[:, 2]).astype(np.int64)
+    inside = (u >= 0) & (u < shape[1]) & (v >= 0) & (v < shape[0])
+    np.minimum.at(depth, v[inside] * shape[1] + u[inside], points[inside, 2])
+
+    depth[~np.isfinite(depth)] = 0
+    return depth.reshape(shape).astype(np.float32)
+
+
+class DepthMapFusion:
+    """Geometric consistency fusion of per-view depth maps."""
+
+    def __init__(self, min_views: int = 3, depth_tolerance: float = 0.01, n_neighbors: int = 4,
+                 chunk_size: int = 65536, window: Optional[int] = 8):
+        """
+        Initialize depth map fusion.
+
+        Args:
+            min_views: Views (including the reference view) that must agree on a point
+            depth_tolerance: Maximum relative depth difference for two views to agree
+            n_neighbors: Nearest views each depth map is checked against
+            chunk_size: Pixels processed per vectorized batch
+            window: Depth maps on either side of a view, in the order they arrive, that its
+                neighbours are chosen from; at most 2 * window + 1 maps are held (None = all views)
+        """
+        self.min_views = min_views
+        self.depth_tolerance = depth_tolerance
+        self.n_neighbors = n_neighbors
+        self.chunk_size = chunk_size
+        self.window = window
+
+    def fuse(self, depth_maps: Mapping[int, np.ndarray], poses: Dict[int, Tuple[np.ndarray, np.ndarray]],
+             camera_matrix: np.ndarray, image_size: Tuple[int, int]) -> np.ndarray:
+        """
+        Fuse depth maps into one de-duplicated point cloud.
+
+        Args:
+            depth_maps: Depth map of each view (0 = no depth); any resolution, any lazy mapping
+            poses: World-to-camera (R, t) of each view
+            camera_matrix: 3x3 intrinsics at full image size
+            image_size: Full image size (width, height)
+
+        Returns:
+            (N, 3) fused world points
+        """
+        stream = ((view, depth_maps[view]) for view in sorted(depth_maps))
+        fused = list(self.fuse_stream(stream, poses, camera_matrix, image_size))
+        return np.vstack(fused) if fused else np.empty((0, 3))
+
+    def fuse_stream(self, depth_maps: Iterable[Tuple[int, np.ndarray]],
+                    poses: Dict[int, Tuple[np.ndarray, np.ndarray]], camera_matrix: np.ndarray,
+                    image_size: Tuple[int, int]) -> Iterator[np.ndarray]:
+        """
+        Fuse depth maps as they are produced, yielding the fused points chunk by chunk.
+
+        A view is fused as soon as the window of depth maps after it has
+        arrived. Its depth map and used-pixel mask are released once no later
+        view can pick it as a neighbour, so memory is bounded by the window
+        rather than the number of views.
+
+        Args:
+            depth_maps: (view, depth map) pairs in sequence order (0 = no depth); views without
+                a pose are ignored
+            poses: World-to-camera (R, t) of each view
+            camera_matrix: 3x3 intrinsics at full image size
+            image_size: Full image size (width, height)
+
+        Yields:
+            (N, 3) fused world points of one batch of reference pixels
+        """
+        arrivals = ((view, depth) for view, depth in depth_maps if view in poses)
+        order = []
+        maps: Dict[int, np.ndarray] = {}
+        # Pixels already merged into an emitted point, per held view
+        used: Dict[int, np.ndarray] = {}
+        centers: Dict[int, np.ndarray] = {}
+        fused = total = position = 0
+        finished = False
+
+        while True:
+            # Pull depth maps until the next reference view has its whole window
+            while not finished and (self.window is None or len(order) <= position + self.window):
+                arrival = next(arrivals, None)
+                if arrival is None:
+                    finished = True
+                    break
+                view, depth = arrival
+                order.append(view)
+                maps[view] = depth
+                used[view] = np.zeros(depth.size, dtype=bool)
+                centers[view] = (-poses[view][0].T @ np.asarray(poses[view][1]).reshape(3, 1)).ravel()
+            if position >= len(order):
+                break
+
+            # Small sessions cannot confirm a point in more views than there are depth maps
+            min_views = max(1, min(self.min_views, len(order)))
+            for points, pixels in self._fuse_view(position, order, maps, used, centers, poses,
+                                                  camera_matrix, image_size, min_views):
+                fused += len(points)
+                total += pixels
+                yield points
+            position += 1
+
+            # The view leaving the window is never a neighbour again
+            if self.window is not None and position > self.window:
+                expired = order[position - 1 - self.window]
+                del maps[expired], used[expired]
+
+        print(f"Depth fusion: {fused} points kept from {total} depth pixels of {len(order)} views "
+              f"(>= {max(1, min(self.min_views, len(order)))} consistent views)")
+
+    def _fuse_view(self, position: int, order: List[int], maps: Dict[int, np.ndarray], used: Dict[int, np.ndarray],
+                   centers: Dict[int, np.ndarray], poses: Dict[int, Tuple[np.ndarray, np.ndarray]],
+                   camera_matrix: np.ndarray, image_size: Tuple[int, int],
+                   min_views: int) -> Iterator[Tuple[np.ndarray, int]]:
+        """Fuse the unused pixels of one reference view in chunks, yielding (points, pixels checked)."""
+        view = order[position]
+        depth = maps[view]
+        if self.window is None:
+            window = order
+        else:
+            window = order[max(0, position - self.window):position + self.window + 1]
+        neighbours = sorted((v for v in window if v != view),
+                            key=lambda v: np.linalg.norm(centers[v] - centers[view]))[:self.n_neighbors]
+        neighbour_maps = {v: maps[v] for v in neighbours}
+
+        candidates = np.flatnonzero((depth.ravel() > 0) & ~used[view])
+        for start in range(0, len(candidates), self.chunk_size):
+            pixels = candidates[start:start + self.chunk_size]
+            yield (self._fuse_chunk(view, depth, pixels, neighbour_maps, poses, camera_matrix,
+                                    image_size, used, min_views), len(pixels))
+
+    def _fuse_chunk(self, view: int, depth: np.ndarray, pixels: np.ndarray, neighbour_maps: Dict[int, np.ndarray],
+                    poses: Dict[int, Tuple[np.ndarray, np.ndarray]], camera_matrix: np.ndarray,
+                    image_size: Tuple[int, int], used: Dict[int, np.ndarray], min_views: int) -> np.ndarray:
+        """Check one batch of reference pixels against the neighbouring depth maps."""
+        points = self._back_project(depth, pixels, view, poses, camera_matrix, image_size)
+        sums = points.copy()
+        counts = np.ones(len(pixels), dtype=np.int32)
+        agreements = []
+
+        for neighbour, neighbour_depth in neighbour_maps.items():
+            R, t = poses[neighbour]
+            K = scaled_camera_matrix(camera_matrix, image_size, neighbour_depth.shape)
+            camera_points = points @ R.T + np.asarray(t).ravel()
+            projected = camera_points @ K.T
+            with np.errstate(divide='ignore', invalid='ignore'):
+                u = np.round(projected[:, 0] / projected[:, 2])
+                v = np.round(projected[:, 1] / projected[:, 2])
+            h, w = neighbour_depth.shape
+            inside = (camera_points[:, 2] > 0) & (u >= 0) & (u < w) & (v >= 0) & (v < h)
+            target = np.where(inside, v * w + u, 0).astype(np.int64)
+
+            observed = neighbour_depth.ravel()[target]
+            agree = inside & (observed > 0) & \
+                (np.abs(observed - camera_points[:, 2]) < self.depth_tolerance * camera_points[:, 2])
+            if not np.any(agree):
+                continue
+
+            sums[agree] += self._back_project(neighbour_depth, target[agree], neighbour, poses,
+                                              camera_matrix, image_size)
+            counts[agree] += 1
+            agreements.append((neighbour, agree, target))
+
+        keep = counts >= min_views
+        used[view][pixels[keep]] = True
+        for neighbour, agree, target in agreements:
+            used[neighbour][target[agree & keep]] = True
+        return sums[keep] / counts[keep, np.newaxis]
+
+    @staticmethod
+    def _back_project(depth: np.ndarray, pixels: np.ndarray, view: int,
+                      poses: Dict[int, Tuple[np.ndarray, np.ndarray]], camera_matrix: np.ndarray,
+                      image_size: Tuple[int, int]) -> np.ndarray:
+        """World points of flat pixel indices of a depth map."""
+        K = scaled_camera_matrix(camera_matrix, image_size, depth.shape)
+        rows, cols = np.divmod(pixels, depth.shape[1])
+        rays = np.column_stack([cols, rows, np.ones(len(pixels))]) @ np.linalg.inv(K).T
+        camera_points = rays * depth.ravel()[pixels][:, np.newaxis]
+        R, t = poses[view]
+        return (camera_points - np.asarray(t).ravel()) @ R
@@ -698,6 +698,52 @@ class GridDetector:
         
         return objp
     
+    def estimate_pose(self, image: np.ndarray, camera_matrix: np.ndarray,
+                      distortion_coefficients: Optional[np.ndarray] = None,
+                      grid_pattern: Tuple[int, int] = (9, 6),
+                      max_error: float = 2.0) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Estimate the absolute camera pose from the reference grid visible in an image.
+        
+        The grid defines the world frame: origin at the first corner, x/y along
+        the grid rows and columns, z = 0 on the grid plane, units in millimeters.
+        
+        Args:
+            image: Input image (BGR or grayscale)
+            camera_matrix: 3x3 camera intrinsic matrix
+            distortion_coefficients: Lens distortion coefficients (None for no distortion)
+            grid_pattern: Number of inner corners (columns, rows)
+            max_error: Maximum RMS reprojection error of the grid corners in pixels
+        
+        Returns:
+            World-to-camera (R, t) with t in millimeters, or None if the grid was not found
+        """
+        corners = self.detect_grid(image, grid_pattern)
+        # Corners of a different pattern cannot be paired with the generated grid points
+        if corners is None or len(corners) != grid_pattern[0] * grid_pattern[1]:
+            return None
+        
+        object_points = self.generate_3d_points(grid_pattern)
+        image_points = corners.reshape(-1, 2).astype(np.float64)
+        camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        
+        # IPPE is the dedicated solver for planar targets
+        success, rvec, tvec = cv2.solvePnP(object_points, image_points, camera_matrix,
+                                           distortion_coefficients, flags=cv2.SOLVEPNP_IPPE)
+        if not success:
+            return None
+        
+        projected, _ = cv2.projectPoints(object_points, rvec, tvec, camera_matrix, distortion_coefficients)
+        error = np.sqrt(np.mean(np.sum((projected.reshape(-1, 2) - image_points) ** 2, axis=1)))
+        if error > max_error:
+            print(f"Grid pose rejected: reprojection error {error:.2f}px")
+            return None
+        
+        self.grid_points_3d = object_points
+        self.grid_points_2d = corners
+        R, _ = cv2.Rodrigues(rvec)
+        return R, tvec.reshape(3, 1)
+    
     def calibrate_camera(self, images: List[np.ndarray], grid_pattern: Tuple[int, int] = (9, 6)) -> Dict:
         """
         Calibrate camera using multiple grid images.
@@ -0,0 +1,200 @@
+"""
+Foreground Masking Module
+
+Builds per-image masks of the scanned object so feature detection skips the
+background and the calibration grid. Three segmentations are available:
+background subtraction against a model of the empty scene (a reference shot
+or the per-pixel median of the session), colour segmentation against the
+colours along the image border, and removal of the grid plane's
+black-and-white board area. Masks are cleaned up morphologically and grown
+by a margin so keypoints on the object outline keep their support region.
+"""
+
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .grid_calibration import GridDetector
+
+# Supported segmentation methods
+MASK_METHODS = ('background', 'color', 'grid')
+
+
+class ForegroundMasker:
+    """Per-image foreground masks for feature detection."""
+
+    def __init__(self, method: str = "color", threshold: float = 25.0, margin: int = 15,
+                 min_area: float = 0.002, grid_pattern: Tuple[int, int] = (9, 6),
+                 border: int = 10, color_clusters: int = 3):
+        """
+        Initialize the masker.
+
+        Args:
+            method: Segmentation method ('background', 'color' or 'grid')
+            threshold: Colour difference (Lab units) separating foreground from background
+            margin: Pixels the cleaned mask is grown by
+            min_area: Smallest kept foreground region as a fraction of the image area
+            grid_pattern: Inner corners of the calibration grid for the 'grid' method
+            border: Width in pixels of the image border sampled by the 'color' method
+            color_clusters: Background colour clusters fitted to the border by the 'color' method
+        """
+        if method not in MASK_METHODS:
+            raise ValueError(f"Unknown mask method: {method} (expected one of {MASK_METHODS})")
+
+        self.method = method
+        self.threshold = threshold
+        self.margin = margin
+        self.min_area = min_area
+        self.grid_pattern = grid_pattern
+        self.border = border
+        self.color_clusters = color_clusters
+        self.background: Optional[np.ndarray] = None
+        # True when the background is a session median (refit for every new session),
+        # False for a reference shot of the empty scene
+        self.background_from_session = False
+        # Background resampled to other image sizes (pyramid levels), keyed by (height, width)
+        self._scaled_backgrounds = {}
+        self._grid_detector = GridDetector() if method == "grid" else None
+
+    def set_background(self, image: np.ndarray):
+        """Use a shot of the empty scene as the background model."""
+        self.background = cv2.cvtColor(image, cv2.COLOR_BGR2LAB).astype(np.float32)
+        self.background_from_session = False
+        self._scaled_backgrounds = {}
+
+    def reset_background(self):
+        """Forget the background model (e.g. before a new capture session)."""
+        self.background = None
+        self.background_from_session = False
+        self._scaled_backgrounds = {}
+
+    def fit_background(self, images: List[np.ndarray], max_images: int = 15):
+        """
+        Model the background as the per-pixel median of a session.
+
+        Works when the object moves through the frame while the camera stays
+        still; every pixel must show background in most of the sampled images.
+
+        Args:
+            images: Session images (same size)
+            max_images: Evenly spaced images used for the median
+        """
+        if not images:
+            raise ValueError("Need at least one image to fit the background")
+        picks = np.linspace(0, len(images) - 1, min(max_images, len(images))).astype(int)
+        stack = np.stack([cv2.cvtColor(images[i], cv2.COLOR_BGR2LAB) for i in picks])
+        self.background = np.median(stack, axis=0).astype(np.float32)
+        self.background_from_session = True
+        self._scaled_backgrounds = {}
+
+    def compute_mask(self, image: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Foreground mask of an image.
+
+        Args:
+            image: BGR image
+
+        Returns:
+            uint8 mask (255 = foreground), or None when the image cannot be segmented
+            (no background model, no grid found, or nothing left in the foreground)
+        """
+        if image.ndim == 2:
+            image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+
+        if self.method == "background":
+            background = self._background_for(image.shape[:2])
+            if background is None:
+                return None
+            lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB).astype(np.float32)
+            foreground = np.linalg.norm(lab - background, axis=2) > self.threshold
+        elif self.method == "color":
+            foreground = self._color_foreground(image)
+        else:
+            foreground = self._grid_foreground(image)
+            if foreground is None:
+                return None
+
+        mask = self._clean(foreground.astype(np.uint8) * 255)
+        return mask if np.any(mask) else None
+
+    def _background_for(self, shape: Tuple[int, int]) -> Optional[np.ndarray]:
+        """
+        Background model at an image size.
+
+        A downscaled copy of the fitted images (e.g. a pyramid level) gets the
+        background resampled to its size; a size with a different aspect ratio
+        cannot be matched and disables masking with a warning.
+
+        Args:
+            shape: (height, width) of the image to mask
+
+        Returns:
+            Lab background of that size, or None
+        """
+        if self.background is None:
+            return None
+        height, width = self.background.shape[:2]
+        if (height, width) == tuple(shape):
+            return self.background
+        if shape not in self._scaled_backgrounds:
+            if abs(shape[1] * height - shape[0] * width) > max(height, width):
+                print(f"Warning: background model is {width}x{height}, image is "
+                      f"{shape[1]}x{shape[0]}; masking disabled for this size")
+                self._scaled_backgrounds[shape] = None
+            else:
+                interpolation = cv2.INTER_AREA if shape[1] < width else cv2.INTER_LINEAR
+                self._scaled_backgrounds[shape] = cv2.resize(self.background, (shape[1], shape[0]),
+                                                             interpolation=interpolation)
+        return self._scaled_backgrounds[shape]
+
+    def _color_foreground(self, image: np.ndarray) -> np.ndarray:
+        """Pixels whose colour is far from every background colour cluster found along the border."""
+        lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB).astype(np.float32)
+        b = self.border
+        samples = np.vstack([lab[:b].reshape(-1, 3), lab[-b:].reshape(-1, 3),
+                             lab[:, :b].reshape(-1, 3), lab[:, -b:].reshape(-1, 3)])
+        samples = np.ascontiguousarray(samples[::max(1, len(samples) // 5000)])
+        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 0.5)
+        _, _, centers = cv2.kmeans(samples, self.color_clusters, None, criteria, 2, cv2.KMEANS_PP_CENTERS)
+
+        # Squared distance of every pixel to its nearest cluster, one cluster at a time
+        pixels = lab.reshape(-1, 3)
+        nearest = np.full(len(pixels), np.inf, dtype=np.float32)
+        for center in centers:
+            np.minimum(nearest, np.sum((pixels - center) ** 2, axis=1), out=nearest)
+        return (nearest > self.threshold ** 2).reshape(lab.shape[:2])
+
+    def _grid_foreground(self, image: np.ndarray) -> Optional[np.ndarray]:
+        """Everything except the unsaturated (black and white) pixels of the grid board."""
+        corners = self._grid_detector.detect_grid(image, self.grid_pattern)
+        if corners is None or len(corners) < 4:
+            return None
+
+        corners = corners.reshape(-1, 2).astype(np.float32)
+        hull = cv2.convexHull(corners)
+        # Grow the inner-corner hull by about one square to cover the board's outer squares
+        spacing = np.median(np.linalg.norm(np.diff(corners, axis=0), axis=1))
+        board = np.zeros(image.shape[:2], dtype=np.uint8)
+        cv2.fillConvexPoly(board, hull.astype(np.int32), 255)
+        size = int(2 * spacing) | 1
+        board = cv2.dilate(board, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (size, size)))
+
+        saturation = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)[..., 1]
+        return ~((board > 0) & (saturation < self.threshold))
+
+    def _clean(self, mask: np.ndarray) -> np.ndarray:
+        """Remove speckles and small regions, fill holes and grow the mask by the margin."""
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=2)
+
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        keep = np.zeros(count, dtype=bool)
+        keep[1:] = stats[1:, cv2.CC_STAT_AREA] >= self.min_area * mask.size
+        mask = np.where(keep[labels], 255, 0).astype(np.uint8)
+
+        if self.margin > 0:
+            size = 2 * self.margin + 1
+            mask = cv2.dilate(mask, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (size, size)))
+        return mask
@@ -0,0 +1,319 @@
+"""
+Feature Matching Module
+
+Matches descriptors between images with FLANN indices that are trained once per
+image and reused for every pair the image takes part in. Float descriptors
+(SIFT) use a KD-tree forest; binary descriptors (ORB, AKAZE) use LSH or
+brute-force Hamming distance. Pairs whose relative pose is known can be
+re-matched along epipolar lines with a bucketed candidate search.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .features import Features, Matches, ratio_test
+
+FLANN_INDEX_KDTREE = 1
+FLANN_INDEX_LSH = 6
+
+# Matching methods: KD-tree for float descriptors, LSH / brute force for binary ones
+MATCHER_METHODS = ('flann', 'lsh', 'bruteforce')
+
+# Number of set bits in every byte value, for Hamming distances of packed descriptors
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, np.newaxis], axis=1).sum(axis=1).astype(np.float32)
+
+
+def fundamental_from_pose(camera_matrix: np.ndarray, R: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """
+    Fundamental matrix of a calibrated pair with relative pose x2 = R x1 + t.
+
+    Args:
+        camera_matrix: 3x3 camera intrinsic matrix shared by both views
+        R: Rotation from the first to the second camera
+        t: Translation from the first to the second camera
+
+    Returns:
+        3x3 fundamental matrix F with x2^T F x1 = 0
+    """
+    t = np.asarray(t, dtype=np.float64).ravel()
+    t_cross = np.array([[0, -t[2], t[1]], [t[2], 0, -t[0]], [-t[1], t[0], 0]])
+    K_inv = np.linalg.inv(np.asarray(camera_matrix, dtype=np.float64))
+    return K_inv.T @ t_cross @ np.asarray(R, dtype=np.float64) @ K_inv
+
+
+class FeatureMatcher:
+    """Descriptor matcher with a cache of trained per-image indices."""
+
+    def __init__(self, method: str = "flann", index_params: Optional[Dict] = None,
+                 search_params: Optional[Dict] = None, max_indices: int = 8):
+        """
+        Initialize feature matcher.
+
+        Args:
+            method: 'flann' (KD-tree, float descriptors), 'lsh' or 'bruteforce' (Hamming, binary descriptors)
+            index_params: FLANN index parameters (default depends on method)
+            search_params: FLANN search parameters (default 50 checks)
+            max_indices: Number of trained indices kept in memory
+        """
+        if method not in MATCHER_METHODS:
+            raise ValueError(f"Unknown matcher method: {method} (expected one of {MATCHER_METHODS})")
+        
+        if index_params is None:
+            if method == "lsh":
+                index_params = dict(algorithm=FLANN_INDEX_LSH, table_number=6, key_size=12, multi_probe_level=1)
+            else:
+                index_params = dict(algorithm=FLANN_INDEX_KDTREE, trees=5)
+        
+        self.method = method
+        self.is_binary = method != "flann"
+        self.index_params = index_params
+        self.search_params = search_params or dict(checks=50)
+        self.max_indices = max_indices
+        self._indices = OrderedDict()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset index build and query timing counters."""
+        self.stats = {
+            'index_builds': 0,
+            'index_build_time': 0.0,
+            'queries': 0,
+            'query_time': 0.0
+        }
+
+    def _prepare(self, descriptors: np.ndarray) -> np.ndarray:
+        """Convert descriptors to the layout the matching method expects."""
+        return np.ascontiguousarray(descriptors, dtype=np.uint8 if self.is_binary else np.float32)
+
+    def _build_index(self, descriptors: np.ndarray) -> Tuple[object, np.ndarray]:
+        """Train an index over descriptors (brute force needs no index)."""
+        data = self._prepare(descriptors)
+        if self.method == "bruteforce":
+            return None, data
+        
+        start = time.perf_counter()
+        index = cv2.flann_Index(data, self.index_params)
+        self.stats['index_build_time'] += time.perf_counter() - start
+        self.stats['index_builds'] += 1
+        # Keep the training data alive for as long as the index is used
+        return index, data
+
+    def get_index(self, descriptors: np.ndarray, key: Optional[str] = None) -> Tuple[object, np.ndarray]:
+        """
+        Get the trained index for an image, building it on first use.
+
+        Args:
+            descriptors: Descriptors of the image
+            key: Image cache key (None builds a throwaway index)
+
+        Returns:
+            Tuple of (FLANN index, training data)
+        """
+        if key is None:
+            return self._build_index(descriptors)
+
+        if key in self._indices:
+            self._indices.move_to_end(key)
+            return self._indices[key]
+
+        entry = self._build_index(descriptors)
+        self._indices[key] = entry
+        while len(self._indices) > self.max_indices:
+            self._indices.popitem(last=False)
+        return entry
+
+    def has_index(self, key: Optional[str]) -> bool:
+        """Check whether a trained index is cached for an image."""
+        return key is not None and key in self._indices
+
+    def _query(self, entry: Tuple[object, np.ndarray], descriptors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Find the two nearest neighbours of each descriptor."""
+        index, train = entry
+        query = self._prepare(descriptors)
+        
+        start = time.perf_counter()
+        if self.method == "bruteforce":
+            distances, indices = cv2.batchDistance(query, train, cv2.CV_32S,
+                                                   normType=cv2.NORM_HAMMING, K=2)
+        else:
+            indices, distances = index.knnSearch(query, 2, params=self.search_params)
+        self.stats['query_time'] += time.perf_counter() - start
+        self.stats['queries'] += 1
+        
+        if self.method == "flann":
+            # KD-tree search returns squared L2 distances
+            return indices, np.sqrt(distances)
+        return indices, distances.astype(np.float32)
+
+    def match(self, desc1: np.ndarray, desc2: np.ndarray, ratio_threshold: float = 0.7,
+              key1: Optional[str] = None, key2: Optional[str] = None) -> Matches:
+        """
+        Match descriptors of two images.
+
+        The second image's index is used by default. When only the first
+        image already has a trained index, that one is queried instead and the
+        resulting pairs are swapped, so no new index has to be built.
+
+        Args:
+            desc1: Descriptors from first image
+            desc2: Descriptors from second image
+            ratio_threshold: Lowe's ratio test threshold
+            key1: Cache key of the first image
+            key2: Cache key of the second image
+
+        Returns:
+            Matches with query indices into desc1 and train indices into desc2
+        """
+        if len(desc1) < 2 or len(desc2) < 2:
+            return Matches.empty()
+
+        if self.has_index(key1) and not self.has_index(key2):
+            entry = self.get_index(desc1, key1)
+            matches = ratio_test(*self._query(entry, desc2), ratio_threshold)
+            return Matches(matches.pairs[:, ::-1], matches.distances)
+
+        entry = self.get_index(desc2, key2)
+        return ratio_test(*self._query(entry, desc1), ratio_threshold)
+
+    def match_guided(self, features1: Features, features2: Features, fundamental: np.ndarray,
+                     max_distance: float = 2.0, ratio_threshold: float = 0.8,
+                     cell_size: float = 16.0, chunk_size: int = 512,
+                     max_descriptor_distance: Optional[float] = None) -> Matches:
+        """
+        Match features of a pair with known geometry along epipolar lines.
+
+        Keypoints of the second image are bucketed into a grid of square
+        cells; each keypoint of the first image is only compared with
+        keypoints in cells crossed by its epipolar line, and of those only
+        with keypoints within max_distance of the line. The ratio test runs
+        over this short candidate list, so a looser threshold than for
+        unconstrained matching is safe. A keypoint with a single candidate
+        has nothing to compare against, so its match must instead be no
+        farther than max_descriptor_distance - by default the 95th percentile
+        distance of the matches that passed a real ratio test.
+
+        Args:
+            features1: Features of the first image
+            features2: Features of the second image
+            fundamental: Fundamental matrix with x2^T F x1 = 0
+            max_distance: Epipolar band half-width in pixels
+            ratio_threshold: Lowe's ratio test threshold among band candidates
+            cell_size: Bucket size in pixels
+            chunk_size: First-image keypoints processed per vectorized batch
+            max_descriptor_distance: Absolute descriptor distance limit for every match,
+                or None to gate only single-candidate keypoints by the data
+
+        Returns:
+            One-to-one matches with query indices into features1 and train indices into features2
+        """
+        if len(features1) < 2 or len(features2) < 2:
+            return Matches.empty()
+
+        start = time.perf_counter()
+        points2 = features2.points.astype(np.float64)
+        desc1 = self._prepare(features1.descriptors)
+        desc2 = self._prepare(features2.descriptors)
+        if not self.is_binary:
+            # Squared norms for |a - b|^2 = |a|^2 + |b|^2 - 2 a.b without per-candidate differences
+            norms1 = np.einsum('ij,ij->i', desc1, desc1)
+            norms2 = np.einsum('ij,ij->i', desc2, desc2)
+
+        # Bucket second-image keypoints into grid cells, stored CSR-style
+        origin = points2.min(axis=0)
+        cells = np.floor((points2 - origin) / cell_size).astype(np.int64)
+        nx, ny = cells.max(axis=0) + 1
+        cell_ids = cells[:, 1] * nx + cells[:, 0]
+        order = np.argsort(cell_ids, kind='stable')
+        counts = np.bincount(cell_ids, minlength=nx * ny)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        occupied = np.flatnonzero(counts)
+        cx, cy = np.meshgrid(np.arange(nx), np.arange(ny))
+        centers = origin + (np.column_stack([cx.ravel(), cy.ravel()])[occupied] + 0.5) * cell_size
+        # A cell can hold band points if its centre lies within the band plus half a cell diagonal
+        reach = max_distance + cell_size * np.sqrt(0.5)
+
+        # Epipolar lines in the second image, normalised so a.x + b.y + c is a pixel distance
+        lines = np.hstack([features1.points, np.ones((len(features1), 1))]) @ fundamental.T
+        lines /= np.maximum(np.hypot(lines[:, 0], lines[:, 1]), 1e-12)[:, np.newaxis]
+        # Separate 1-D columns make the per-candidate gathers below much cheaper
+        line_a, line_b, line_c = lines.T.copy()
+        x2, y2 = points2.T.copy()
+
+        queries, trains, distances = [], [], []
+        for chunk in range(0, len(lines), chunk_size):
+            chunk_lines = lines[chunk:chunk + chunk_size]
+            near = np.abs(chunk_lines[:, :2] @ centers.T + chunk_lines[:, 2:]) < reach
+            query, cell = np.nonzero(near)
+            cell = occupied[cell]
+
+            # Expand (query, cell) pairs to (query, keypoint) candidates
+            n = counts[cell]
+            query = np.repeat(query, n) + chunk
+            position = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n) + np.repeat(offsets[cell], n)
+            train = order[position]
+
+            in_band = np.abs(line_a[query] * x2[train] + line_b[query] * y2[train] + line_c[query]) < max_distance
+            query, train = query[in_band], train[in_band]
+            if len(query) == 0:
+                continue
+
+            if self.is_binary:
+                distance = _POPCOUNT[np.bitwise_xor(desc1[query], desc2[train])].sum(axis=1)
+            else:
+                squared = norms1[query] + norms2[train] - 2 * np.einsum('ij,ij->i', desc1[query], desc2[train])
+                distance = np.sqrt(np.maximum(squared, 0))
+            queries.append(query)
+            trains.append(train)
+            distances.append(distance.astype(np.float32))
+
+        self.stats['query_time'] += time.perf_counter() - start
+        self.stats['queries'] += 1
+        if not queries:
+            return Matches.empty()
+
+        query = np.concatenate(queries)
+        train = np.concatenate(trains)
+        distance = np.concatenate(distances)
+
+        # Best and second-best candidate of each query keypoint
+        order = np.lexsort((distance, query))
+        query, train, distance = query[order], train[order], distance[order]
+        first = np.flatnonzero(np.r_[True, query[1:] != query[:-1]])
+        second = first + 1
+        has_second = second < len(query)
+        has_second[has_second] = query[second[has_second]] == query[first[has_second]]
+        second_distance = np.full(len(first), np.inf, dtype=np.float32)
+        second_distance[has_second] = distance[second[has_second]]
+        passed = distance[first] < ratio_threshold * second_distance
+
+        # Single candidates pass the ratio test vacuously; gate them by absolute distance
+        gate = max_descriptor_distance
+        if gate is None:
+            confident = distance[first[has_second & passed]]
+            gate = float(np.percentile(confident, 95)) if len(confident) else 0.0
+        passed &= has_second | (distance[first] <= gate)
+        if max_descriptor_distance is not None:
+            passed &= distance[first] <= max_descriptor_distance
+        good = first[passed]
+        if len(good) == 0:
+            return Matches.empty()
+
+        # Keep the closest query for every train keypoint
+        query, train, distance = query[good], train[good], distance[good]
+        order = np.lexsort((distance, train))
+        keep = order[np.r_[True, train[order][1:] != train[order][:-1]]]
+        keep.sort()
+        return Matches(np.column_stack([query[keep], train[keep]]), distance[keep])
+
+    def timing_summary(self) -> str:
+        """Human-readable split of matching time between index builds and queries."""
+        return (f"{self.stats['index_builds']} index builds in {self.stats['index_build_time']:.2f}s, "
+                f"{self.stats['queries']} queries in {self.stats['query_time']:.2f}s")
+
+    def clear(self):
+        """Drop all cached indices."""
+        self._indices.clear()
@@ -0,0 +1,199 @@
+"""
+Image Pair Selection Module
+
+Proposes which images are worth matching with a bag-of-visual-words index
+over sampled local descriptors. Each image becomes one tf-idf weighted,
+L2-normalised word histogram, so candidate partners are found by comparing
+short global vectors instead of matching every pair of images.
+"""
+
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+FLANN_INDEX_KDTREE = 1
+
+
+class ImageRetrieval:
+    """Bag-of-visual-words index that proposes the top-k matching partners per image."""
+
+    def __init__(self, top_k: int = 5, vocabulary_size: int = 256, descriptors_per_image: int = 500,
+                 training_images: int = 20, seed: int = 0):
+        """
+        Initialize image retrieval.
+
+        Args:
+            top_k: Number of candidate partners proposed per image
+            vocabulary_size: Number of visual words
+            descriptors_per_image: Descriptors sampled from each image for training and encoding
+            training_images: Images buffered before the vocabulary is trained
+            seed: Random seed for descriptor sampling and k-means
+        """
+        self.top_k = top_k
+        self.vocabulary_size = vocabulary_size
+        self.descriptors_per_image = descriptors_per_image
+        self.training_images = training_images
+        self.seed = seed
+        self.reset()
+
+    def reset(self):
+        """Drop the vocabulary and all indexed images."""
+        self.vocabulary = None
+        self.idf = None
+        self._rng = np.random.default_rng(self.seed)
+        self._pending: Dict[int, np.ndarray] = {}
+        self._ids: List[int] = []
+        self._rows: Dict[int, int] = {}
+        self._vector_list: List[np.ndarray] = []
+        self._matrix = None
+
+    @property
+    def is_trained(self) -> bool:
+        """True once the vocabulary has been built."""
+        return self.vocabulary is not None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _sample(self, descriptors: np.ndarray) -> np.ndarray:
+        """Random descriptor subset as float32 (binary descriptors are unpacked to bits)."""
+        if descriptors is None or len(descriptors) == 0:
+            return np.empty((0, 0), dtype=np.float32)
+        if len(descriptors) > self.descriptors_per_image:
+            descriptors = descriptors[self._rng.choice(len(descriptors), self.descriptors_per_image, replace=False)]
+        if descriptors.dtype == np.uint8:
+            return np.unpackbits(descriptors, axis=1).astype(np.float32)
+        return np.asarray(descriptors, dtype=np.float32)
+
+    def add(self, image_id: int, descriptors: np.ndarray):
+        """
+        Add an image to the index.
+
+        Images added before the vocabulary exists are buffered; the vocabulary
+        is trained once enough images have been seen (or on finalize()).
+
+        Args:
+            image_id: Identifier of the image (e.g. its index in the session)
+            descriptors: Local descriptors of the image
+        """
+        sample = self._sample(descriptors)
+        if len(sample) == 0:
+            return
+
+        if not self.is_trained:
+            self._pending[image_id] = sample
+            if len(self._pending) >= self.training_images:
+                self.finalize()
+            return
+
+        self._append(image_id, self._encode(sample))
+
+    def finalize(self):
+        """Train the vocabulary from buffered images (if not done yet) and index them."""
+        if self.is_trained or not self._pending:
+            return
+
+        samples = np.vstack(list(self._pending.values()))
+        words = min(self.vocabulary_size, len(samples))
+        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 1e-3)
+        cv2.setRNGSeed(self.seed)
+        _, labels, centers = cv2.kmeans(samples, words, None, criteria, 1, cv2.KMEANS_PP_CENTERS)
+        self.vocabulary = centers.astype(np.float32)
+
+        # Inverse document frequency over the training images
+        offsets = np.cumsum([0] + [len(s) for s in self._pending.values()])
+        document_frequency = np.zeros(len(self.vocabulary))
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            document_frequency[np.unique(labels[start:end])] += 1
+        self.idf = np.log(len(self._pending) / (1.0 + document_frequency)).astype(np.float32) + 1.0
+
+        pending, self._pending = self._pending, {}
+        for image_id, sample in pending.items():
+            self._append(image_id, self._encode(sample))
+
+    def _encode(self, sample: np.ndarray) -> np.ndarray:
+        """Quantize descriptors to visual words and build a normalised tf-idf histogram."""
+        _, words = cv2.batchDistance(sample, self.vocabulary, -1, normType=cv2.NORM_L2, K=1)
+        histogram = np.bincount(words.ravel(), minlength=len(self.vocabulary)).astype(np.float32)
+        histogram *= self.idf / max(len(sample), 1)
+        norm = np.linalg.norm(histogram)
+        return histogram / norm if norm > 0 else histogram
+
+    def _append(self, image_id: int, vector: np.ndarray):
+        """Store an encoded image vector."""
+        self._rows[image_id] = len(self._ids)
+        self._ids.append(image_id)
+        self._vector_list.append(vector)
+        self._matrix = None
+
+    @property
+    def _vectors(self) -> np.ndarray:
+        """(n, vocabulary size) matrix of all encoded images."""
+        if self._matrix is None:
+            self._matrix = np.vstack(self._vector_list).astype(np.float32)
+        return self._matrix
+
+    def query(self, image_id: int, among: Optional[List[int]] = None,
+              k: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Rank indexed images by similarity to one indexed image.
+
+        Args:
+            image_id: Image to find partners for
+            among: Restrict candidates to these image ids (default: all indexed images)
+            k: Number of candidates (default self.top_k)
+
+        Returns:
+            List of (image id, cosine similarity), best first
+        """
+        k = self.top_k if k is None else k
+        if image_id not in self._rows or k <= 0:
+            return []
+
+        ids = np.array(self._ids)
+        candidates = ids != image_id
+        if among is not None:
+            candidates &= np.isin(ids, among)
+        rows = np.flatnonzero(candidates)
+        if len(rows) == 0:
+            return []
+
+        scores = self._vectors[rows] @ self._vectors[self._rows[image_id]]
+        best = np.argsort(-scores)[:k]
+        return [(int(ids[rows[i]]), float(scores[i])) for i in best]
+
+    def candidate_pairs(self, k: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        Propose image pairs for the whole session.
+
+        A randomized KD-forest over the image vectors answers each top-k
+        query in roughly logarithmic time, so building and querying all
+        images costs about O(n log n) rather than O(n^2).
+
+        Args:
+            k: Partners per image (default self.top_k)
+
+        Returns:
+            Sorted list of unique (i, j) pairs with i < j
+        """
+        self.finalize()
+        k = self.top_k if k is None else k
+        n = len(self._ids)
+        if n < 2 or k <= 0:
+            return []
+
+        neighbours = min(k + 1, n)
+        if n <= 64:
+            scores = self._vectors @ self._vectors.T
+            indices = np.argsort(-scores, axis=1)[:, :neighbours]
+        else:
+            index = cv2.flann_Index(self._vectors, dict(algorithm=FLANN_INDEX_KDTREE, trees=4))
+            indices, _ = index.knnSearch(self._vectors, neighbours, params=dict(checks=64))
+
+        ids = np.array(self._ids)
+        rows = np.repeat(np.arange(n), indices.shape[1])
+        cols = indices.ravel()
+        keep = (cols >= 0) & (cols != rows)
+        a, b = ids[rows[keep]], ids[cols[keep]]
+        pairs = np.unique(np.column_stack([np.minimum(a, b), np.maximum(a, b)]), axis=0)
+        return [(int(i), int(j)) for i, j in pairs]
@@ -0,0 +1,322 @@
+"""
+PatchMatch Multi-View Stereo Module
+
+Estimates a depth and normal map for a reference view from several posed
+neighbouring views. Every pixel carries a plane hypothesis (depth along its
+ray and a surface normal); hypotheses are scored by the normalised
+cross-correlation of plane-warped patches in the source views and improved
+by checkerboard propagation from neighbouring pixels plus random
+refinement, so all pixels of one colour update in a single vectorized step.
+
+A downscaled pass estimates the whole view first. At full resolution only
+pixels whose upsampled hypothesis matches poorly or lies on a depth edge are
+optimised again; the rest keep the upsampled estimate. Reference patches are
+gathered batch by batch from a copy of the image padded by the patch radius,
+so no per-pixel patch stack or coordinate grid is ever held.
+"""
+
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Propagation neighbours at odd offsets, so they always have the other checkerboard colour
+_NEIGHBOURS = ((0, 1), (0, -1), (1, 0), (-1, 0), (0, 5), (0, -5), (5, 0), (-5, 0))
+
+
+class _Level:
+    """
+    Images, intrinsics and pixel geometry of one pyramid level.
+
+    Nothing is stored per pixel: the reference image is padded by a halo of
+    the patch radius, and the patches, rays and coordinates of a batch of
+    pixels are computed from their flat indices with int32 arithmetic when
+    the batch is scored.
+    """
+
+    def __init__(self, reference: np.ndarray, sources: List[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+                 camera_matrix: np.ndarray, scale: float, offsets: np.ndarray):
+        size = (max(1, int(round(reference.shape[1] * scale))), max(1, int(round(reference.shape[0] * scale))))
+        self.reference = cv2.resize(reference, size, interpolation=cv2.INTER_AREA) if scale != 1 else reference
+        self.height, self.width = self.reference.shape
+        self.sources = [(cv2.resize(image, size, interpolation=cv2.INTER_AREA) if scale != 1 else image, R, t)
+                        for image, R, t in sources]
+
+        # Pixel centres scale about the image corner
+        K = np.asarray(camera_matrix, dtype=np.float64).copy()
+        K[:2] *= scale
+        K[:2, 2] += 0.5 * scale - 0.5
+        self.K = K
+        self.K_inv = np.linalg.inv(K)
+
+        # Replicated border = patch samples clamped to the image
+        self.offsets = offsets
+        halo = int(np.abs(offsets).max())
+        self.padded = cv2.copyMakeBorder(self.reference, halo, halo, halo, halo, cv2.BORDER_REPLICATE)
+        self._patch_rows = (offsets[:, 1] + halo).astype(np.int32)
+        self._patch_cols = (offsets[:, 0] + halo).astype(np.int32)
+
+    def coordinates(self, index: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(columns, rows) of flat pixel indices."""
+        rows, cols = np.divmod(np.asarray(index, dtype=np.int32), np.int32(self.width))
+        return cols, rows
+
+    def rays(self, index: np.ndarray) -> np.ndarray:
+        """Viewing rays of flat pixel indices with unit z, so depth multiplies them directly."""
+        cols, rows = self.coordinates(index)
+        return np.column_stack([cols, rows, np.ones(len(cols))]) @ self.K_inv.T
+
+    def patches(self, index: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Zero-mean, unit-variance reference patches of flat pixel indices, and whether each is textured."""
+        cols, rows = self.coordinates(index)
+        patches = self.padded[rows[:, np.newaxis] + self._patch_rows, cols[:, np.newaxis] + self._patch_cols]
+        std = patches.std(axis=1, keepdims=True)
+        normalised = ((patches - patches.mean(axis=1, keepdims=True)) / np.maximum(std, 1e-3)).astype(np.float32)
+        return normalised, std.ravel() > 1e-3
+
+
+class PatchMatchMVS:
+    """CPU PatchMatch depth and normal estimation for one reference view at a time."""
+
+    def __init__(self, window_radius: int = 2, window_step: int = 2, n_sources: int = 4,
+                 best_sources: int = 2, downscale: int = 4, coarse_iterations: int = 6,
+                 fine_iterations: int = 2, refine_cost: float = 0.4, max_cost: float = 0.6,
+                 chunk_size: int = 16384, seed: int = 0):
+        """
+        Initialize PatchMatch MVS.
+
+        Args:
+            window_radius: Patch radius in samples
+            window_step: Pixel spacing between patch samples (dilated window)
+            n_sources: Neighbouring views compared with each reference view
+            best_sources: Number of best-matching source views averaged into the cost (occlusion robustness)
+            downscale: Size reduction of the first pass
+            coarse_iterations: Propagation iterations of the downscaled pass
+            fine_iterations: Propagation iterations at full resolution
+            refine_cost: Cost above which an upsampled pixel is optimised again at full resolution
+            max_cost: Pixels with a higher final cost (1 - NCC) get depth 0
+            chunk_size: Pixels evaluated per vectorized batch
+            seed: Random seed
+        """
+        self.window_radius = window_radius
+        self.window_step = window_step
+        self.n_sources = n_sources
+        self.best_sources = best_sources
+        self.downscale = max(1, downscale)
+        self.coarse_iterations = coarse_iterations
+        self.fine_iterations = fine_iterations
+        self.refine_cost = refine_cost
+        self.max_cost = max_cost
+        self.chunk_size = chunk_size
+        self.seed = seed
+
+        span = np.arange(-window_radius, window_radius + 1) * window_step
+        ox, oy = np.meshgrid(span, span)
+        self._offsets = np.column_stack([ox.ravel(), oy.ravel()])
+
+    @staticmethod
+    def select_sources(reference_view: int, poses: dict, count: int) -> List[int]:
+        """
+        Pick the registered views with the nearest camera centres as source views.
+
+        Args:
+            reference_view: Reference view index
+            poses: World-to-camera (R, t) of all registered views
+            count: Number of source views
+
+        Returns:
+            Source view indices, nearest first
+        """
+        centers = {v: (-R.T @ np.asarray(t).reshape(3, 1)).ravel() for v, (R, t) in poses.items()}
+        reference = centers[reference_view]
+        others = [v for v in poses if v != reference_view]
+        others.sort(key=lambda v: np.linalg.norm(centers[v] - reference))
+        return others[:count]
+
+    def _costs(self, level: _Level, index: np.ndarray, depth: np.ndarray, normal: np.ndarray,
+               reference_patches: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> np.ndarray:
+        """
+        Matching cost (1 - NCC, averaged over the best source views) of plane hypotheses.
+
+        reference_patches may hold level.patches(index) when several hypotheses of
+        the same pixels are scored; index must then fit in one chunk.
+        """
+        costs = np.full(len(index), 2.0, dtype=np.float32)
+        for start in range(0, len(index), self.chunk_size):
+            chunk = slice(start, start + self.chunk_size)
+            idx, d, n = index[chunk], depth[chunk], normal[chunk]
+            reference, textured = level.patches(idx) if reference_patches is None else reference_patches
+            valid = textured & (d > 0) & np.all(np.isfinite(n), axis=1)
+            if not np.any(valid):
+                continue
+            idx, d, n, reference = idx[valid], d[valid], n[valid], reference[valid]
+
+            # Plane n.X = d0 through the pixel's 3D point, in the reference camera frame
+            d0 = d * np.einsum('ij,ij->i', n, level.rays(idx))
+            cols, rows = level.coordinates(idx)
+            window_x = (cols[:, np.newaxis] + level.offsets[:, 0]).astype(np.float64)
+            window_y = (rows[:, np.newaxis] + level.offsets[:, 1]).astype(np.float64)
+
+            source_costs = []
+            for image, R, t in level.sources:
+                # Plane-induced homography H = Ks (R + t n^T / d0) Kr^-1 per pixel
+                H = R[np.newaxis] + (t.reshape(1, 3, 1) * n[:, np.newaxis, :]) / d0[:, np.newaxis, np.newaxis]
+                H = level.K @ H @ level.K_inv
+                # Apply each pixel's homography to its window with broadcasting (cheaper than batched matmul)
+                x, y, z = (H[:, i, 0:1] * window_x + H[:, i, 1:2] * window_y + H[:, i, 2:3] for i in range(3))
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    map_x = (x / z).astype(np.float32)
+                    map_y = (y / z).astype(np.float32)
+                map_x[z <= 0] = -1e4
+                sampled = cv2.remap(image, map_x, map_y, cv2.INTER_LINEAR,
+                                    borderMode=cv2.BORDER_CONSTANT, borderValue=np.nan)
+
+                centred = sampled - sampled.mean(axis=1, keepdims=True)
+                std = np.sqrt(np.mean(centred ** 2, axis=1))
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    ncc = np.mean(reference * centred, axis=1) / std
+                source_costs.append(np.where(np.isfinite(ncc), 1.0 - ncc, 2.0))
+
+            source_costs = np.sort(np.array(source_costs), axis=0)[:self.best_sources]
+            chunk_costs = costs[chunk]
+            chunk_costs[valid] = np.clip(source_costs.mean(axis=0), 0.0, 2.0)
+            costs[chunk] = chunk_costs
+        return costs
+
+    @staticmethod
+    def _face_camera(normal: np.ndarray, rays: np.ndarray) -> np.ndarray:
+        """Normalise normals and flip those pointing away from the camera."""
+        normal = normal / np.maximum(np.linalg.norm(normal, axis=1, keepdims=True), 1e-12)
+        flip = np.einsum('ij,ij->i', normal, rays) > 0
+        normal[flip] *= -1
+        return normal
+
+    def _propagate(self, level: _Level, depth: np.ndarray, normal: np.ndarray, cost: np.ndarray,
+                   active: np.ndarray, iterations: int, depth_range: Tuple[float, float],
+                   rng: np.random.Generator):
+        """Red-black PatchMatch iterations on the active pixels (arrays are updated in place)."""
+        h, w = level.height, level.width
+        rows, cols = np.divmod(np.arange(h * w, dtype=np.int32), np.int32(w))
+        colour = (rows + cols) % 2
+        near, far = depth_range
+
+        for iteration in range(iterations):
+            perturbation = 0.5 ** (iteration + 1)
+            for red in (0, 1):
+                index = np.flatnonzero(active & (colour == red))
+                if len(index) == 0:
+                    continue
+                r, c = rows[index], cols[index]
+                rays = level.rays(index)
+                best_depth, best_normal, best_cost = depth[index], normal[index], cost[index]
+                candidates = []
+
+                # Adopt the planes of neighbouring pixels
+                for dy, dx in _NEIGHBOURS:
+                    nr, nc = r + dy, c + dx
+                    inside = (nr >= 0) & (nr < h) & (nc >= 0) & (nc < w)
+                    neighbour = np.where(inside, nr * w + nc, index)
+                    n = normal[neighbour]
+                    point = depth[neighbour, np.newaxis] * level.rays(neighbour)
+                    with np.errstate(divide='ignore', invalid='ignore'):
+                        d = np.einsum('ij,ij->i', n, point) / np.einsum('ij,ij->i', n, rays)
+                    d = np.where(inside & (d >= near) & (d <= far), d, -1.0)
+                    candidates.append((d, n))
+
+                # Random refinement around the current hypothesis
+                d = best_depth * np.exp(rng.normal(0.0, 0.1 * perturbation, len(index)))
+                n = self._face_camera(best_normal + rng.normal(0.0, perturbation, best_normal.shape), rays)
+                candidates.append((np.clip(d, near, far), n))
+
+                # Every candidate is scored chunk by chunk against the same reference patches
+                for start in range(0, len(index), self.chunk_size):
+                    chunk = slice(start, start + self.chunk_size)
+                    reference_patches = level.patches(index[chunk])
+                    for d, n in candidates:
+                        c_cost = self._costs(level, index[chunk], d[chunk], n[chunk], reference_patches)
+                        better = c_cost < best_cost[chunk]
+                        best_depth[chunk] = np.where(better, d[chunk], best_depth[chunk])
+                        best_normal[chunk] = np.where(better[:, np.newaxis], n[chunk], best_normal[chunk])
+                        best_cost[chunk] = np.where(better, c_cost, best_cost[chunk])
+
+                depth[index], normal[index], cost[index] = best_depth, best_normal, best_cost
+
+    def compute_depth_map(self, reference: np.ndarray, sources: List[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+                          camera_matrix: np.ndarray, depth_range: Tuple[float, float]
+                          ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Estimate depth and normal maps of a reference view.
+
+        Args:
+            reference: Reference image
+            sources: (image, R, t) of each source view, with X_source = R X_reference + t
+            camera_matrix: 3x3 camera intrinsic matrix (shared by all views)
+            depth_range: (nearest, farthest) depth searched in the reference view
+
+        Returns:
+            Tuple of (depth map with 0 where unreliable, (H, W, 3) normal map, cost map)
+        """
+        rng = np.random.default_rng(self.seed)
+        gray = lambda image: (cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image).astype(np.float32)
+        reference = gray(reference)
+        sources = [(gray(image), np.asarray(R, np.float64), np.asarray(t, np.float64).reshape(3))
+                   for image, R, t in sources]
+        near, far = depth_range
+
+        # Downscaled pass over the whole view from random hypotheses (uniform in inverse depth)
+        coarse = _Level(reference, sources, camera_matrix, 1.0 / self.downscale, self._offsets)
+        count = coarse.height * coarse.width
+        depth = 1.0 / rng.uniform(1.0 / far, 1.0 / near, count)
+        normal = self._face_camera(rng.normal(size=(count, 3)), coarse.rays(np.arange(count)))
+        cost = self._costs(coarse, np.arange(count), depth, normal)
+        self._propagate(coarse, depth, normal, cost, np.ones(count, dtype=bool),
+                        self.coarse_iterations, depth_range, rng)
+
+        if self.downscale == 1:
+            fine, depth_map, normal_map = coarse, depth, normal
+        else:
+            # Upsample, then re-optimise only badly matched pixels and depth edges
+            fine = _Level(reference, sources, camera_matrix, 1.0, self._offsets)
+            size = (fine.width, fine.height)
+            depth_map = cv2.resize(depth.reshape(coarse.height, coarse.width).astype(np.float32), size,
+                                   interpolation=cv2.INTER_NEAREST)
+            normal_map = cv2.resize(normal.reshape(coarse.height, coarse.width, 3).astype(np.float32), size,
+                                    interpolation=cv2.INTER_NEAREST)
+            edges = cv2.morphologyEx(depth_map, cv2.MORPH_GRADIENT, np.ones((3, 3), np.uint8)) > 0.02 * depth_map
+            depth_map = depth_map.ravel().astype(np.float64)
+            count = fine.height * fine.width
+            normal_map = self._face_camera(normal_map.reshape(-1, 3).astype(np.float64), fine.rays(np.arange(count)))
+            cost = self._costs(fine, np.arange(count), depth_map, normal_map)
+            needed = (cost > self.refine_cost) | edges.ravel()
+            needed = cv2.dilate(needed.reshape(fine.height, fine.width).astype(np.uint8),
+                                np.ones((3, 3), np.uint8)).ravel().astype(bool)
+            self._propagate(fine, depth_map, normal_map, cost, needed, self.fine_iterations, depth_range, rng)
+
+        depth_map = np.where(cost <= self.max_cost, depth_map, 0.0)
+        shape = (fine.height, fine.width)
+        return (depth_map.reshape(shape).astype(np.float32), normal_map.reshape(shape + (3,)).astype(np.float32),
+                cost.reshape(shape))
+
+    @staticmethod
+    def depth_to_points(depth: np.ndarray, camera_matrix: np.ndarray, R: np.ndarray, t: np.ndarray,
+                        mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Back-project a depth map to world points.
+
+        Args:
+            depth: Depth map (0 = no depth)
+            camera_matrix: 3x3 camera intrinsic matrix
+            R: World-to-camera rotation of the view
+            t: World-to-camera translation of the view
+            mask: Optional extra mask of pixels to keep
+
+        Returns:
+            (N, 3) world points
+        """
+        valid = depth > 0
+        if mask is not None:
+            valid &= mask
+        rows, cols = np.nonzero(valid)
+        pixels = np.column_stack([cols, rows, np.ones(len(rows))])
+        camera_points = (pixels @ np.linalg.inv(camera_matrix).T) * depth[valid][:, np.newaxis]
+        return (camera_points - np.asarray(t).ravel()) @ np.asarray(R)
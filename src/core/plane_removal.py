@@ -0,0 +1,174 @@
+"""
+Support Plane Removal Module
+
+Finds the plane the object stands on - usually the reference grid - so its
+points can be dropped or labelled before outlier removal and meshing. When
+the plane is known (the grid frame's z = 0 in 'grid' mode) it is used
+directly; otherwise RANSAC is batched: all plane hypotheses are built from
+random point triples at once and scored against a point sample with a
+single matrix multiply, and the best plane is refitted to its inliers by
+least squares on the full cloud.
+
+A plane only counts as support when the object's bulk lies on one side of
+it, the cameras look at it from that same side, and - for a plane found by
+RANSAC - it reaches beyond the object's footprint. A face of the object
+itself fails these tests: the rest of the object lies behind it, away from
+the cameras that see it, and the face is no wider than the object.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+# What to do with points on the support plane
+PLANE_ACTIONS = ('remove', 'label')
+
+
+class SupportPlaneRemover:
+    """Support plane detection (known or batched RANSAC) with a below-the-object check."""
+
+    def __init__(self, action: str = "remove", threshold: Optional[float] = None,
+                 relative_threshold: float = 0.02, max_threshold: Optional[float] = None,
+                 hypotheses: int = 512, sample_size: int = 10000, min_inlier_ratio: float = 0.1,
+                 min_bulk_side: float = 0.8, min_footprint_ratio: float = 1.2, seed: Optional[int] = 0):
+        """
+        Initialize plane removal.
+
+        Args:
+            action: 'remove' drops the plane's points, 'label' only marks them
+            threshold: Point-to-plane distance of an inlier in scene units, or None to
+                derive it from the scene scale
+            relative_threshold: Inlier distance as a fraction of the median distance of the
+                points from their median (when threshold is None)
+            max_threshold: Upper bound on the derived inlier distance, or None
+            hypotheses: Planes sampled and scored in one batch
+            sample_size: Points the hypotheses are scored against
+            min_inlier_ratio: Smallest share of the cloud the plane must hold to count as a support plane
+            min_bulk_side: Smallest share of the off-plane points that must lie on the object's side
+            min_footprint_ratio: How much wider than the object's footprint a RANSAC plane must be
+            seed: Random seed for reproducible sampling (None = nondeterministic)
+        """
+        if action not in PLANE_ACTIONS:
+            raise ValueError(f"Unknown plane action: {action} (expected one of {PLANE_ACTIONS})")
+
+        self.action = action
+        self.threshold = threshold
+        self.relative_threshold = relative_threshold
+        self.max_threshold = max_threshold
+        self.hypotheses = hypotheses
+        self.sample_size = sample_size
+        self.min_inlier_ratio = min_inlier_ratio
+        self.min_bulk_side = min_bulk_side
+        self.min_footprint_ratio = min_footprint_ratio
+        self.seed = seed
+
+    def inlier_threshold(self, points: np.ndarray) -> float:
+        """Point-to-plane inlier distance for a cloud, from a scale that outliers do not inflate."""
+        if self.threshold is not None:
+            return self.threshold
+        scale = float(np.median(np.linalg.norm(points - np.median(points, axis=0), axis=1)))
+        threshold = self.relative_threshold * max(scale, 1e-12)
+        if self.max_threshold is not None:
+            threshold = min(threshold, self.max_threshold)
+        return threshold
+
+    def segment(self, points: np.ndarray, plane: Optional[np.ndarray] = None,
+                camera_centers: Optional[np.ndarray] = None) -> Tuple[Optional[np.ndarray], np.ndarray]:
+        """
+        Find the support plane and the points on it.
+
+        Args:
+            points: (N, 3) points
+            plane: Known support plane (a, b, c, d), or None to search for one with RANSAC
+            camera_centers: Optional (V, 3) camera centres; the cameras must view the plane
+                from the object's side
+
+        Returns:
+            Tuple of (plane (a, b, c, d) with unit normal, or None if no plane passes
+            the support tests; (N,) True for points on the plane)
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        no_plane = (None, np.zeros(len(points), dtype=bool))
+        if len(points) < 3:
+            return no_plane
+
+        threshold = self.inlier_threshold(points)
+        known = plane is not None
+        if known:
+            plane = np.asarray(plane, dtype=np.float64)
+            plane = plane / np.linalg.norm(plane[:3])
+        else:
+            plane = self._ransac(points, threshold)
+            if plane is None:
+                return no_plane
+        on_plane = np.abs(points @ plane[:3] + plane[3]) < threshold
+
+        reason = self._reject_reason(points, plane, on_plane, camera_centers, check_footprint=not known)
+        if reason is not None:
+            print(f"Support plane: none ({reason})")
+            return no_plane
+
+        print(f"Support plane: {np.count_nonzero(on_plane)}/{len(points)} points within "
+              f"{threshold:.4g} of normal {np.round(plane[:3], 3)} ({self.action})")
+        return plane, on_plane
+
+    def _ransac(self, points: np.ndarray, threshold: float) -> Optional[np.ndarray]:
+        """Best plane of a batch of random hypotheses, refitted to its inliers."""
+        rng = np.random.default_rng(self.seed)
+
+        # All hypotheses at once: one random triple per plane
+        triples = points[rng.integers(0, len(points), (self.hypotheses, 3))]
+        normals = np.cross(triples[:, 1] - triples[:, 0], triples[:, 2] - triples[:, 0])
+        lengths = np.linalg.norm(normals, axis=1)
+        valid = lengths > 1e-12
+        if not np.any(valid):
+            return None
+        normals = normals[valid] / lengths[valid, np.newaxis]
+        planes = np.hstack([normals, -np.sum(normals * triples[valid, 0], axis=1, keepdims=True)])
+
+        # Score every hypothesis against the sample with one matrix multiply: (S, 4) @ (4, H)
+        sample = points[rng.choice(len(points), min(self.sample_size, len(points)), replace=False)]
+        homogeneous = np.hstack([sample, np.ones((len(sample), 1))]).astype(np.float32)
+        scores = np.count_nonzero(np.abs(homogeneous @ planes.T.astype(np.float32)) < threshold, axis=0)
+        plane = planes[np.argmax(scores)]
+
+        # Least-squares refit to the inliers of the full cloud
+        on_plane = np.abs(points @ plane[:3] + plane[3]) < threshold
+        if np.count_nonzero(on_plane) >= 3:
+            inliers = points[on_plane]
+            center = inliers.mean(axis=0)
+            normal = np.linalg.svd(inliers - center, full_matrices=False)[2][-1]
+            plane = np.append(normal, -normal @ center)
+        return plane
+
+    def _reject_reason(self, points: np.ndarray, plane: np.ndarray, on_plane: np.ndarray,
+                       camera_centers: Optional[np.ndarray], check_footprint: bool) -> Optional[str]:
+        """Why a plane is not the object's support, or None if it is."""
+        ratio = np.count_nonzero(on_plane) / len(points)
+        if ratio < self.min_inlier_ratio:
+            return f"best plane holds {ratio:.0%} of the points"
+        bulk = points[~on_plane]
+        if len(bulk) == 0:
+            return "no points off the plane"
+
+        # The object's bulk must stand on one side of the plane
+        signed = bulk @ plane[:3] + plane[3]
+        side = 1.0 if np.count_nonzero(signed > 0) >= len(signed) / 2 else -1.0
+        share = np.count_nonzero(signed * side > 0) / len(signed)
+        if share < self.min_bulk_side:
+            return f"only {share:.0%} of the object lies on one side of the plane"
+
+        # ... which is the side the cameras look from
+        if camera_centers is not None and len(camera_centers) > 0:
+            camera_side = np.asarray(camera_centers, dtype=np.float64).reshape(-1, 3) @ plane[:3] + plane[3]
+            if np.count_nonzero(camera_side * side > 0) < len(camera_side) / 2:
+                return "the cameras view the plane from behind the object"
+
+        # A support plane reaches beyond the object's footprint; a face of the object does not
+        if check_footprint:
+            center = np.median(bulk, axis=0)
+            spread = lambda p: np.percentile(np.linalg.norm(np.cross(p - center, plane[:3]), axis=1), 90)
+            footprint = spread(bulk)
+            if spread(points[on_plane]) < self.min_footprint_ratio * footprint:
+                return "the plane is no wider than the object"
+        return None
@@ -0,0 +1,115 @@
+"""
+Triangulated Point Filter Module
+
+Rejects badly triangulated points right after triangulation, before the
+much costlier statistical outlier removal. For all points at once it
+computes the depth in every observing camera (cheirality), the
+reprojection error in every view and the parallax - the widest angle
+between two viewing rays - with one batched projection. Each rejected point
+is counted under the first test it fails, so the counts form a rejection
+histogram that shows which threshold is doing the work.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from .triangulation import camera_centers
+
+# Rejection reasons in the order they are tested
+REJECTION_REASONS = ('non_finite', 'behind_camera', 'reprojection', 'parallax', 'depth_range')
+
+
+class TriangulationFilter:
+    """Vectorized cheirality, reprojection-error and parallax filter for triangulated points."""
+
+    def __init__(self, max_reprojection_error: float = 2.0, min_parallax: float = 1.0,
+                 min_depth: float = 0.0, max_depth: Optional[float] = None):
+        """
+        Initialize the filter.
+
+        Args:
+            max_reprojection_error: Largest reprojection error in pixels allowed in any view
+            min_parallax: Smallest angle in degrees between two viewing rays of a point
+            min_depth: Depth a point must exceed in every view (0 = in front of the camera)
+            max_depth: Largest depth allowed in any view, or None for no limit
+        """
+        self.max_reprojection_error = max_reprojection_error
+        self.min_parallax = min_parallax
+        self.min_depth = min_depth
+        self.max_depth = max_depth
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset the rejection histogram."""
+        self.stats = {'points': 0, 'kept': 0}
+        self.stats.update({reason: 0 for reason in REJECTION_REASONS})
+
+    @staticmethod
+    def evaluate(points: np.ndarray, projection_matrices: np.ndarray, points_2d: np.ndarray
+                 ) -> Dict[str, np.ndarray]:
+        """
+        Depth, reprojection error and parallax of points seen in every view.
+
+        Args:
+            points: (N, 3) triangulated points
+            projection_matrices: (V, 3, 4) projection matrices K [R | t]
+            points_2d: (V, N, 2) observed pixel coordinates of each point in each view
+
+        Returns:
+            Dict with 'depth' (V, N), 'error' (V, N) in pixels and 'parallax' (N,) in degrees
+        """
+        P = np.asarray(projection_matrices, dtype=np.float64)
+        points = np.asarray(points, dtype=np.float64)
+        homogeneous = np.hstack([points, np.ones((len(points), 1))])
+
+        # All views at once: (V, 3, 4) @ (4, N) -> (V, 3, N)
+        projected = P @ homogeneous.T
+        depth = projected[:, 2]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pixels = projected[:, :2] / depth[:, np.newaxis]
+            error = np.linalg.norm(pixels.transpose(0, 2, 1) - points_2d, axis=2)
+
+            rays = points[np.newaxis] - camera_centers(P)[:, np.newaxis, :]
+            rays /= np.linalg.norm(rays, axis=2, keepdims=True)
+        cosines = np.einsum('vni,wni->nvw', rays, rays).reshape(len(points), -1)
+        parallax = np.degrees(np.arccos(np.clip(np.min(cosines, axis=1), -1.0, 1.0)))
+        return {'depth': depth, 'error': error, 'parallax': parallax}
+
+    def filter(self, points: np.ndarray, projection_matrices: np.ndarray, points_2d: np.ndarray) -> np.ndarray:
+        """
+        Keep mask for triangulated points; rejections are added to self.stats.
+
+        Args:
+            points: (N, 3) triangulated points
+            projection_matrices: (V, 3, 4) projection matrices K [R | t]
+            points_2d: (V, N, 2) observed pixel coordinates of each point in each view
+
+        Returns:
+            (N,) boolean mask of the points that pass every test
+        """
+        measures = self.evaluate(points, projection_matrices, points_2d)
+        depth = measures['depth']
+        tests = {
+            'non_finite': np.all(np.isfinite(points), axis=1),
+            'behind_camera': np.all(depth > self.min_depth, axis=0),
+            'reprojection': np.all(measures['error'] < self.max_reprojection_error, axis=0),
+            'parallax': measures['parallax'] >= self.min_parallax,
+            'depth_range': (np.all(depth < self.max_depth, axis=0) if self.max_depth is not None
+                            else np.ones(len(points), dtype=bool))
+        }
+
+        keep = np.ones(len(points), dtype=bool)
+        for reason in REJECTION_REASONS:
+            failed = keep & ~tests[reason]
+            self.stats[reason] += int(np.count_nonzero(failed))
+            keep &= ~failed
+
+        self.stats['points'] += len(points)
+        self.stats['kept'] += int(np.count_nonzero(keep))
+        return keep
+
+    def summary(self) -> str:
+        """Human-readable rejection histogram."""
+        rejected = ", ".join(f"{reason.replace('_', ' ')} {self.stats[reason]}" for reason in REJECTION_REASONS)
+        return f"kept {self.stats['kept']}/{self.stats['points']} points (rejected: {rejected})"
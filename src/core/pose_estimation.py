@@ -0,0 +1,185 @@
+"""
+Robust Pose Estimation Module
+
+Essential-matrix estimation with a choice of OpenCV robust estimators
+(classic RANSAC, LMedS or the USAC family including MAGSAC++ and PROSAC).
+Each pair first gets a short probe whose budget suffices for a clean pair;
+the adaptive estimators stop even earlier once the observed inlier ratio
+allows. Pairs that pass the minimum inlier ratio are done after the probe,
+clearly hopeless ones are rejected right there, and only ambiguous pairs get
+the full budget derived from the minimum ratio. recoverPose only sees the
+inliers. Every pair's inlier ratio, iteration count and time are recorded
+for throughput tuning.
+"""
+
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .features import Features, Matches
+
+# Robust estimators by name; PROSAC samples the best-scoring matches first
+ESTIMATORS = {
+    'ransac': cv2.RANSAC,
+    'lmeds': cv2.LMEDS,
+    'usac': cv2.USAC_DEFAULT,
+    'magsac': cv2.USAC_MAGSAC,
+    'prosac': cv2.USAC_PROSAC,
+    'accurate': cv2.USAC_ACCURATE,
+    'fast': cv2.USAC_FAST
+}
+
+# Points per minimal essential-matrix sample (five-point solver)
+_SAMPLE_SIZE = 5
+
+
+def required_iterations(inlier_ratio: float, confidence: float, max_iterations: int) -> int:
+    """
+    Hypotheses needed to draw one all-inlier sample with the given confidence.
+
+    Args:
+        inlier_ratio: Fraction of matches that are inliers
+        confidence: Required probability of drawing an all-inlier sample
+        max_iterations: Upper bound on the result
+
+    Returns:
+        Iteration count, between 1 and max_iterations
+    """
+    good_sample = inlier_ratio ** _SAMPLE_SIZE
+    if good_sample >= 1.0:
+        return 1
+    if good_sample <= 0.0:
+        return max_iterations
+    iterations = np.log(1.0 - confidence) / np.log(1.0 - good_sample)
+    return int(min(max_iterations, max(1, np.ceil(iterations))))
+
+
+class RobustPoseEstimator:
+    """Relative pose from matches with a configurable robust essential-matrix estimator."""
+
+    def __init__(self, method: str = "magsac", threshold: float = 1.0, confidence: float = 0.999,
+                 max_iterations: int = 1000, min_inlier_ratio: float = 0.25, min_inliers: int = 15,
+                 probe_inlier_ratio: float = 0.5, fail_fast_ratio: float = 0.5):
+        """
+        Initialize the estimator.
+
+        Args:
+            method: Estimator name (see ESTIMATORS)
+            threshold: Inlier threshold in pixels (maximum noise scale for MAGSAC++)
+            confidence: Required confidence of the result
+            max_iterations: Hard cap on hypotheses per pair
+            min_inlier_ratio: Lowest inlier ratio of a usable pair; sets the full iteration budget
+            min_inliers: Fewest inliers a usable pair must have
+            probe_inlier_ratio: Inlier ratio the probe's budget is sized for
+            fail_fast_ratio: Pairs whose probe finds less than this fraction of
+                min_inlier_ratio are rejected without the full run
+        """
+        if method not in ESTIMATORS:
+            raise ValueError(f"Unknown pose estimator: {method} (expected one of {tuple(ESTIMATORS)})")
+
+        self.method = method
+        self.threshold = threshold
+        self.confidence = confidence
+        self.max_iterations = max_iterations
+        self.min_inlier_ratio = min_inlier_ratio
+        self.min_inliers = min_inliers
+        self.probe_inlier_ratio = probe_inlier_ratio
+        self.fail_fast_ratio = fail_fast_ratio
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Forget the recorded pairs."""
+        # One entry per estimated pair: matches, inliers, inlier_ratio, estimated_iterations, time, accepted
+        self.history = []
+
+    @property
+    def iteration_budget(self) -> int:
+        """Hypotheses allowed per pair: enough for a pair at the minimum inlier ratio."""
+        return required_iterations(self.min_inlier_ratio, self.confidence, self.max_iterations)
+
+    def estimate(self, features1: Features, features2: Features, matches: Matches,
+                 camera_matrix: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Estimate the pose of the second view relative to the first.
+
+        Args:
+            features1: Features from first image
+            features2: Features from second image
+            matches: Feature matches between images
+            camera_matrix: 3x3 camera intrinsic matrix
+
+        Returns:
+            Tuple of (R, t, inlier mask over the matches), or None if the pair
+            has too few inliers for a reliable pose
+        """
+        start = time.perf_counter()
+        record = {'matches': len(matches), 'inliers': 0, 'inlier_ratio': 0.0,
+                  'estimated_iterations': 0, 'time': 0.0, 'accepted': False}
+        self.history.append(record)
+        if len(matches) < max(_SAMPLE_SIZE, self.min_inliers):
+            return None
+
+        order = np.arange(len(matches))
+        if self.method == 'prosac':
+            order = np.argsort(matches.distances, kind='stable')
+        pts1 = features1.points[matches.query_idx[order]].astype(np.float64)
+        pts2 = features2.points[matches.train_idx[order]].astype(np.float64)
+        camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+
+        probe = required_iterations(self.probe_inlier_ratio, self.confidence, self.max_iterations)
+        E, inliers, estimated = self._run(pts1, pts2, order, camera_matrix, probe)
+        ratio = np.count_nonzero(inliers) / len(matches)
+        if self.fail_fast_ratio * self.min_inlier_ratio <= ratio < self.min_inlier_ratio:
+            # Ambiguous after the probe: spend the full budget before deciding
+            E, inliers, more = self._run(pts1, pts2, order, camera_matrix, self.iteration_budget)
+            ratio = np.count_nonzero(inliers) / len(matches)
+            estimated += more
+        record.update(inliers=int(np.count_nonzero(inliers)), inlier_ratio=float(ratio),
+                      estimated_iterations=estimated)
+
+        if ratio < self.min_inlier_ratio or np.count_nonzero(inliers) < self.min_inliers:
+            record['time'] = time.perf_counter() - start
+            return None
+
+        # Cheirality check on the inliers only
+        chosen = inliers[order]
+        _, R, t, pose_mask = cv2.recoverPose(E, pts1[chosen], pts2[chosen], camera_matrix)
+        inliers[order[chosen]] = pose_mask.ravel() > 0
+
+        record.update(time=time.perf_counter() - start, accepted=True)
+        return R, t, inliers
+
+    def _run(self, pts1: np.ndarray, pts2: np.ndarray, order: np.ndarray, camera_matrix: np.ndarray,
+             budget: int) -> Tuple[Optional[np.ndarray], np.ndarray, int]:
+        """
+        One estimator run.
+
+        OpenCV does not report how many hypotheses it drew, so the returned
+        count is estimated: the adaptive stopping bound required_iterations()
+        gives for the inlier ratio the run found, capped at the budget (the
+        whole budget when no model was found). Non-adaptive estimators such
+        as LMedS may have drawn more.
+
+        Returns:
+            Tuple of (E, inlier mask in match order, estimated iterations)
+        """
+        E, mask = cv2.findEssentialMat(pts1, pts2, camera_matrix, method=ESTIMATORS[self.method],
+                                       prob=self.confidence, threshold=self.threshold, maxIters=budget)
+        inliers = np.zeros(len(order), dtype=bool)
+        if E is None or mask is None or E.shape != (3, 3):
+            return None, inliers, budget
+        inliers[order] = mask.ravel() > 0
+        return E, inliers, required_iterations(np.count_nonzero(inliers) / len(order), self.confidence, budget)
+
+    def summary(self) -> str:
+        """Human-readable totals over the recorded pairs."""
+        if not self.history:
+            return "no pairs estimated"
+        accepted = [r for r in self.history if r['accepted']]
+        ratios = [r['inlier_ratio'] for r in accepted]
+        return (f"{self.method}: {len(accepted)}/{len(self.history)} pairs accepted, "
+                f"~{sum(r['estimated_iterations'] for r in self.history)} iterations (estimated) in "
+                f"{sum(r['time'] for r in self.history):.2f}s, "
+                f"median inlier ratio {np.median(ratios) if ratios else 0.0:.2f}")
@@ -5,8 +5,10 @@ Implements algorithms for reconstructing 3D point clouds and meshes from multipl
 """
 
 import cv2
+import itertools
 import numpy as np
-from typing import List, Tuple, Optional, Dict
+from typing import List, Tuple, Optional, Dict, Iterator
+from concurrent.futures import ProcessPoolExecutor
 import scipy.spatial.distance as distance
 
 # Try to import Open3D, fall back to alternative implementation
@@ -19,12 +21,126 @@ except ImportError:
     print("Open3D not available, using fallback reconstruction methods")
     from .reconstruction_fallback import create_reconstruction_engine
 
+from .feature_cache import FeatureStore, image_key
+from .features import Features, Matches, create_detector, FEATURE_BACKENDS, BINARY_BACKENDS
+from .matching import FeatureMatcher, fundamental_from_pose
+from .pose_estimation import RobustPoseEstimator
+from .point_filter import TriangulationFilter
+from .voxel_accumulator import VoxelAccumulator
+from .coloring import PointColorizer
+from .plane_removal import SupportPlaneRemover
+from .sfm import IncrementalSfM
+from .bundle_adjustment import BundleAdjuster
+from .grid_calibration import GridDetector
+from .turntable import TurntableModel
+from .dense_stereo import DenseStereo
+from .patchmatch import PatchMatchMVS
+from .visual_hull import VisualHull
+from .fusion import DepthMapFusion, depth_map_from_points, scaled_camera_matrix
+
+# Feature detectors of the current pool worker process, by backend name
+_worker_detectors = {}
+
+def _init_feature_worker():
+    """Keep OpenCV single-threaded inside pool workers to avoid oversubscribing cores."""
+    cv2.setNumThreads(1)
+
+def _detect_features_worker(image: np.ndarray, backend: str, mask: Optional[np.ndarray] = None) -> Features:
+    """Run feature detection in a pool worker and return picklable features."""
+    if backend not in _worker_detectors:
+        _worker_detectors[backend] = create_detector(backend)
+    
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
+    keypoints, descriptors = _worker_detectors[backend].detectAndCompute(gray, mask)
+    return Features.from_keypoints(keypoints, descriptors)
+
 class StereoReconstructor:
     """Handles 3D reconstruction from stereo image pairs."""
     
-    def __init__(self):
-        """Initialize stereo reconstruction parameters."""
+    def __init__(self, feature_store: Optional[FeatureStore] = None, n_workers: int = 1,
+                 feature_backend: str = "sift", matcher_method: Optional[str] = None):
+        """
+        Initialize stereo reconstruction parameters.
+        
+        Args:
+            feature_store: Cache for detected features (defaults to an in-memory store)
+            n_workers: Number of processes used for feature extraction (1 = serial)
+            feature_backend: Feature detector ('sift', or binary 'orb' / 'akaze' for fast previews)
+            matcher_method: Descriptor matching method (None picks 'flann' for SIFT, 'lsh' for binary)
+        """
         self.calibration_data = None
+        self.feature_store = feature_store if feature_store is not None else FeatureStore()
+        self.n_workers = max(1, n_workers)
+        self.sfm = None
+        # Essential-matrix estimator behind estimate_pose (method, thresholds, per-pair statistics)
+        self.pose_estimator = RobustPoseEstimator()
+        # Cheirality, reprojection and parallax checks on pairwise triangulations (None = keep finite points)
+        self.point_filter = TriangulationFilter()
+        # Streaming voxel merge of the pairwise clouds (None = stack every pair's points)
+        self.accumulator = VoxelAccumulator()
+        # Multi-view colour sampling of the reconstructed points (None = uncoloured clouds)
+        self.colorizer = PointColorizer()
+        # RGB colours (0-255) of the points handed to outlier removal, or None
+        self.point_colors = None
+        # Detection of the grid/support plane before outlier removal (None = keep its points)
+        self.plane_remover = SupportPlaneRemover()
+        # Modes the plane stage runs in: 'grid' knows its plane (z = 0), other modes search with RANSAC
+        self.plane_modes = ('grid',)
+        # Plane (a, b, c, d) found in the last reconstruction, and with the 'label'
+        # action the on-plane flag of each point of the returned cloud
+        self.support_plane = None
+        self.plane_mask = None
+        # Global refinement after pose chaining (set to None to skip)
+        self.bundle_adjuster = BundleAdjuster()
+        # Retrieval of non-adjacent partner views for loop closures and
+        # re-registration after tracking loss (e.g. ImageRetrieval(top_k=5); None = adjacent pairs only)
+        self.retrieval = None
+        # Band half-width in pixels for epipolar-guided re-matching of posed pairs (None to skip)
+        self.epipolar_band = 2.0
+        # Inner corners (columns, rows) of the reference grid used by the 'grid' mode
+        self.grid_pattern = (9, 6)
+        # Consecutive pairs used to fit the 'turntable' mode's axis; the fitted model is kept here
+        self.turntable_seed_pairs = 3
+        self.turntable = None
+        # Foreground masks restricting feature detection to the object (e.g. ForegroundMasker(); None = whole image)
+        self.masker = None
+        # Octree space carving of the 'hull' mode (needs self.masker); (centres, edge lengths) of its kept voxels
+        self.visual_hull = VisualHull()
+        self.hull_voxels = None
+        # Image scale of the 'pyramid' mode's coarse matching and pose pass
+        self.pyramid_scale = 0.25
+        # Dense modes: SGBM on consecutive views / PatchMatch MVS per view, posed by the given sparse mode
+        self.dense_stereo = DenseStereo()
+        self.mvs = PatchMatchMVS()
+        self.dense_pose_mode = "incremental"
+        # Depth and normal map of each view from the last 'mvs' reconstruction, kept only with
+        # keep_depth_maps (memory then grows with the number of views)
+        self.keep_depth_maps = False
+        self.depth_maps = {}
+        # Multi-view consistency fusion of the dense modes' depth maps (None = concatenate every depth map)
+        self.fusion = DepthMapFusion()
+        self.set_feature_backend(feature_backend, matcher_method)
+    
+    def set_feature_backend(self, feature_backend: str = "sift", matcher_method: Optional[str] = None):
+        """
+        Select the feature detector and matching method.
+        
+        Args:
+            feature_backend: 'sift', 'orb' or 'akaze'
+            matcher_method: 'flann' for SIFT; 'lsh' or 'bruteforce' for ORB/AKAZE (None picks the default)
+        """
+        if feature_backend not in FEATURE_BACKENDS:
+            raise ValueError(f"Unknown feature backend: {feature_backend} (expected one of {FEATURE_BACKENDS})")
+        
+        is_binary = feature_backend in BINARY_BACKENDS
+        if matcher_method is None:
+            matcher_method = "lsh" if is_binary else "flann"
+        if is_binary != (matcher_method != "flann"):
+            raise ValueError(f"Matcher '{matcher_method}' does not support {feature_backend} descriptors")
+        
+        self.feature_backend = feature_backend
+        self.matcher = FeatureMatcher(matcher_method)
+        self._detector = None
         
     def load_calibration(self, calibration: Dict):
         """Load camera calibration data."""
@@ -40,111 +156,184 @@ class StereoReconstructor:
         else:
             self.calibration_data = calibration
     
-    def detect_features(self, image: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    def detect_features(self, image: np.ndarray) -> Features:
         """
-        Detect keypoints and descriptors in image using SIFT.
+        Detect keypoints and descriptors in image with the selected backend.
+        
+        Results are served from the feature store when the same image content
+        has already been processed. With self.masker set, only the image's
+        foreground is searched for keypoints.
         
         Args:
             image: Input image
             
         Returns:
-            Tuple of (keypoints, descriptors)
+            Keypoint coordinates and descriptors
         """
+        mask = self._feature_mask(image)
+        key = self._feature_key(image, mask)
+        cached = self.feature_store.get(key)
+        if cached is not None:
+            cached.key = key
+            return cached
+        
         # Convert to grayscale if needed
         if len(image.shape) == 3:
             gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         else:
             gray = image
         
-        # Initialize SIFT detector
-        sift = cv2.SIFT_create()
+        # Create the detector once and reuse it
+        if self._detector is None:
+            self._detector = create_detector(self.feature_backend)
         
         # Detect keypoints and compute descriptors
-        keypoints, descriptors = sift.detectAndCompute(gray, None)
+        keypoints, descriptors = self._detector.detectAndCompute(gray, mask)
         
-        return keypoints, descriptors
+        features = Features.from_keypoints(keypoints, descriptors)
+        features.key = key
+        self.feature_store.put(key, features)
+        return features
+    
+    def _feature_mask(self, image: np.ndarray) -> Optional[np.ndarray]:
+        """Foreground mask for feature detection (None = whole image)."""
+        if self.masker is None:
+            return None
+        return self.masker.compute_mask(image)
+    
+    def _feature_key(self, image: np.ndarray, mask: Optional[np.ndarray]) -> str:
+        """Feature store key of an image, distinguishing masked detections."""
+        if mask is None:
+            return image_key(image, self.feature_backend)
+        return image_key(image, f"{self.feature_backend}_mask{image_key(mask, '')[:12]}")
+    
+    def iter_features(self, images: List[np.ndarray]) -> Iterator[Features]:
+        """
+        Extract features for all images, fanning detection out to a process pool.
+        
+        Images already in the feature store are not re-detected. Results are
+        yielded in input order as soon as each one is ready, so consumers can
+        start matching while later images are still being processed.
+        
+        Args:
+            images: List of input images
+            
+        Yields:
+            Features for each image in order
+        """
+        if self.n_workers <= 1 or len(images) < 2:
+            for image in images:
+                yield self.detect_features(image)
+            return
+        
+        masks = [self._feature_mask(image) for image in images]
+        keys = [self._feature_key(image, mask) for image, mask in zip(images, masks)]
+        cached = [self.feature_store.get(key) for key in keys]
+        pending = [i for i, entry in enumerate(cached) if entry is None]
+        
+        for key, entry in zip(keys, cached):
+            if entry is not None:
+                entry.key = key
+        
+        if not pending:
+            yield from cached
+            return
+        
+        with ProcessPoolExecutor(max_workers=min(self.n_workers, len(pending)),
+                                 initializer=_init_feature_worker) as executor:
+            futures = {i: executor.submit(_detect_features_worker, images[i], self.feature_backend, masks[i])
+                       for i in pending}
+            
+            for i, entry in enumerate(cached):
+                if entry is None:
+                    entry = futures.pop(i).result()
+                    entry.key = keys[i]
+                    self.feature_store.put(keys[i], entry)
+                cached[i] = None
+                yield entry
     
     def match_features(self, desc1: np.ndarray, desc2: np.ndarray, 
-                      ratio_threshold: float = 0.7) -> List[cv2.DMatch]:
+                      ratio_threshold: float = 0.7,
+                      key1: Optional[str] = None, key2: Optional[str] = None) -> Matches:
         """
-        Match features between two images using FLANN matcher.
+        Match features between two images (FLANN KD-tree for SIFT, LSH or
+        brute-force Hamming for binary descriptors).
+        
+        When image keys are given, the index trained for an image is reused
+        for every pair that image takes part in (see self.matcher.stats for
+        index build vs. query time).
         
         Args:
             desc1: Descriptors from first image
             desc2: Descriptors from second image
             ratio_threshold: Lowe's ratio test threshold
+            key1: Cache key of the first image
+            key2: Cache key of the second image
             
         Returns:
-            List of good matches
+            Matches that pass the ratio test
         """
-        # FLANN parameters
-        FLANN_INDEX_KDTREE = 1
-        index_params = dict(algorithm=FLANN_INDEX_KDTREE, trees=5)
-        search_params = dict(checks=50)
-        
-        # Initialize FLANN matcher
-        flann = cv2.FlannBasedMatcher(index_params, search_params)
+        return self.matcher.match(desc1, desc2, ratio_threshold, key1=key1, key2=key2)
+    
+    def match_guided(self, features1: Features, features2: Features,
+                     R: np.ndarray, t: np.ndarray) -> Matches:
+        """
+        Re-match a pair along the epipolar lines of its known relative pose.
         
-        # Find matches
-        matches = flann.knnMatch(desc1, desc2, k=2)
+        Only keypoints within self.epipolar_band pixels of each epipolar line
+        are compared, which typically recovers more matches than the
+        unconstrained search at a fraction of its cost.
         
-        # Apply Lowe's ratio test
-        good_matches = []
-        for match_pair in matches:
-            if len(match_pair) == 2:
-                m, n = match_pair
-                if m.distance < ratio_threshold * n.distance:
-                    good_matches.append(m)
+        Args:
+            features1: Features from first image
+            features2: Features from second image
+            R: Rotation from the first to the second camera
+            t: Translation from the first to the second camera
+            
+        Returns:
+            Matches along the epipolar lines
+        """
+        if self.calibration_data is None:
+            raise ValueError("Camera calibration data not loaded")
         
-        return good_matches
+        fundamental = fundamental_from_pose(self.calibration_data['camera_matrix'], R, t)
+        return self.matcher.match_guided(features1, features2, fundamental, max_distance=self.epipolar_band)
     
-    def estimate_pose(self, kp1: List, kp2: List, matches: List[cv2.DMatch]) -> Tuple[np.ndarray, np.ndarray]:
+    def estimate_pose(self, features1: Features, features2: Features,
+                      matches: Matches) -> Optional[Tuple[np.ndarray, np.ndarray]]:
         """
         Estimate relative pose between two camera views.
         
+        Uses self.pose_estimator; its per-pair inlier ratios, iteration counts
+        and times are kept in self.pose_estimator.history.
+        
         Args:
-            kp1: Keypoints from first image
-            kp2: Keypoints from second image
+            features1: Features from first image
+            features2: Features from second image
             matches: Feature matches between images
             
         Returns:
-            Tuple of (rotation_matrix, translation_vector)
+            Tuple of (rotation_matrix, translation_vector), or None if the pair
+            has too low an inlier ratio for a reliable pose
         """
         if self.calibration_data is None:
             raise ValueError("Camera calibration data not loaded")
         
-        # Extract matched point coordinates
-        pts1 = np.float32([kp1[m.queryIdx].pt for m in matches]).reshape(-1, 1, 2)
-        pts2 = np.float32([kp2[m.trainIdx].pt for m in matches]).reshape(-1, 1, 2)
-        
-        # Find essential matrix
-        camera_matrix = np.array(self.calibration_data['camera_matrix'], dtype=np.float64)
-        dist_coeffs = np.array(self.calibration_data['distortion_coefficients'], dtype=np.float64).reshape(-1)
-        
-        # Extract focal length and principal point
-        focal = camera_matrix[0, 0]
-        pp = (camera_matrix[0, 2], camera_matrix[1, 2])
-        
-        E, mask = cv2.findEssentialMat(pts1, pts2, 
-                                       focal=focal, 
-                                       pp=pp,
-                                       method=cv2.RANSAC, 
-                                       prob=0.999, 
-                                       threshold=1.0)
-        
-        # Recover pose from essential matrix
-        _, R, t, mask = cv2.recoverPose(E, pts1, pts2, camera_matrix)
-        
+        result = self.pose_estimator.estimate(features1, features2, matches,
+                                              self.calibration_data['camera_matrix'])
+        if result is None:
+            return None
+        R, t, _ = result
         return R, t
     
-    def triangulate_points(self, kp1: List, kp2: List, matches: List[cv2.DMatch], 
+    def triangulate_points(self, features1: Features, features2: Features, matches: Matches, 
                           R: np.ndarray, t: np.ndarray) -> np.ndarray:
         """
         Triangulate 3D points from matched features.
         
         Args:
-            kp1: Keypoints from first image
-            kp2: Keypoints from second image
+            features1: Features from first image
+            features2: Features from second image
             matches: Feature matches
             R: Rotation matrix between views
             t: Translation vector between views
@@ -162,8 +351,8 @@ class StereoReconstructor:
         P2 = camera_matrix @ np.hstack([R, t])
         
         # Extract matched points
-        pts1 = np.float32([kp1[m.queryIdx].pt for m in matches]).T
-        pts2 = np.float32([kp2[m.trainIdx].pt for m in matches]).T
+        pts1 = features1.points[matches.query_idx].T
+        pts2 = features2.points[matches.train_idx].T
         
         # Triangulate points
         points_4d = cv2.triangulatePoints(P1, P2, pts1, pts2)
@@ -173,12 +362,21 @@ class StereoReconstructor:
         
         return points_3d.T
     
-    def reconstruct_from_images(self, images: List[np.ndarray]) -> Optional['o3d.geometry.PointCloud']:
+    def reconstruct_from_images(self, images: List[np.ndarray],
+                                mode: str = "pairwise") -> Optional['o3d.geometry.PointCloud']:
         """
         Reconstruct 3D point cloud from multiple images.
         
         Args:
             images: List of input images
+            mode: 'pairwise' triangulates each consecutive pair in its own camera frame;
+                  'incremental' chains all views into one global frame (see self.sfm);
+                  'grid' takes metric poses from the reference grid in each image;
+                  'turntable' constrains all views to rotations about one axis (see self.turntable);
+                  'pyramid' runs 'incremental' on downscaled images and refines the tracks at full resolution;
+                  'dense' runs SGBM stereo on consecutive views posed by self.dense_pose_mode;
+                  'mvs' estimates a PatchMatch depth map per view from its nearest posed views;
+                  'hull' carves the visual hull of the masked object (self.masker) in views posed by self.dense_pose_mode
             
         Returns:
             Open3D point cloud if available, or None
@@ -190,59 +388,702 @@ class StereoReconstructor:
         if len(images) < 2:
             raise ValueError("Need at least 2 images for reconstruction")
         
+        # Multi-pass modes revisit every view (twice per view for 'pyramid'), so a
+        # bounded store must hold the whole session or it evicts before reuse
+        needed = 2 * len(images) if mode == "pyramid" else len(images)
+        store = self.feature_store
+        if store.max_entries is not None and store.max_entries < needed:
+            print(f"Feature store enlarged from {store.max_entries} to {needed} entries for this session")
+            store.max_entries = needed
+        
+        self.matcher.reset_stats()
+        self.pose_estimator.reset_stats()
+        if self.point_filter is not None:
+            self.point_filter.reset_stats()
+        # A session-median background only describes the session it was fitted to
+        if self.masker is not None and self.masker.method == "background" and \
+                (self.masker.background is None or self.masker.background_from_session):
+            self.masker.fit_background(images)
+        self.point_colors = None
+        self.support_plane = None
+        self.plane_mask = None
+        
+        if mode == "pairwise":
+            combined_points = self._reconstruct_pairwise(images)
+        elif mode == "incremental":
+            combined_points = self._reconstruct_incremental(images)
+        elif mode == "grid":
+            combined_points = self._reconstruct_grid(images)
+        elif mode == "turntable":
+            combined_points = self._reconstruct_turntable(images)
+        elif mode == "pyramid":
+            combined_points = self._reconstruct_pyramid(images)
+        elif mode == "dense":
+            combined_points = self._reconstruct_dense(images)
+        elif mode == "mvs":
+            combined_points = self._reconstruct_mvs(images)
+        elif mode == "hull":
+            combined_points = self._reconstruct_hull(images)
+        else:
+            raise ValueError(f"Unknown reconstruction mode: {mode}")
+        
+        print(f"Matching: {self.matcher.timing_summary()}")
+        print(f"Pose estimation: {self.pose_estimator.summary()}")
+        if self.point_filter is not None and self.point_filter.stats['points'] > 0:
+            print(f"Point filter: {self.point_filter.summary()}")
+        
+        if len(combined_points) == 0:
+            raise ValueError("Failed to reconstruct any 3D points")
+        
+        # Pairwise mode colours each pair itself; the other modes share the world frame of self.sfm
+        if self.colorizer is not None and self.point_colors is None and mode != "pairwise" and self.sfm is not None:
+            self.point_colors, counts = self.colorizer.colorize(combined_points, images, self.sfm.poses,
+                                                                self.calibration_data['camera_matrix'])
+            print(f"Point colours: {np.count_nonzero(counts)}/{len(counts)} points seen, "
+                  f"{counts.mean():.1f} views per point")
+        
+        # Drop or label the support plane before the costlier outlier removal and meshing
+        on_plane = None
+        if self.plane_remover is not None and mode in self.plane_modes:
+            known_plane = np.array([0.0, 0.0, 1.0, 0.0]) if mode == "grid" else None
+            camera_centers = None
+            if mode != "pairwise" and self.sfm is not None and self.sfm.poses:
+                camera_centers = np.array([(-R.T @ t).ravel() for R, t in self.sfm.poses.values()])
+            self.support_plane, on_plane = self.plane_remover.segment(combined_points, known_plane, camera_centers)
+            if self.support_plane is None:
+                on_plane = None
+            elif self.plane_remover.action == "remove":
+                combined_points = combined_points[~on_plane]
+                if self.point_colors is not None:
+                    self.point_colors = self.point_colors[~on_plane]
+                on_plane = None
+                if len(combined_points) == 0:
+                    raise ValueError("Only the support plane was reconstructed")
+        
+        if HAS_OPEN3D:
+            # Create Open3D point cloud
+            point_cloud = o3d.geometry.PointCloud()
+            point_cloud.points = o3d.utility.Vector3dVector(combined_points)
+            if self.point_colors is not None:
+                point_cloud.colors = o3d.utility.Vector3dVector(self.point_colors / 255.0)
+            
+            # Remove outliers
+            point_cloud, kept = point_cloud.remove_statistical_outlier(nb_neighbors=20, std_ratio=2.0)
+            if on_plane is not None:
+                self.plane_mask = on_plane[np.asarray(kept, dtype=np.int64)]
+        else:
+            # Use fallback implementation
+            reconstruction_engine = create_reconstruction_engine()
+            filtered_points, inliers = reconstruction_engine.filter_outlier_points(combined_points, return_mask=True)
+            colors = self.point_colors[inliers] if self.point_colors is not None else None
+            reconstruction_engine.create_point_cloud(filtered_points, colors)
+            if on_plane is not None:
+                self.plane_mask = on_plane[inliers]
+            point_cloud = reconstruction_engine
+        
+        return point_cloud
+    
+    def _reconstruct_pairwise(self, images: List[np.ndarray]) -> np.ndarray:
+        """Triangulate each consecutive image pair in that pair's own camera frame, merged by self.accumulator."""
         all_points = []
+        all_colors = []
+        if self.accumulator is not None:
+            self.accumulator.clear()
+        
+        # Features arrive in input order; each image is detected once and
+        # carried over as the first image of the next pair
+        features = self.iter_features(images)
+        features2 = next(features)
         
         # Process pairs of consecutive images
         for i in range(len(images) - 1):
-            img1, img2 = images[i], images[i + 1]
-            
-            # Detect features
-            kp1, desc1 = self.detect_features(img1)
-            kp2, desc2 = self.detect_features(img2)
+            features1 = features2
+            features2 = next(features)
             
-            if desc1 is None or desc2 is None:
+            if len(features1) == 0 or len(features2) == 0:
                 continue
             
             # Match features
-            matches = self.match_features(desc1, desc2)
+            matches = self.match_features(features1.descriptors, features2.descriptors,
+                                          key1=features1.key, key2=features2.key)
             
             if len(matches) < 50:  # Need sufficient matches
                 continue
             
             # Estimate pose
-            R, t = self.estimate_pose(kp1, kp2, matches)
+            pose = self.estimate_pose(features1, features2, matches)
+            if pose is None:
+                continue
+            R, t = pose
+            
+            if self.epipolar_band is not None:
+                matches = self.match_guided(features1, features2, R, t)
             
             # Triangulate points
-            points_3d = self.triangulate_points(kp1, kp2, matches, R, t)
+            points_3d = self.triangulate_points(features1, features2, matches, R, t)
+            
+            # Drop points behind either camera, with large reprojection error or too little parallax
+            if self.point_filter is not None:
+                camera_matrix = self.calibration_data['camera_matrix']
+                projection_matrices = np.array([camera_matrix @ np.hstack([np.eye(3), np.zeros((3, 1))]),
+                                                camera_matrix @ np.hstack([R, t])])
+                points_2d = np.stack([features1.points[matches.query_idx], features2.points[matches.train_idx]])
+                valid_mask = self.point_filter.filter(points_3d, projection_matrices, points_2d)
+            else:
+                valid_mask = np.all(np.isfinite(points_3d), axis=1)
+            
+            if not np.any(valid_mask):
+                continue
+            points_3d = points_3d[valid_mask]
             
-            # Filter out points that are too far or too close
-            distances = np.linalg.norm(points_3d, axis=1)
-            valid_mask = (distances > 0.1) & (distances < 10.0)  # Adjust based on object size
+            # Colours from the pair's two views, in the pair's frame
+            colors = None
+            if self.colorizer is not None:
+                colors, _ = self.colorizer.colorize(points_3d, {0: images[i], 1: images[i + 1]},
+                                                    {0: (np.eye(3), np.zeros(3)), 1: (R, t)},
+                                                    self.calibration_data['camera_matrix'])
             
-            if np.any(valid_mask):
-                all_points.append(points_3d[valid_mask])
+            if self.accumulator is not None:
+                self.accumulator.add(points_3d, colors)
+            else:
+                all_points.append(points_3d)
+                all_colors.append(colors)
         
+        if self.accumulator is not None:
+            print(f"Voxel merge: {self.accumulator.summary()}")
+            self.point_colors = self.accumulator.colors
+            return self.accumulator.points
         if not all_points:
-            raise ValueError("Failed to reconstruct any 3D points")
+            return np.empty((0, 3))
         
         # Combine all points
-        combined_points = np.vstack(all_points)
+        if self.colorizer is not None:
+            self.point_colors = np.vstack(all_colors)
+        return np.vstack(all_points)
+    
+    def _reconstruct_incremental(self, images: List[np.ndarray]) -> np.ndarray:
+        """
+        Chain all views into one global frame with incremental SfM.
         
-        if HAS_OPEN3D:
-            # Create Open3D point cloud
-            point_cloud = o3d.geometry.PointCloud()
-            point_cloud.points = o3d.utility.Vector3dVector(combined_points)
+        The first pair with enough matches is triangulated from its essential
+        matrix; each later view is registered with PnP against the points seen
+        by the last registered view, and only its new tracks are triangulated.
+        With a retrieval index set, views that fail against the last view are
+        retried against their most similar registered views, and registered
+        views are also linked to similar earlier views to close loops. The
+        points are finally rebuilt from feature tracks, which merges the
+        duplicates a closed loop leaves behind.
+        """
+        if self.calibration_data is None:
+            raise ValueError("Camera calibration data not loaded")
+        
+        self.sfm = IncrementalSfM(self.calibration_data['camera_matrix'])
+        if self.retrieval is not None:
+            # Detected once; the retrieval index, main loop and partner lookups share them
+            session = list(self.iter_features(images))
+            neighbours = self._retrieval_neighbours(session)
+        else:
+            session, neighbours = None, {}
+        reference = None  # (view index, features) of the last usable view
+        links = 0
+        
+        for view, features in enumerate(session if session is not None else self.iter_features(images)):
+            if len(features) == 0:
+                continue
+            if reference is None:
+                reference = (view, features)
+                continue
             
-            # Remove outliers
-            point_cloud, _ = point_cloud.remove_statistical_outlier(nb_neighbors=20, std_ratio=2.0)
+            ref_view, ref_features = reference
+            matches = self.match_features(ref_features.descriptors, features.descriptors,
+                                          key1=ref_features.key, key2=features.key)
+            
+            if not self.sfm.is_initialized:
+                # Keep looking for a pair that can seed the reconstruction
+                pose = self.estimate_pose(ref_features, features, matches) if len(matches) >= 50 else None
+                if pose is not None:
+                    R, t = pose
+                    if self.epipolar_band is not None:
+                        matches = self.match_guided(ref_features, features, R, t)
+                    self.sfm.initialize(ref_view, ref_features, view, features, matches, R, t)
+                reference = (view, features)
+                continue
+            
+            registered = len(matches) >= 50 and self.sfm.register_view(view, features, ref_view,
+                                                                       ref_features, matches)
+            if registered and self.epipolar_band is not None:
+                # Tracks the unconstrained search missed, now that the pose is known
+                guided = self.match_guided(ref_features, features, *self.sfm.relative_pose(ref_view, view))
+                self.sfm.link_view(view, features, ref_view, ref_features, guided)
+            partners = [v for v in neighbours.get(view, []) if v != ref_view and v in self.sfm.poses]
+            
+            for partner in partners:
+                partner_features = session[partner]
+                matches = self.match_features(partner_features.descriptors, features.descriptors,
+                                              key1=partner_features.key, key2=features.key)
+                if len(matches) < 50:
+                    continue
+                if registered:
+                    links += self.sfm.link_view(view, features, partner, partner_features, matches)
+                else:
+                    registered = self.sfm.register_view(view, features, partner, partner_features, matches)
+            
+            if registered:
+                reference = (view, features)
+            else:
+                print(f"Could not register view {view}, skipping")
+        
+        print(f"Incremental SfM: {len(self.sfm.poses)}/{len(images)} views registered, "
+              f"{self.sfm.num_points} points")
+        if self.retrieval is not None:
+            print(f"Retrieval: {links} observations added from non-adjacent views")
+        
+        if self.sfm.is_initialized:
+            # Points triangulated twice (e.g. at both ends of a loop) become one track
+            merged = self.sfm.merge_tracks()
+            print(f"Track merge: {self.sfm.num_points} points ({merged} fewer)")
+        
+        if self.bundle_adjuster is not None and self.sfm.is_initialized:
+            self.refine_structure()
+        
+        return self.sfm.points_3d.copy()
+    
+    def _reconstruct_grid(self, images: List[np.ndarray]) -> np.ndarray:
+        """
+        Triangulate all views in the reference grid's metric frame.
+        
+        Each image's absolute pose comes from solvePnP on the detected grid
+        corners, so no essential matrix is estimated and the points come out
+        in millimeters. Views without a detectable grid are registered with
+        PnP against the points already triangulated.
+        """
+        if self.calibration_data is None:
+            raise ValueError("Camera calibration data not loaded")
+        
+        camera_matrix = self.calibration_data['camera_matrix']
+        grid_detector = GridDetector(tuple(self.calibration_data['grid_size_mm']))
+        self.sfm = IncrementalSfM(camera_matrix)
+        grid_views = []
+        previous = None  # (view index, features) of the last registered view
+        
+        for view, features in enumerate(self.iter_features(images)):
+            if len(features) == 0:
+                continue
+            
+            pose = grid_detector.estimate_pose(images[view], camera_matrix,
+                                               self.calibration_data['distortion_coefficients'],
+                                               self.grid_pattern)
+            if pose is not None:
+                self.sfm.add_view(view, features, *pose)
+                grid_views.append(view)
+            
+            if previous is not None:
+                prev_view, prev_features = previous
+                if pose is not None and self.epipolar_band is not None:
+                    # Both poses are known, so matching can follow the epipolar lines directly
+                    matches = self.match_guided(prev_features, features,
+                                                *self.sfm.relative_pose(prev_view, view))
+                else:
+                    matches = self.match_features(prev_features.descriptors, features.descriptors,
+                                                  key1=prev_features.key, key2=features.key)
+                if pose is not None:
+                    self.sfm.link_view(view, features, prev_view, prev_features, matches)
+                elif len(matches) >= 50:
+                    self.sfm.register_view(view, features, prev_view, prev_features, matches)
+            
+            if view in self.sfm.poses:
+                previous = (view, features)
+            else:
+                print(f"No grid or track found in view {view}, skipping")
+        
+        print(f"Grid poses: {len(grid_views)}/{len(images)} views, {len(self.sfm.poses)} registered, "
+              f"{self.sfm.num_points} points (mm)")
+        
+        if self.bundle_adjuster is not None and self.sfm.num_points > 0:
+            # Grid poses are metric and absolute; only the rest is refined
+            self.refine_structure(fixed_views=grid_views)
+        
+        return self.sfm.points_3d.copy()
+    
+    def _reconstruct_turntable(self, images: List[np.ndarray]) -> np.ndarray:
+        """
+        Reconstruct a turntable sequence with one rotation axis and one angle per view.
+        
+        The axis is fitted to essential-matrix poses of the first consecutive
+        pairs; if they do not fit a turntable motion, the sequence is
+        reconstructed with incremental SfM instead. After that each view only
+        needs its turntable angle, found by a 1-D search around the angle
+        predicted from the previous view; pairs whose matches do not fit the
+        motion model are rejected before any triangulation. Bundle adjustment then refines the axis, the angles and
+        the points while keeping every pose on the turntable.
+        """
+        if self.calibration_data is None:
+            raise ValueError("Camera calibration data not loaded")
+        
+        camera_matrix = self.calibration_data['camera_matrix']
+        features_iter = self.iter_features(images)
+        
+        # Seed the motion model from the first consecutive pairs
+        seed = []
+        relative_poses = []
+        for view, features in enumerate(features_iter):
+            seed.append((view, features))
+            if len(seed) >= 2 and len(seed[-2][1]) > 0 and len(features) > 0:
+                prev_features = seed[-2][1]
+                matches = self.match_features(prev_features.descriptors, features.descriptors,
+                                              key1=prev_features.key, key2=features.key)
+                pose = self.estimate_pose(prev_features, features, matches) if len(matches) >= 50 else None
+                if pose is not None:
+                    relative_poses.append(pose)
+            if len(relative_poses) >= self.turntable_seed_pairs:
+                break
+        
+        if not relative_poses:
+            raise ValueError("Could not fit the turntable model: no image pair with enough matches")
+        
+        try:
+            self.turntable = model = TurntableModel.fit(relative_poses)
+        except ValueError as e:
+            print(f"Turntable model rejected, falling back to incremental SfM: {e}")
+            self.turntable = None
+            return self._reconstruct_incremental(images)
+        self.sfm = IncrementalSfM(camera_matrix)
+        previous = None  # (view index, features) of the last registered view
+        rejected = 0
+        
+        for view, features in itertools.chain(seed, enumerate(features_iter, start=len(seed))):
+            if len(features) == 0:
+                continue
+            if previous is None:
+                self.sfm.add_view(view, features, *model.pose(0.0))
+                model.record(view, 0.0)
+                previous = (view, features)
+                continue
+            
+            prev_view, prev_features = previous
+            prev_angle = model.angles[prev_view]
+            matches = self.match_features(prev_features.descriptors, features.descriptors,
+                                          key1=prev_features.key, key2=features.key)
+            # Points the previous view already triangulated pin the angle down by reprojection
+            point_ids = self.sfm.point_ids[prev_view][matches.query_idx]
+            points_3d = np.full((len(matches), 3), np.nan)
+            points_3d[point_ids >= 0] = self.sfm.points_3d[point_ids[point_ids >= 0]]
+            angle, inliers = model.estimate_angle(camera_matrix, prev_features.points[matches.query_idx],
+                                                  features.points[matches.train_idx], prev_angle,
+                                                  prev_angle + model.step * (view - prev_view),
+                                                  points_3d=points_3d,
+                                                  reprojection_threshold=self.sfm.max_reprojection_error)
+            if np.count_nonzero(inliers) < 50:
+                print(f"Rejected view {view}: {np.count_nonzero(inliers)}/{len(matches)} matches fit the turntable motion")
+                rejected += 1
+                continue
+            
+            self.sfm.add_view(view, features, *model.pose(angle))
+            model.record(view, angle)
+            if self.epipolar_band is not None:
+                matches = self.match_guided(prev_features, features, *model.relative_pose(prev_angle, angle))
+            else:
+                matches = Matches(matches.pairs[inliers], matches.distances[inliers])
+            self.sfm.link_view(view, features, prev_view, prev_features, matches)
+            previous = (view, features)
+        
+        print(f"Turntable: {len(model.angles)}/{len(images)} views, {rejected} rejected, "
+              f"step {np.degrees(model.step):.2f} deg, {self.sfm.num_points} points")
+        
+        if self.bundle_adjuster is not None and self.sfm.num_points > 0:
+            # Poses stay on the turntable: the axis and one angle per view (the first fixed) are
+            # refined with the points
+            report = self.refine_structure(turntable_axis=(model.axis, model.center))
+            model.axis, model.center = report['turntable_axis']
+            for view in sorted(self.sfm.poses):
+                angle = float(cv2.Rodrigues(self.sfm.poses[view][0])[0].ravel() @ model.axis)
+                model.record(view, angle + 2 * np.pi * np.round((model.angles[view] - angle) / (2 * np.pi)))
+        
+        return self.sfm.points_3d.copy()
+    
+    def _reconstruct_pyramid(self, images: List[np.ndarray]) -> np.ndarray:
+        """
+        Incremental SfM on downscaled images, refined at full resolution.
+        
+        Features are detected, matched and posed on images resized by
+        self.pyramid_scale. Every track is then anchored at its first
+        observation and its other observations are refined in the
+        full-resolution images with pyramidal Lucas-Kanade, starting from the
+        upscaled coarse positions. The points are re-triangulated from the
+        refined observations and bundle-adjusted at full resolution.
+        """
+        if self.calibration_data is None:
+            raise ValueError("Camera calibration data not loaded")
+        
+        scale = self.pyramid_scale
+        height, width = images[0].shape[:2]
+        coarse_size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+        camera_matrix = self.calibration_data['camera_matrix']
+        
+        # Coarse pass: incremental SfM at the reduced resolution, without bundle adjustment
+        small_images = [cv2.resize(image, coarse_size, interpolation=cv2.INTER_AREA) for image in images]
+        full_calibration, adjuster = self.calibration_data, self.bundle_adjuster
+        self.calibration_data = dict(full_calibration,
+                                     camera_matrix=scaled_camera_matrix(camera_matrix, (width, height),
+                                                                        coarse_size[::-1]))
+        self.bundle_adjuster = None
+        try:
+            self._reconstruct_incremental(small_images)
+        finally:
+            self.calibration_data, self.bundle_adjuster = full_calibration, adjuster
+        
+        if not self.sfm.is_initialized:
+            return self.sfm.points_3d.copy()
+        
+        # Coarse pixel centres -> full-resolution pixel coordinates
+        sx, sy = coarse_size[0] / width, coarse_size[1] / height
+        obs_views, obs_points, obs_xy = self.sfm.observations()
+        coarse_xy = (obs_xy.astype(np.float64) + 0.5) / [sx, sy] - 0.5
+        refined = coarse_xy.astype(np.float32)
+        
+        # Anchor every track at its first observation and track the others from there
+        order = np.argsort(obs_points, kind='stable')
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = obs_points[order][1:] != obs_points[order][:-1]
+        anchor = np.empty(len(order), dtype=np.int64)
+        anchor[order] = order[np.maximum.accumulate(np.where(first, np.arange(len(order)), 0))]
+        anchor_views = obs_views[anchor]
+        
+        gray = {}
+        for view in self.sfm.poses:
+            gray[view] = images[view] if images[view].ndim == 2 else cv2.cvtColor(images[view], cv2.COLOR_BGR2GRAY)
+        
+        accepted = 0
+        tracked = np.flatnonzero(anchor != np.arange(len(anchor)))
+        pair_keys = anchor_views[tracked].astype(np.int64) * (max(self.sfm.poses) + 1) + obs_views[tracked]
+        for key in np.unique(pair_keys):
+            group = tracked[pair_keys == key]
+            source, target = divmod(int(key), max(self.sfm.poses) + 1)
+            start = refined[anchor[group]].reshape(-1, 1, 2)
+            guess = refined[group].reshape(-1, 1, 2).copy()
+            result, status, _ = cv2.calcOpticalFlowPyrLK(gray[source], gray[target], start, guess,
+                                                         winSize=(21, 21), maxLevel=2,
+                                                         flags=cv2.OPTFLOW_USE_INITIAL_FLOW)
+            result = result.reshape(-1, 2)
+            # Refinements may only move a point within the coarse level's uncertainty
+            ok = (status.ravel() == 1) & (np.linalg.norm(result - refined[group], axis=1) < 2.0 / scale)
+            refined[group[ok]] = result[ok]
+            accepted += int(np.count_nonzero(ok))
+        
+        print(f"Pyramid: {accepted}/{len(tracked)} observations refined at full resolution "
+              f"(coarse scale {scale:g})")
+        
+        self.sfm.set_observations(refined, camera_matrix)
+        if self.bundle_adjuster is not None:
+            self.refine_structure()
         else:
-            # Use fallback implementation
-            reconstruction_engine = create_reconstruction_engine()
-            filtered_points = reconstruction_engine.filter_outlier_points(combined_points)
-            reconstruction_engine.create_point_cloud(filtered_points)
-            point_cloud = reconstruction_engine
+            self.sfm.retriangulate()
         
-        return point_cloud
+        return self.sfm.points_3d.copy()
+    
+    def _pose_views(self, images: List[np.ndarray]):
+        """Register the views with the sparse mode named by self.dense_pose_mode (fills self.sfm)."""
+        pose_modes = {
+            "incremental": self._reconstruct_incremental,
+            "grid": self._reconstruct_grid,
+            "turntable": self._reconstruct_turntable,
+            "pyramid": self._reconstruct_pyramid
+        }
+        if self.dense_pose_mode not in pose_modes:
+            raise ValueError(f"Unknown dense pose mode: {self.dense_pose_mode} (expected one of {tuple(pose_modes)})")
+        
+        pose_modes[self.dense_pose_mode](images)
+    
+    def _reconstruct_dense(self, images: List[np.ndarray]) -> np.ndarray:
+        """
+        Dense SGBM points of consecutive posed views, in the sparse reconstruction's world frame.
+        
+        Poses come from the sparse mode named by self.dense_pose_mode; each
+        pair of consecutive registered views is rectified and matched densely
+        (see self.dense_stereo). The points of each pair become a depth map of
+        its first view, which is streamed into self.fusion as soon as it is
+        computed.
+        """
+        self._pose_views(images)
+        
+        camera_matrix = self.calibration_data['camera_matrix']
+        image_size = (images[0].shape[1], images[0].shape[0])
+        pairs = self._dense_pairs(images)
+        
+        if self.fusion is not None:
+            depth_maps = ((view, depth_map_from_points(points, camera_matrix, image_size,
+                                                       1.0 / self.dense_stereo.stride))
+                          for view, points in pairs)
+            all_points = list(self.fusion.fuse_stream(depth_maps, self.sfm.poses, camera_matrix, image_size))
+        else:
+            # First camera frame -> world frame
+            all_points = [(points - self.sfm.poses[view][1].ravel()) @ self.sfm.poses[view][0]
+                          for view, points in pairs]
+        
+        if not all_points:
+            return np.empty((0, 3))
+        return np.vstack(all_points)
+    
+    def _dense_pairs(self, images: List[np.ndarray]) -> Iterator[Tuple[int, np.ndarray]]:
+        """Dense points of each consecutive registered pair, in its first camera's frame, one pair at a time."""
+        camera_matrix = self.calibration_data['camera_matrix']
+        dist_coeffs = self.calibration_data['distortion_coefficients']
+        views = sorted(self.sfm.poses)
+        matched = 0
+        
+        for view1, view2 in zip(views[:-1], views[1:]):
+            R, t = self.sfm.relative_pose(view1, view2)
+            points, _ = self.dense_stereo.reconstruct_pair(images[view1], images[view2],
+                                                           camera_matrix, dist_coeffs, R, t)
+            if len(points) == 0:
+                print(f"Dense pair {view1}-{view2} skipped: baseline cannot be rectified horizontally")
+                continue
+            matched += 1
+            yield view1, points
+        
+        print(f"Dense stereo: {matched}/{max(len(views) - 1, 0)} pairs")
+    
+    def _reconstruct_mvs(self, images: List[np.ndarray]) -> np.ndarray:
+        """
+        PatchMatch depth maps of all posed views, fused into one world-frame cloud.
+        
+        Each registered view is a reference view once, matched against its
+        nearest registered views; its depth range comes from the sparse
+        points in front of it. Each depth map is streamed into self.fusion as
+        soon as it is computed; depth and normal maps are kept in
+        self.depth_maps only when self.keep_depth_maps is set.
+        """
+        self._pose_views(images)
+        
+        camera_matrix = self.calibration_data['camera_matrix']
+        poses = self.sfm.poses
+        image_size = (images[0].shape[1], images[0].shape[0])
+        self.depth_maps = {}
+        depth_maps = self._mvs_depth_maps(images)
+        
+        if self.fusion is not None:
+            all_points = list(self.fusion.fuse_stream(depth_maps, poses, camera_matrix, image_size))
+        else:
+            all_points = [PatchMatchMVS.depth_to_points(depth, camera_matrix, *poses[view])
+                          for view, depth in depth_maps]
+        
+        if not all_points:
+            return np.empty((0, 3))
+        return np.vstack(all_points)
+    
+    def _mvs_depth_maps(self, images: List[np.ndarray]) -> Iterator[Tuple[int, np.ndarray]]:
+        """PatchMatch depth map of each registered view, computed one view at a time."""
+        camera_matrix = self.calibration_data['camera_matrix']
+        poses = self.sfm.poses
+        sparse_points = self.sfm.points_3d
+        
+        for view in sorted(poses):
+            sources = PatchMatchMVS.select_sources(view, poses, self.mvs.n_sources)
+            R, t = poses[view]
+            depths = (sparse_points @ R.T + t.ravel())[:, 2]
+            depths = depths[depths > 0]
+            if not sources or len(depths) < 10:
+                print(f"MVS view {view} skipped: no source views or sparse points")
+                continue
+            
+            depth_range = (0.8 * np.percentile(depths, 2), 1.2 * np.percentile(depths, 98))
+            source_views = [(images[s], *self.sfm.relative_pose(view, s)) for s in sources]
+            depth, normal, _ = self.mvs.compute_depth_map(images[view], source_views, camera_matrix, depth_range)
+            if self.keep_depth_maps:
+                self.depth_maps[view] = (depth, normal)
+            print(f"MVS view {view}: {np.count_nonzero(depth)} depths from views {sources}")
+            yield view, depth
+    
+    def _reconstruct_hull(self, images: List[np.ndarray]) -> np.ndarray:
+        """
+        Surface voxels of the visual hull carved from the foreground masks.
+        
+        Poses come from the sparse mode named by self.dense_pose_mode and the
+        carving box from the sparse points, padded by a quarter of its size.
+        Only the centres of finest-level surface voxels are returned; all
+        kept voxels and their edge lengths are left in self.hull_voxels.
+        """
+        if self.masker is None:
+            raise ValueError("The 'hull' mode needs foreground masks (set self.masker)")
+        
+        self._pose_views(images)
+        if self.sfm.num_points == 0:
+            return np.empty((0, 3))
+        
+        masks = {}
+        for view in sorted(self.sfm.poses):
+            mask = self.masker.compute_mask(images[view])
+            if mask is None:
+                print(f"Hull view {view} skipped: no foreground mask")
+                continue
+            masks[view] = mask
+        if not masks:
+            return np.empty((0, 3))
+        
+        low, high = np.percentile(self.sfm.points_3d, [2, 98], axis=0)
+        padding = 0.25 * (high - low)
+        centers, sizes, surface = self.visual_hull.carve(masks, self.sfm.poses,
+                                                         self.calibration_data['camera_matrix'],
+                                                         (low - padding, high + padding))
+        self.hull_voxels = (centers, sizes)
+        return centers[surface]
+    
+    def _retrieval_neighbours(self, session: List[Features]) -> Dict[int, List[int]]:
+        """
+        Index the whole session for retrieval and propose matching partners.
+        
+        All images are indexed before any is matched, so the vocabulary is
+        trained however short the session is, and the candidate pairs of the
+        whole session come from one call to ImageRetrieval.candidate_pairs.
+        
+        Args:
+            session: Features of every view, in image order
+            
+        Returns:
+            Earlier views proposed as partners of each view (empty without a retrieval index)
+        """
+        if self.retrieval is None:
+            return {}
+        self.retrieval.reset()
+        for view, features in enumerate(session):
+            if len(features) > 0:
+                self.retrieval.add(view, features.descriptors)
+        self.retrieval.finalize()
+        
+        neighbours: Dict[int, List[int]] = {}
+        for i, j in self.retrieval.candidate_pairs():
+            neighbours.setdefault(j, []).append(i)
+        print(f"Retrieval: {len(self.retrieval)} images indexed, "
+              f"{sum(len(v) for v in neighbours.values())} candidate pairs")
+        return neighbours
+    
+    def refine_structure(self, fixed_views: Optional[List[int]] = None,
+                         turntable_axis: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Dict:
+        """
+        Bundle-adjust all poses and points of the incremental reconstruction.
+        
+        Args:
+            fixed_views: Views whose pose is held constant (default: the first view)
+            turntable_axis: Optional (axis direction, point on the axis); poses are then refined
+                as rotations about this axis, one angle per view, with the axis itself
+            
+        Returns:
+            Bundle adjustment report
+        """
+        if self.sfm is None or self.sfm.num_points == 0:
+            raise ValueError("No incremental reconstruction to refine")
+        
+        # Start from N-view solutions of tracks that grew beyond their first two views
+        replaced = self.sfm.retriangulate()
+        print(f"Re-triangulated {replaced}/{self.sfm.num_points} points from all their views")
+        
+        adjuster = self.bundle_adjuster or BundleAdjuster()
+        obs_views, obs_points, obs_xy = self.sfm.observations()
+        poses, points, report = adjuster.adjust(self.sfm.camera_matrix, self.sfm.poses, self.sfm.points_3d,
+                                                obs_views, obs_points, obs_xy, fixed_views, turntable_axis)
+        self.sfm.set_structure(poses, points)
+        print(f"Bundle adjustment: {adjuster.summary(report)}")
+        return report
     
     def generate_mesh(self, point_cloud: object, 
                      method: str = "poisson") -> Optional[object]:
@@ -256,8 +1097,13 @@ class StereoReconstructor:
         Returns:
             Triangle mesh or None if failed
         """
+        # Points labelled as support plane by the last reconstruction are not meshed
+        plane_mask = self.plane_mask
+        
         if HAS_OPEN3D and hasattr(point_cloud, 'estimate_normals'):
             # Open3D point cloud
+            if plane_mask is not None and len(plane_mask) == len(point_cloud.points):
+                point_cloud = point_cloud.select_by_index(np.flatnonzero(~plane_mask).tolist())
             point_cloud.estimate_normals()
             point_cloud.orient_normals_consistent_tangent_plane(100)
             
@@ -285,9 +1131,12 @@ class StereoReconstructor:
         else:
             # Fallback implementation
             if hasattr(point_cloud, 'points_3d') and point_cloud.points_3d is not None:
+                points = point_cloud.points_3d
+                if plane_mask is not None and len(plane_mask) == len(points):
+                    points = points[~plane_mask]
                 if method == "poisson":
-                    return point_cloud.create_mesh_poisson(point_cloud.points_3d)
+                    return point_cloud.create_mesh_poisson(points)
                 elif method == "alpha_shape":
-                    return point_cloud.create_mesh_alpha_shape(point_cloud.points_3d)
+                    return point_cloud.create_mesh_alpha_shape(points)
             
             return None
\ No newline at end of file
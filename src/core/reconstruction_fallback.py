@@ -22,6 +22,8 @@ from sklearn.cluster import DBSCAN
 import cv2
 from typing import Tuple, List, Optional
 
+from .triangulation import triangulate_multiview
+
 class Point3DReconstruction:
     """Alternative 3D reconstruction using triangulation and mesh generation"""
     
@@ -68,33 +70,34 @@ class Point3DReconstruction:
         if len(image_points) < 2:
             raise ValueError("Need at least 2 views for triangulation")
         
-        # Use first two views for basic triangulation
-        points1 = image_points[0].astype(np.float32)
-        points2 = image_points[1].astype(np.float32)
-        
-        R1, t1 = poses[0]
-        R2, t2 = poses[1]
+        # Every point is observed in every view: one track of len(image_points) per point
+        n_views = len(image_points)
+        n_points = len(image_points[0])
+        projection_matrices = np.array([K @ np.hstack([R, np.asarray(t).reshape(3, 1)])
+                                        for K, (R, t) in zip(camera_matrices, poses)])
+        observations = np.stack([np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in image_points], axis=1)
         
-        # Relative pose
-        R_rel = R2 @ R1.T
-        t_rel = t2 - R_rel @ t1
-        
-        points_3d = self.triangulate_points_stereo(
-            points1, points2, 
-            camera_matrices[0], camera_matrices[1],
-            R_rel, t_rel
+        points_3d, _, _ = triangulate_multiview(
+            projection_matrices,
+            np.arange(n_points + 1) * n_views,
+            np.tile(np.arange(n_views), n_points),
+            observations.reshape(-1, 2)
         )
         
         return points_3d
     
     def filter_outlier_points(self, points: np.ndarray, 
                             nb_neighbors: int = 20,
-                            std_ratio: float = 2.0) -> np.ndarray:
+                            std_ratio: float = 2.0,
+                            return_mask: bool = False):
         """
         Filter outlier points using statistical analysis
+        
+        Returns the kept points, plus their boolean mask when return_mask is set
+        (e.g. to filter per-point colours alongside)
         """
         if len(points) < nb_neighbors:
-            return points
+            return (points, np.ones(len(points), dtype=bool)) if return_mask else points
         
         # Build KD-tree for neighbor search
         tree = KDTree(points)
@@ -114,6 +117,8 @@ class Point3DReconstruction:
         threshold = mean_distance + std_ratio * std_distance
         inlier_mask = distances_array < threshold
         
+        if return_mask:
+            return points[inlier_mask], inlier_mask
         return points[inlier_mask]
     
     def create_point_cloud(self, points: np.ndarray, colors: Optional[np.ndarray] = None):
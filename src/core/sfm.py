@@ -0,0 +1,419 @@
+"""
+Incremental Structure-from-Motion Module
+
+Builds a sparse reconstruction in one global coordinate frame: the first image
+pair is triangulated from its essential-matrix pose, and every further view is
+registered against the existing 3D points with PnP before only its new tracks
+are triangulated.
+"""
+
+import cv2
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+from .features import Features, Matches
+from .tracks import TrackBuilder
+from .triangulation import triangulate_multiview
+
+
+class IncrementalSfM:
+    """Incremental pose chaining and triangulation in a single world frame."""
+
+    def __init__(self, camera_matrix: np.ndarray, max_reprojection_error: float = 4.0,
+                 min_pnp_points: int = 12):
+        """
+        Initialize incremental SfM.
+
+        Args:
+            camera_matrix: 3x3 camera intrinsic matrix
+            max_reprojection_error: Pixel threshold for PnP inliers and new triangulations
+            min_pnp_points: Minimum 2D-3D correspondences needed to register a view
+        """
+        self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        self.max_reprojection_error = max_reprojection_error
+        self.min_pnp_points = min_pnp_points
+
+        # World-to-camera pose (R, t) of each registered view
+        self.poses: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        # 3D point id observed by each keypoint of a registered view (-1 = none)
+        self.point_ids: Dict[int, np.ndarray] = {}
+        # (K, 2) keypoint coordinates of each registered view
+        self.keypoints: Dict[int, np.ndarray] = {}
+        # Keypoint pairs linking two different points that are the same scene point
+        self._point_links = []
+
+        self._points = np.empty((1024, 3), dtype=np.float64)
+        self.num_points = 0
+        self._obs_views = []
+        self._obs_points = []
+        self._obs_xy = []
+
+    @property
+    def is_initialized(self) -> bool:
+        """True once the first pair has been triangulated."""
+        return len(self.poses) >= 2
+
+    @property
+    def points_3d(self) -> np.ndarray:
+        """All triangulated points in world coordinates."""
+        return self._points[:self.num_points]
+
+    def projection_matrix(self, view: int) -> np.ndarray:
+        """3x4 projection matrix of a registered view."""
+        R, t = self.poses[view]
+        return self.camera_matrix @ np.hstack([R, t.reshape(3, 1)])
+
+    def relative_pose(self, view1: int, view2: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Pose (R, t) of view2 relative to view1, i.e. x2 = R x1 + t."""
+        R1, t1 = self.poses[view1]
+        R2, t2 = self.poses[view2]
+        R = R2 @ R1.T
+        return R, t2 - R @ t1
+
+    def observations(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get all 2D observations of the triangulated points.
+
+        Returns:
+            Tuple of (view indices, point ids, (K, 2) pixel coordinates)
+        """
+        if not self._obs_views:
+            return np.empty(0, np.int32), np.empty(0, np.int64), np.empty((0, 2), np.float32)
+        return (np.concatenate(self._obs_views), np.concatenate(self._obs_points),
+                np.concatenate(self._obs_xy))
+
+    def set_structure(self, poses: Dict[int, Tuple[np.ndarray, np.ndarray]], points: np.ndarray):
+        """Replace poses and point positions, e.g. with bundle-adjusted values."""
+        self.poses = dict(poses)
+        self._points[:self.num_points] = points
+
+    def set_observations(self, xy: np.ndarray, camera_matrix: Optional[np.ndarray] = None):
+        """
+        Replace the pixel coordinates of all observations.
+
+        Used to move a reconstruction built on downscaled images to full
+        resolution: the observations keep their views and point ids.
+
+        Args:
+            xy: (K, 2) pixel coordinates in the order returned by observations()
+            camera_matrix: New camera matrix the coordinates refer to (default: unchanged)
+        """
+        obs_views, _, _ = self.observations()
+        if len(xy) != len(obs_views):
+            raise ValueError(f"Expected {len(obs_views)} observations, got {len(xy)}")
+        if camera_matrix is not None:
+            self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        self._obs_views = [obs_views]
+        self._obs_points = [np.concatenate(self._obs_points)] if self._obs_points else []
+        self._obs_xy = [np.asarray(xy, dtype=np.float32)]
+
+    def retriangulate(self, min_angle: float = 1.0) -> int:
+        """
+        Re-triangulate every point from all of its observations.
+
+        Points are first triangulated from the two views that created them;
+        once later views add observations, an N-view solution is usually
+        better conditioned. A point is replaced only if the new solution has a
+        lower RMS reprojection error and a triangulation angle of at least
+        min_angle degrees.
+
+        Args:
+            min_angle: Minimum triangulation angle in degrees for a replacement
+
+        Returns:
+            Number of points replaced
+        """
+        obs_views, obs_points, obs_xy = self.observations()
+        if len(obs_points) == 0:
+            return 0
+
+        order = np.argsort(obs_points, kind='stable')
+        offsets = np.searchsorted(obs_points[order], np.arange(self.num_points + 1))
+        views = sorted(self.poses)
+        projection_matrices = np.array([self.projection_matrix(v) for v in views])
+        view_index = np.searchsorted(views, obs_views[order])
+        xy = obs_xy[order].astype(np.float64)
+
+        points, errors, angles = triangulate_multiview(projection_matrices, offsets, view_index, xy)
+
+        # Current error of every point over the same observations
+        projected = (projection_matrices[view_index] @
+                     np.hstack([self.points_3d, np.ones((self.num_points, 1))])[obs_points[order], :, np.newaxis])[..., 0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            squared = np.sum((projected[:, :2] / projected[:, 2:] - xy) ** 2, axis=1)
+        counts = np.diff(offsets)
+        current = np.sqrt(np.bincount(obs_points[order], squared, minlength=self.num_points) / np.maximum(counts, 1))
+
+        better = (errors < np.nan_to_num(current, nan=np.inf)) & (angles >= min_angle)
+        self._points[:self.num_points][better] = points[better]
+        return int(np.count_nonzero(better))
+
+    def initialize(self, view1: int, features1: Features, view2: int, features2: Features,
+                   matches: Matches, R: np.ndarray, t: np.ndarray) -> int:
+        """
+        Start the reconstruction from a two-view relative pose.
+
+        The first view defines the world frame and the baseline length defines the scale.
+
+        Args:
+            view1: Index of the first view
+            features1: Features of the first view
+            view2: Index of the second view
+            features2: Features of the second view
+            matches: Matches between the two views
+            R: Rotation from the first to the second camera
+            t: Translation from the first to the second camera
+
+        Returns:
+            Number of points triangulated
+        """
+        self.poses = {view1: (np.eye(3), np.zeros((3, 1))),
+                      view2: (np.asarray(R, np.float64), np.asarray(t, np.float64).reshape(3, 1))}
+        self.point_ids = {view1: np.full(len(features1), -1, dtype=np.int64),
+                          view2: np.full(len(features2), -1, dtype=np.int64)}
+        self.keypoints = {view1: features1.points, view2: features2.points}
+
+        added = self._triangulate_tracks(view1, features1, view2, features2, matches.pairs)
+        if added == 0:
+            self.poses.clear()
+            self.point_ids.clear()
+            self.keypoints.clear()
+        return added
+
+    def add_view(self, view: int, features: Features, R: np.ndarray, t: np.ndarray):
+        """
+        Add a view whose absolute pose is already known (e.g. from the reference grid).
+
+        Args:
+            view: Index of the view
+            features: Features of the view
+            R: World-to-camera rotation
+            t: World-to-camera translation
+        """
+        self.poses[view] = (np.asarray(R, np.float64), np.asarray(t, np.float64).reshape(3, 1))
+        self.point_ids[view] = np.full(len(features), -1, dtype=np.int64)
+        self.keypoints[view] = features.points
+
+    def register_view(self, view: int, features: Features, ref_view: int, ref_features: Features,
+                      matches: Matches) -> bool:
+        """
+        Register a new view against the points seen by an already registered view.
+
+        Args:
+            view: Index of the new view
+            features: Features of the new view
+            ref_view: Index of a registered view
+            ref_features: Features of the registered view
+            matches: Matches from ref_view (query) to the new view (train)
+
+        Returns:
+            True if the view was registered
+        """
+        ref_ids = self.point_ids[ref_view][matches.query_idx]
+        known = ref_ids >= 0
+        if np.count_nonzero(known) < self.min_pnp_points:
+            return False
+
+        object_points = self.points_3d[ref_ids[known]]
+        image_points = features.points[matches.train_idx[known]].astype(np.float64)
+
+        success, rvec, tvec, inliers = cv2.solvePnPRansac(
+            object_points, image_points, self.camera_matrix, None,
+            reprojectionError=self.max_reprojection_error, confidence=0.999,
+            iterationsCount=200, flags=cv2.SOLVEPNP_EPNP
+        )
+        if not success or inliers is None or len(inliers) < self.min_pnp_points:
+            return False
+
+        inliers = inliers.ravel()
+        rvec, tvec = cv2.solvePnPRefineLM(object_points[inliers], image_points[inliers],
+                                          self.camera_matrix, None, rvec, tvec)
+        R, _ = cv2.Rodrigues(rvec)
+        self.poses[view] = (R, tvec.reshape(3, 1))
+
+        # Existing tracks now also observed by the new view
+        ids = np.full(len(features), -1, dtype=np.int64)
+        train_known = matches.train_idx[known][inliers]
+        ids[train_known] = ref_ids[known][inliers]
+        self.point_ids[view] = ids
+        self.keypoints[view] = features.points
+        self._add_observations(view, ids[train_known], features.points[train_known])
+
+        # Only matches without a 3D point yet become new tracks
+        self._triangulate_tracks(ref_view, ref_features, view, features, matches.pairs[~known])
+        return True
+
+    def link_view(self, view: int, features: Features, ref_view: int, ref_features: Features,
+                  matches: Matches) -> int:
+        """
+        Add correspondences between two registered views (e.g. a loop closure).
+
+        Points already seen by ref_view gain an observation in view when they
+        reproject within the error threshold; matches without a point on
+        either side are triangulated as new tracks. Matches between two
+        different points that reproject into each other's view are kept as
+        links for merge_tracks().
+
+        Args:
+            view: Index of a registered view
+            features: Features of that view
+            ref_view: Index of another registered view
+            ref_features: Features of the other view
+            matches: Matches from ref_view (query) to view (train)
+
+        Returns:
+            Number of observations and points added
+        """
+        ref_ids = self.point_ids[ref_view][matches.query_idx]
+        view_ids = self.point_ids[view][matches.train_idx]
+
+        # Existing points seen from the new view
+        linkable = (ref_ids >= 0) & (view_ids < 0)
+        added = 0
+        if np.any(linkable):
+            ids = ref_ids[linkable]
+            train = matches.train_idx[linkable]
+            projected = np.hstack([self.points_3d[ids], np.ones((len(ids), 1))]) @ self.projection_matrix(view).T
+            depth = projected[:, 2]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                error = np.linalg.norm(projected[:, :2] / depth[:, None] - features.points[train], axis=1)
+            good = (depth > 0) & (error < self.max_reprojection_error)
+            # A keypoint can only observe one point
+            train, first = np.unique(train[good], return_index=True)
+            ids = ids[good][first]
+            self.point_ids[view][train] = ids
+            self._add_observations(view, ids, features.points[train])
+            added += len(ids)
+
+        # Two points of the same scene point, e.g. from both ends of a loop
+        duplicate = (ref_ids >= 0) & (view_ids >= 0) & (ref_ids != view_ids)
+        if np.any(duplicate):
+            query, train = matches.query_idx[duplicate], matches.train_idx[duplicate]
+            consistent = (self._reprojection_error(view, ref_ids[duplicate], features.points[train]) <
+                          self.max_reprojection_error) & \
+                         (self._reprojection_error(ref_view, view_ids[duplicate], ref_features.points[query]) <
+                          self.max_reprojection_error)
+            if np.any(consistent):
+                count = int(np.count_nonzero(consistent))
+                self._point_links.append((np.full(count, ref_view), query[consistent],
+                                          np.full(count, view), train[consistent]))
+
+        fresh = (ref_ids < 0) & (view_ids < 0)
+        added += self._triangulate_tracks(ref_view, ref_features, view, features, matches.pairs[fresh])
+        return added
+
+    def merge_tracks(self) -> int:
+        """
+        Rebuild the points from feature tracks of all accepted correspondences.
+
+        Every point's observations and the links recorded by link_view() are
+        merged into tracks with TrackBuilder, so one scene point that was
+        triangulated twice - typically once at each end of a loop - becomes a
+        single point seen by all its views. Tracks that see one view twice are
+        dropped, and every track is re-triangulated from all its views.
+
+        Returns:
+            Number of points removed by merging
+        """
+        if self.num_points == 0:
+            return 0
+
+        builder = TrackBuilder()
+        views, keypoints, point_ids = [], [], []
+        for view in sorted(self.point_ids):
+            builder.add_image(view, len(self.point_ids[view]))
+            observed = np.flatnonzero(self.point_ids[view] >= 0)
+            views.append(np.full(len(observed), view, dtype=np.int64))
+            keypoints.append(observed)
+            point_ids.append(self.point_ids[view][observed])
+        views, keypoints, point_ids = np.concatenate(views), np.concatenate(keypoints), np.concatenate(point_ids)
+
+        # Each observation of a point is linked to the point's first observation
+        order = np.argsort(point_ids, kind='stable')
+        first = order[np.searchsorted(point_ids[order], point_ids)]
+        builder.add_correspondences(views[first], keypoints[first], views, keypoints)
+        for link in self._point_links:
+            builder.add_correspondences(*link)
+
+        tracks = builder.build()
+        points, errors, _ = tracks.triangulate(self.camera_matrix, self.poses, self.keypoints)
+        keep = np.all(np.isfinite(points), axis=1) & (errors < self.max_reprojection_error)
+        obs_views, track_ids, obs_xy = tracks.observations(self.keypoints)
+        element = keep[track_ids]
+        new_ids = np.cumsum(keep) - 1
+
+        removed = self.num_points - int(np.count_nonzero(keep))
+        self.num_points = 0
+        self._append_points(points[keep])
+        self._obs_views = [obs_views[element].astype(np.int32)]
+        self._obs_points = [new_ids[track_ids[element]]]
+        self._obs_xy = [obs_xy[element]]
+        for view in self.point_ids:
+            self.point_ids[view][:] = -1
+        for view in np.unique(obs_views[element]):
+            mine = element & (obs_views == view)
+            self.point_ids[int(view)][tracks.keypoints[mine]] = new_ids[track_ids[mine]]
+        self._point_links = []
+        return removed
+
+    def _reprojection_error(self, view: int, point_ids: np.ndarray, xy: np.ndarray) -> np.ndarray:
+        """Pixel distance between points projected into a view and observed coordinates."""
+        projected = np.hstack([self.points_3d[point_ids], np.ones((len(point_ids), 1))]) @ self.projection_matrix(view).T
+        depth = projected[:, 2]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            error = np.linalg.norm(projected[:, :2] / depth[:, None] - xy, axis=1)
+        return np.where(depth > 0, error, np.inf)
+
+    def _triangulate_tracks(self, view1: int, features1: Features, view2: int, features2: Features,
+                            pairs: np.ndarray) -> int:
+        """Triangulate new points from two registered views, keeping well-conditioned ones."""
+        if len(pairs) == 0:
+            return 0
+
+        pts1 = features1.points[pairs[:, 0]].astype(np.float64)
+        pts2 = features2.points[pairs[:, 1]].astype(np.float64)
+        P1 = self.projection_matrix(view1)
+        P2 = self.projection_matrix(view2)
+
+        points_4d = cv2.triangulatePoints(P1, P2, pts1.T, pts2.T)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            points = (points_4d[:3] / points_4d[3]).T
+
+        valid = np.all(np.isfinite(points), axis=1)
+        for P, pts in ((P1, pts1), (P2, pts2)):
+            projected = np.hstack([points, np.ones((len(points), 1))]) @ P.T
+            depth = projected[:, 2]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                error = np.linalg.norm(projected[:, :2] / depth[:, None] - pts, axis=1)
+            valid &= (depth > 0) & (error < self.max_reprojection_error)
+
+        count = int(np.count_nonzero(valid))
+        if count == 0:
+            return 0
+
+        new_ids = self._append_points(points[valid])
+        pairs = pairs[valid]
+        self.point_ids[view1][pairs[:, 0]] = new_ids
+        self.point_ids[view2][pairs[:, 1]] = new_ids
+        self._add_observations(view1, new_ids, pts1[valid])
+        self._add_observations(view2, new_ids, pts2[valid])
+        return count
+
+    def _append_points(self, points: np.ndarray) -> np.ndarray:
+        """Append points to the growing point buffer and return their ids."""
+        needed = self.num_points + len(points)
+        if needed > len(self._points):
+            grown = np.empty((max(needed, 2 * len(self._points)), 3), dtype=np.float64)
+            grown[:self.num_points] = self._points[:self.num_points]
+            self._points = grown
+
+        self._points[self.num_points:needed] = points
+        ids = np.arange(self.num_points, needed, dtype=np.int64)
+        self.num_points = needed
+        return ids
+
+    def _add_observations(self, view: int, point_ids: np.ndarray, xy: np.ndarray):
+        """Record 2D observations of points in a view."""
+        self._obs_views.append(np.full(len(point_ids), view, dtype=np.int32))
+        self._obs_points.append(np.asarray(point_ids, dtype=np.int64))
+        self._obs_xy.append(np.asarray(xy, dtype=np.float32))
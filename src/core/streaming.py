@@ -0,0 +1,227 @@
+"""
+Streaming Reconstruction Module
+
+Grows a sparse reconstruction while frames are still being captured. The
+capture loop hands each frame to submit(), which only enqueues it; a
+background worker detects features, registers the frame against the last
+registered views with incremental SfM and publishes a small status snapshot
+(registered views, point count, coverage) that a live preview can draw
+without touching the reconstruction itself.
+"""
+
+import queue
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .features import Features
+from .reconstruction import StereoReconstructor
+from .sfm import IncrementalSfM
+
+
+class StreamingReconstruction:
+    """Incremental SfM on a background thread, fed frame by frame during capture."""
+
+    def __init__(self, reconstructor: StereoReconstructor, queue_size: int = 8, keep_views: int = 5,
+                 min_matches: int = 50, coverage_bins: int = 36):
+        """
+        Initialize streaming reconstruction.
+
+        Args:
+            reconstructor: Calibrated reconstructor providing detection, matching and pose estimation
+            queue_size: Frames waiting for the worker before new frames are dropped
+            keep_views: Recently registered views kept as registration partners
+            min_matches: Matches needed to seed or register a view
+            coverage_bins: Azimuth sectors around the object used for the coverage figure
+        """
+        if reconstructor.calibration_data is None:
+            raise ValueError("Camera calibration data not loaded")
+
+        self.reconstructor = reconstructor
+        self.keep_views = keep_views
+        self.min_matches = min_matches
+        self.coverage_bins = coverage_bins
+
+        self._frames: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # (view, features) of the most recently registered views, newest last
+        self._recent: List[Tuple[int, Features]] = []
+        self._seed: Optional[Tuple[int, Features]] = None
+        self._next_view = 0
+        self._status = self._initial_status()
+
+    @staticmethod
+    def _initial_status() -> Dict:
+        """Live statistics before the first frame of a session."""
+        return {
+            "frames": 0,
+            "dropped": 0,
+            "registered": 0,
+            "points": 0,
+            "coverage": 0.0,
+            "message": "Waiting for frames"
+        }
+
+    @property
+    def is_running(self) -> bool:
+        """True while the worker thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start a new reconstruction and its worker thread."""
+        if self.is_running:
+            return
+        self.reconstructor.sfm = IncrementalSfM(self.reconstructor.calibration_data['camera_matrix'])
+        self._recent = []
+        self._seed = None
+        self._next_view = 0
+        # Frames left over from an earlier session belong to another scan
+        while True:
+            try:
+                self._frames.get_nowait()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._status = self._initial_status()
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+
+    def submit(self, frame: np.ndarray) -> bool:
+        """
+        Queue a captured frame for reconstruction without blocking the caller.
+
+        Args:
+            frame: BGR image
+
+        Returns:
+            True if queued, False if the worker is not running or is behind and the frame was dropped
+        """
+        if not self.is_running:
+            return False
+        try:
+            self._frames.put_nowait(frame)
+        except queue.Full:
+            with self._lock:
+                self._status["dropped"] += 1
+            return False
+        return True
+
+    def stop(self, refine: bool = False) -> np.ndarray:
+        """
+        Process the queued frames, stop the worker and return the sparse points.
+
+        Args:
+            refine: Bundle-adjust the final reconstruction
+
+        Returns:
+            (N, 3) points in the frame of the first registered view
+        """
+        if self.is_running:
+            self._frames.put(None)
+            self._thread.join()
+        sfm = self.reconstructor.sfm
+        if refine and sfm is not None and sfm.num_points > 0 and self.reconstructor.bundle_adjuster is not None:
+            self.reconstructor.refine_structure()
+        return self.points()
+
+    def status(self) -> Dict:
+        """Snapshot of the live statistics (safe to call from any thread)."""
+        with self._lock:
+            return dict(self._status)
+
+    def points(self) -> np.ndarray:
+        """Copy of the current sparse points."""
+        with self._lock:
+            sfm = self.reconstructor.sfm
+            return sfm.points_3d.copy() if sfm is not None else np.empty((0, 3))
+
+    def _worker(self):
+        """Consume frames until the stop sentinel arrives."""
+        while True:
+            frame = self._frames.get()
+            if frame is None:
+                break
+            try:
+                message = self._process(frame)
+            except Exception as e:
+                message = f"Frame skipped: {e}"
+            with self._lock:
+                sfm = self.reconstructor.sfm
+                self._status.update(frames=self._status["frames"] + 1, registered=len(sfm.poses),
+                                    points=sfm.num_points, coverage=self._coverage(), message=message)
+
+    def _process(self, frame: np.ndarray) -> str:
+        """Detect features in a frame and add it to the reconstruction."""
+        rec = self.reconstructor
+        sfm = rec.sfm
+        features = rec.detect_features(frame)
+        view = self._next_view
+        self._next_view += 1
+        if len(features) == 0:
+            return f"Frame {view}: no features"
+
+        if not sfm.is_initialized:
+            if self._seed is not None:
+                seed_view, seed_features = self._seed
+                matches = rec.match_features(seed_features.descriptors, features.descriptors)
+                pose = None
+                if len(matches) >= self.min_matches:
+                    pose = rec.estimate_pose(seed_features, features, matches)
+                if pose is not None:
+                    R, t = pose
+                    if rec.epipolar_band is not None:
+                        matches = rec.match_guided(seed_features, features, R, t)
+                    with self._lock:
+                        sfm.initialize(seed_view, seed_features, view, features, matches, R, t)
+                    self._remember(seed_view, seed_features)
+                    self._remember(view, features)
+                    return f"Frame {view}: reconstruction initialized"
+            self._seed = (view, features)
+            return f"Frame {view}: waiting for a second view with enough overlap"
+
+        # Newest partner first; older ones recover from a frame that lost tracking
+        for ref_view, ref_features in reversed(self._recent):
+            matches = rec.match_features(ref_features.descriptors, features.descriptors)
+            if len(matches) < self.min_matches:
+                continue
+            with self._lock:
+                registered = sfm.register_view(view, features, ref_view, ref_features, matches)
+                if registered and rec.epipolar_band is not None:
+                    guided = rec.match_guided(ref_features, features, *sfm.relative_pose(ref_view, view))
+                    sfm.link_view(view, features, ref_view, ref_features, guided)
+            if registered:
+                self._remember(view, features)
+                return f"Frame {view}: registered against view {ref_view}"
+        return f"Frame {view}: could not be registered"
+
+    def _remember(self, view: int, features: Features):
+        """Keep a registered view as a partner for the next frames."""
+        self._recent.append((view, features))
+        del self._recent[:-self.keep_views]
+
+    def _coverage(self) -> float:
+        """
+        Fraction of azimuth sectors around the object seen by a registered camera.
+
+        Camera centres are expressed around the median sparse point, in the
+        plane perpendicular to the cameras' mean up direction.
+        """
+        sfm = self.reconstructor.sfm
+        if sfm is None or len(sfm.poses) < 2 or sfm.num_points == 0:
+            return 0.0
+
+        rotations = np.array([R for R, _ in sfm.poses.values()])
+        centers = np.array([(-R.T @ t).ravel() for R, t in sfm.poses.values()])
+        # Image y points down, so the camera's up direction is minus its second row
+        up = -np.mean(rotations[:, 1, :], axis=0)
+        up /= np.linalg.norm(up)
+        offsets = centers - np.median(sfm.points_3d, axis=0)
+        offsets -= np.outer(offsets @ up, up)
+
+        x_axis = offsets[0] / max(np.linalg.norm(offsets[0]), 1e-12)
+        y_axis = np.cross(up, x_axis)
+        azimuth = np.arctan2(offsets @ y_axis, offsets @ x_axis)
+        sectors = np.floor((azimuth + np.pi) / (2 * np.pi) * self.coverage_bins).astype(int) % self.coverage_bins
+        return len(np.unique(sectors)) / self.coverage_bins
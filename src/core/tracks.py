@@ -0,0 +1,207 @@
+"""
+Feature Track Module
+
+Merges pairwise feature matches into tracks - one keypoint per image that
+all see the same scene point. Keypoints of all images get one global index,
+matches become edges between them, and the connected components are found
+with an array-based union-find (vectorized hooking and pointer jumping).
+Components holding two keypoints of the same image are inconsistent and
+dropped. Tracks are stored CSR-style: one flat (image, keypoint) list plus
+the offset where each track starts.
+"""
+
+from typing import Dict, Mapping, Tuple
+
+import numpy as np
+
+from .features import Matches
+from .triangulation import triangulate_multiview
+
+
+class Tracks:
+    """Feature tracks in compressed (CSR) form."""
+
+    def __init__(self, offsets: np.ndarray, images: np.ndarray, keypoints: np.ndarray):
+        """
+        Initialize tracks.
+
+        Args:
+            offsets: (T + 1,) start of each track in images/keypoints
+            images: (M,) image id of each track element
+            keypoints: (M,) keypoint index of each track element within its image
+        """
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.images = np.asarray(images, dtype=np.int32)
+        self.keypoints = np.asarray(keypoints, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Number of images observing each track."""
+        return np.diff(self.offsets)
+
+    def track(self, index: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(image ids, keypoint indices) of one track."""
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.images[start:end], self.keypoints[start:end]
+
+    def points_2d(self, keypoints: Mapping[int, np.ndarray]) -> np.ndarray:
+        """(M, 2) pixel coordinates of all track elements, from the (K, 2) keypoint coordinates of each image id."""
+        xy = np.empty((len(self.images), 2), dtype=np.float32)
+        for image in np.unique(self.images):
+            element = self.images == image
+            xy[element] = keypoints[int(image)][self.keypoints[element]]
+        return xy
+
+    def observations(self, keypoints: Mapping[int, np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Track elements in the observation layout used by the bundle adjuster.
+
+        Args:
+            keypoints: (K, 2) keypoint coordinates of each image id (e.g. Features.points)
+
+        Returns:
+            Tuple of (image ids, track index of each element, (M, 2) pixel coordinates)
+        """
+        track_ids = np.repeat(np.arange(len(self), dtype=np.int64), self.lengths)
+        return self.images.copy(), track_ids, self.points_2d(keypoints)
+
+    def triangulate(self, camera_matrix: np.ndarray, poses: Dict[int, Tuple[np.ndarray, np.ndarray]],
+                    keypoints: Mapping[int, np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Triangulate every track from its elements in posed images.
+
+        Elements in images without a pose are ignored; tracks left with
+        fewer than two posed elements get NaN points.
+
+        Args:
+            camera_matrix: 3x3 camera intrinsic matrix
+            poses: World-to-camera (R, t) of each posed image id
+            keypoints: (K, 2) keypoint coordinates of each image id
+
+        Returns:
+            Tuple of ((T, 3) points, (T,) RMS reprojection error, (T,) triangulation angle in degrees)
+        """
+        posed = np.array(sorted(poses), dtype=np.int64)
+        K = np.asarray(camera_matrix, dtype=np.float64)
+        projection_matrices = np.array([K @ np.hstack([poses[v][0], np.asarray(poses[v][1]).reshape(3, 1)])
+                                        for v in posed]).reshape(-1, 3, 4)
+
+        keep = np.isin(self.images, posed)
+        track_ids = np.repeat(np.arange(len(self)), self.lengths)[keep]
+        offsets = np.searchsorted(track_ids, np.arange(len(self) + 1))
+        view_index = np.searchsorted(posed, self.images[keep])
+        return triangulate_multiview(projection_matrices, offsets, view_index, self.points_2d(keypoints)[keep])
+
+
+class TrackBuilder:
+    """Union-find merging of pairwise matches into tracks."""
+
+    def __init__(self):
+        # First global keypoint index and keypoint count of each image
+        self._image_start: Dict[int, int] = {}
+        self._image_size: Dict[int, int] = {}
+        self._num_keypoints = 0
+        self._edges = []
+
+    def add_image(self, image: int, num_keypoints: int):
+        """Register an image's keypoints (each image once, before its matches)."""
+        if image in self._image_start:
+            raise ValueError(f"Image {image} already added to the track builder")
+        self._image_start[image] = self._num_keypoints
+        self._image_size[image] = int(num_keypoints)
+        self._num_keypoints += int(num_keypoints)
+
+    def add_matches(self, image1: int, image2: int, matches: Matches):
+        """Add the matches between two registered images (query keypoints in image1)."""
+        if image1 not in self._image_start or image2 not in self._image_start:
+            raise ValueError(f"Images {image1} and {image2} must be added before their matches")
+        if len(matches) == 0:
+            return
+        self._edges.append(np.column_stack([matches.query_idx.astype(np.int64) + self._image_start[image1],
+                                            matches.train_idx.astype(np.int64) + self._image_start[image2]]))
+
+    def add_correspondences(self, images1: np.ndarray, keypoints1: np.ndarray,
+                            images2: np.ndarray, keypoints2: np.ndarray):
+        """
+        Add correspondences between keypoints of any registered images at once.
+
+        Args:
+            images1: (E,) image id of the first keypoint of each correspondence
+            keypoints1: (E,) keypoint index of the first keypoint within its image
+            images2: (E,) image id of the second keypoint
+            keypoints2: (E,) keypoint index of the second keypoint within its image
+        """
+        images = np.concatenate([images1, images2]).astype(np.int64)
+        unknown = np.setdiff1d(images, list(self._image_start))
+        if len(unknown):
+            raise ValueError(f"Images {unknown.tolist()} must be added before their correspondences")
+        if len(images) == 0:
+            return
+        ids = np.array(sorted(self._image_start), dtype=np.int64)
+        starts = np.array([self._image_start[i] for i in ids], dtype=np.int64)
+        start1 = starts[np.searchsorted(ids, np.asarray(images1, dtype=np.int64))]
+        start2 = starts[np.searchsorted(ids, np.asarray(images2, dtype=np.int64))]
+        self._edges.append(np.column_stack([np.asarray(keypoints1, dtype=np.int64) + start1,
+                                            np.asarray(keypoints2, dtype=np.int64) + start2]))
+
+    def _components(self, edges: np.ndarray) -> np.ndarray:
+        """Root label of every global keypoint (smallest keypoint index of its component)."""
+        parent = np.arange(self._num_keypoints, dtype=np.int64)
+        while True:
+            # Hook: both ends of every edge point at the smaller of their roots
+            roots = np.minimum(parent[edges[:, 0]], parent[edges[:, 1]])
+            previous = parent.copy()
+            np.minimum.at(parent, parent[edges[:, 0]], roots)
+            np.minimum.at(parent, parent[edges[:, 1]], roots)
+            # Shortcut: compress paths until every node points at a root
+            while True:
+                grandparent = parent[parent]
+                if np.array_equal(grandparent, parent):
+                    break
+                parent = grandparent
+            if np.array_equal(parent, previous):
+                return parent
+
+    def build(self, min_length: int = 2) -> Tracks:
+        """
+        Merge all added matches into consistent tracks.
+
+        Args:
+            min_length: Minimum number of images per track
+
+        Returns:
+            Tracks sorted by their first keypoint, elements sorted by image
+        """
+        if not self._edges:
+            return Tracks(np.zeros(1), np.empty(0), np.empty(0))
+
+        edges = np.vstack(self._edges)
+        labels = self._components(edges)
+
+        # Global keypoint -> (image, keypoint); only keypoints that appear in a match join tracks
+        images = np.array(list(self._image_start), dtype=np.int64)
+        starts = np.array([self._image_start[i] for i in images], dtype=np.int64)
+        members = np.unique(edges)
+        owner = np.searchsorted(starts, members, side='right') - 1
+        member_images = images[owner]
+        member_labels = labels[members]
+
+        order = np.lexsort((member_images, member_labels))
+        member_labels = member_labels[order]
+        member_images = member_images[order]
+        keypoints = members[order] - starts[owner[order]]
+
+        # A track that sees one image twice merged two different scene points
+        repeated = (member_labels[1:] == member_labels[:-1]) & (member_images[1:] == member_images[:-1])
+        inconsistent = np.unique(member_labels[1:][repeated])
+        unique_labels, lengths = np.unique(member_labels, return_counts=True)
+        valid = (lengths >= min_length) & ~np.isin(unique_labels, inconsistent)
+
+        element_valid = np.repeat(valid, lengths)
+        offsets = np.concatenate([[0], np.cumsum(lengths[valid])])
+        print(f"Tracks: {np.count_nonzero(valid)} built from {len(edges)} matches "
+              f"({len(inconsistent)} inconsistent dropped)")
+        return Tracks(offsets, member_images[element_valid], keypoints[element_valid])
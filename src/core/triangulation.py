@@ -0,0 +1,94 @@
+"""
+Multi-View Triangulation Module
+
+Linear (DLT) triangulation of feature tracks seen in any number of views.
+Tracks are given in compressed form - one flat array of observations plus
+offsets where each track starts - and all tracks of the same length are
+solved together with one stacked SVD, so a whole reconstruction is
+triangulated with a handful of vectorized calls instead of a Python loop
+per point.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+def camera_centers(projection_matrices: np.ndarray) -> np.ndarray:
+    """
+    Camera centres of a stack of projection matrices.
+
+    Args:
+        projection_matrices: (V, 3, 4) projection matrices
+
+    Returns:
+        (V, 3) centres in world coordinates
+    """
+    P = np.asarray(projection_matrices, dtype=np.float64)
+    return -np.linalg.solve(P[:, :, :3], P[:, :, 3:])[..., 0]
+
+
+def triangulate_multiview(projection_matrices: np.ndarray, offsets: np.ndarray, views: np.ndarray,
+                          points_2d: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Triangulate tracks from all of their observations.
+
+    Track i owns observations offsets[i]:offsets[i + 1]; observation j is
+    pixel points_2d[j] in the view with projection matrix
+    projection_matrices[views[j]]. Tracks with fewer than two observations
+    are not triangulated.
+
+    Args:
+        projection_matrices: (V, 3, 4) projection matrices
+        offsets: (T + 1,) start of each track in the observation arrays
+        views: (M,) projection matrix index of each observation
+        points_2d: (M, 2) pixel coordinates of each observation
+
+    Returns:
+        Tuple of ((T, 3) points, (T,) RMS reprojection error in pixels,
+        (T,) triangulation angle in degrees - the widest angle between two
+        viewing rays of the track); untriangulated tracks get NaN points,
+        infinite error and zero angle
+    """
+    P = np.asarray(projection_matrices, dtype=np.float64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    views = np.asarray(views, dtype=np.int64)
+    points_2d = np.asarray(points_2d, dtype=np.float64)
+    centers = camera_centers(P)
+
+    lengths = np.diff(offsets)
+    points = np.full((len(lengths), 3), np.nan)
+    errors = np.full(len(lengths), np.inf)
+    angles = np.zeros(len(lengths))
+
+    for length in np.unique(lengths[lengths >= 2]):
+        tracks = np.flatnonzero(lengths == length)
+        observations = offsets[tracks][:, np.newaxis] + np.arange(length)
+        track_P = P[views[observations]]
+        xy = points_2d[observations]
+
+        # Two equations per observation: x P3 - P1 = 0 and y P3 - P2 = 0
+        A = np.stack([xy[..., 0:1] * track_P[..., 2, :] - track_P[..., 0, :],
+                      xy[..., 1:2] * track_P[..., 2, :] - track_P[..., 1, :]], axis=2)
+        A = A.reshape(len(tracks), 2 * length, 4)
+        A /= np.maximum(np.linalg.norm(A, axis=2, keepdims=True), 1e-12)
+        homogeneous = np.linalg.svd(A)[2][:, -1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            X = homogeneous[:, :3] / homogeneous[:, 3:]
+
+        projected = (track_P @ np.hstack([X, np.ones((len(X), 1))])[:, np.newaxis, :, np.newaxis])[..., 0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            residuals = projected[..., :2] / projected[..., 2:] - xy
+            rms = np.sqrt(np.mean(np.sum(residuals ** 2, axis=2), axis=1))
+
+            rays = X[:, np.newaxis, :] - centers[views[observations]]
+            rays /= np.linalg.norm(rays, axis=2, keepdims=True)
+        cosines = np.einsum('tli,tmi->tlm', rays, rays)
+        widest = np.degrees(np.arccos(np.clip(np.min(cosines.reshape(len(tracks), -1), axis=1), -1, 1)))
+
+        finite = np.all(np.isfinite(X), axis=1) & np.isfinite(rms)
+        points[tracks] = X
+        errors[tracks] = np.where(finite, rms, np.inf)
+        angles[tracks] = np.where(finite, widest, 0.0)
+
+    return points, errors, angles
@@ -0,0 +1,221 @@
+"""
+Turntable Motion Model Module
+
+Describes scans where a fixed camera looks at an object on a turntable (or,
+equivalently, a camera moving on a circle around the object). All views
+share one rotation axis, so each view only adds one unknown - its turntable
+angle - instead of a free 6-DOF pose. The angle of a new view is found with
+a vectorized 1-D search rather than an essential-matrix RANSAC: candidates
+are scored by the reprojection error of already triangulated points, which
+the epipolar (Sampson) error only replaces while there are no such points -
+an angle error mostly moves points along their epipolar lines, so the
+Sampson error barely changes with it.
+"""
+
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+# Fewest matches with a 3D point for candidate angles to be scored by reprojection
+_MIN_POINTS_3D = 12
+
+
+def _axis_rotations(axis: np.ndarray, angles: np.ndarray) -> np.ndarray:
+    """(T, 3, 3) rotations about one unit axis by each angle (Rodrigues formula)."""
+    a = np.array([[0, -axis[2], axis[1]], [axis[2], 0, -axis[0]], [-axis[1], axis[0], 0]])
+    angles = np.asarray(angles, dtype=np.float64).reshape(-1, 1, 1)
+    return np.eye(3) + np.sin(angles) * a + (1 - np.cos(angles)) * (a @ a)
+
+
+class TurntableModel:
+    """Poses of all views as rotations about one axis through a fixed centre."""
+
+    def __init__(self, axis: np.ndarray, center: np.ndarray, step: float):
+        """
+        Initialize the motion model.
+
+        The world frame is the camera frame of the first view (angle 0); a view
+        at angle a has the world-to-camera pose R = Rot(axis, a), t = c - R c.
+
+        Args:
+            axis: Rotation axis direction in the world frame
+            center: Point on the rotation axis in the world frame
+            step: Expected turntable angle between consecutive frames in radians
+        """
+        self.axis = np.asarray(axis, dtype=np.float64) / np.linalg.norm(axis)
+        self.center = np.asarray(center, dtype=np.float64).ravel()
+        self.step = float(step)
+        # Turntable angle of each registered view
+        self.angles: Dict[int, float] = {}
+
+    @classmethod
+    def fit(cls, relative_poses: List[Tuple[np.ndarray, np.ndarray]],
+            max_direction_error: float = np.radians(5.0), max_step_error: float = 0.5) -> 'TurntableModel':
+        """
+        Fit the axis, centre and angular step to relative poses of consecutive frames.
+
+        The essential-matrix translations have no scale, so the centre is put
+        at unit distance from the first camera: reconstructions come out in
+        units of the camera-to-axis distance. The centre is solved in the
+        plane perpendicular to the axis, where I - R is well conditioned, from
+        all pairs at once: (I - R_i) c = s_i t_i for unknown scales s_i.
+
+        Args:
+            relative_poses: (R, t) of each frame relative to the previous one
+            max_direction_error: Largest median angle in radians between the measured translation
+                directions and the ones the fitted model predicts
+            max_step_error: Largest relative difference between the step measured by the rotations
+                and the step implied by the translation directions
+
+        Returns:
+            Fitted model
+
+        Raises:
+            ValueError: If there are no poses or they do not fit a turntable motion
+        """
+        if not relative_poses:
+            raise ValueError("Need at least one relative pose to fit the turntable model")
+
+        rotation_vectors = np.array([cv2.Rodrigues(np.asarray(R, np.float64))[0].ravel() for R, _ in relative_poses])
+        angles = np.linalg.norm(rotation_vectors, axis=1)
+
+        # A mis-decomposed essential matrix turns by a very different angle than the other pairs
+        consistent = np.abs(angles - np.median(angles)) <= 0.5 * np.median(angles)
+        relative_poses = [pose for pose, keep in zip(relative_poses, consistent) if keep]
+        rotation_vectors, angles = rotation_vectors[consistent], angles[consistent]
+        axes = rotation_vectors / np.maximum(angles, 1e-12)[:, np.newaxis]
+
+        # Relative rotations may report the axis with either sign; align them to the first
+        signs = np.where(axes @ axes[0] < 0, -1.0, 1.0)
+        axis = np.sum(axes * (signs * angles)[:, np.newaxis], axis=0)
+        axis /= np.linalg.norm(axis)
+        step = float(np.median(signs * angles))
+        if step < 0:
+            axis, step = -axis, -step
+
+        # Stacked homogeneous system in (centre coordinates in the plane, one scale per pair)
+        plane = np.linalg.svd(axis[np.newaxis])[2][1:].T
+        rotations = [np.asarray(R, np.float64) for R, _ in relative_poses]
+        directions = np.array([np.asarray(t, np.float64).ravel() / np.linalg.norm(t) for _, t in relative_poses])
+        n = len(relative_poses)
+        system = np.zeros((3 * n, 2 + n))
+        for i, (R, direction) in enumerate(zip(rotations, directions)):
+            system[3 * i:3 * i + 3, :2] = (np.eye(3) - R) @ plane
+            system[3 * i:3 * i + 3, 2 + i] = -direction
+        solution = np.linalg.svd(system)[2][-1]
+        if np.sum(solution[2:]) < 0:
+            solution = -solution
+        center = plane @ solution[:2]
+        center /= np.linalg.norm(center)
+
+        # The model must explain the translation directions, including the step they imply:
+        # the chord of a turn by a makes an angle of 90 - a / 2 degrees with the centre
+        predicted = np.array([(np.eye(3) - R) @ center for R in rotations])
+        predicted /= np.maximum(np.linalg.norm(predicted, axis=1, keepdims=True), 1e-12)
+        direction_error = float(np.median(np.arccos(np.clip(np.sum(predicted * directions, axis=1), -1, 1))))
+        chord_step = float(np.median(2 * np.arcsin(np.clip(directions @ center, -1, 1))))
+        if direction_error > max_direction_error or abs(chord_step - step) > max_step_error * step:
+            raise ValueError(f"Relative poses do not fit a turntable motion (direction error "
+                             f"{np.degrees(direction_error):.1f} deg, step {np.degrees(step):.2f} deg "
+                             f"from rotations vs {np.degrees(chord_step):.2f} deg from translations)")
+        return cls(axis, center, step)
+
+    def pose(self, angle: float) -> Tuple[np.ndarray, np.ndarray]:
+        """World-to-camera (R, t) of a view at a turntable angle."""
+        R = _axis_rotations(self.axis, angle)[0]
+        return R, (self.center - R @ self.center).reshape(3, 1)
+
+    def relative_pose(self, angle1: float, angle2: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Pose (R, t) of the view at angle2 relative to the view at angle1."""
+        return self.pose(angle2 - angle1)
+
+    def record(self, view: int, angle: float):
+        """Store a view's angle and update the expected step from all consecutive registered views."""
+        self.angles[view] = float(angle)
+        views = np.array(sorted(self.angles))
+        if len(views) >= 2:
+            angles = np.array([self.angles[v] for v in views])
+            self.step = float(np.median(np.diff(angles) / np.diff(views)))
+
+    def estimate_angle(self, camera_matrix: np.ndarray, points1: np.ndarray, points2: np.ndarray,
+                       angle1: float, predicted: float, search_range: Optional[float] = None,
+                       threshold: float = 1.0, samples: int = 121, points_3d: Optional[np.ndarray] = None,
+                       reprojection_threshold: float = 4.0) -> Tuple[float, np.ndarray]:
+        """
+        Find the angle of a view from its matches with a view of known angle.
+
+        Every candidate angle in the search window is scored at once by a
+        truncated squared error, and the best candidate is then refined on a
+        finer grid. The error is the reprojection error of the matches' 3D
+        points in the new view when enough matches have one, and the Sampson
+        error of all matches otherwise.
+
+        Args:
+            camera_matrix: 3x3 camera intrinsic matrix
+            points1: (M, 2) matched points in the view of known angle
+            points2: (M, 2) matched points in the new view
+            angle1: Angle of the first view
+            predicted: Predicted angle of the new view
+            search_range: Half-width of the search window in radians (default: twice the step, at least 5 degrees)
+            threshold: Inlier threshold on the Sampson distance in pixels
+            samples: Candidate angles per search pass
+            points_3d: Optional (M, 3) world point of each match (NaN where a match has none)
+            reprojection_threshold: Truncation of the reprojection error in pixels
+
+        Returns:
+            Tuple of (angle of the new view, mask of the matches that fit it epipolarly)
+        """
+        if search_range is None:
+            search_range = max(2 * abs(self.step), np.radians(5.0))
+        if len(points1) == 0:
+            return predicted, np.zeros(0, dtype=bool)
+
+        K_inv = np.linalg.inv(np.asarray(camera_matrix, dtype=np.float64))
+        x1 = np.hstack([points1, np.ones((len(points1), 1))]) @ K_inv.T
+        x2 = np.hstack([points2, np.ones((len(points2), 1))]) @ K_inv.T
+        # Normalised coordinates: express the pixel threshold in them via the focal length
+        focal = np.sqrt(camera_matrix[0, 0] * camera_matrix[1, 1])
+        limit = (threshold / focal) ** 2
+
+        def sampson(candidates):
+            R = _axis_rotations(self.axis, candidates - angle1)
+            t = self.center - R @ self.center
+            t_cross = np.zeros_like(R)
+            t_cross[:, 0, 1], t_cross[:, 0, 2] = -t[:, 2], t[:, 1]
+            t_cross[:, 1, 0], t_cross[:, 1, 2] = t[:, 2], -t[:, 0]
+            t_cross[:, 2, 0], t_cross[:, 2, 1] = -t[:, 1], t[:, 0]
+            E = t_cross @ R
+            Ex1 = np.einsum('tij,mj->tmi', E, x1)
+            Etx2 = np.einsum('tji,mj->tmi', E, x2)
+            numerator = np.einsum('mi,tmi->tm', x2, Ex1) ** 2
+            denominator = Ex1[..., 0] ** 2 + Ex1[..., 1] ** 2 + Etx2[..., 0] ** 2 + Etx2[..., 1] ** 2
+            # A zero rotation has no baseline and therefore no epipolar geometry
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.where(denominator > 1e-18, numerator / denominator, np.inf)
+
+        known = np.zeros(len(points1), dtype=bool)
+        if points_3d is not None:
+            known = np.all(np.isfinite(points_3d), axis=1)
+        if np.count_nonzero(known) >= _MIN_POINTS_3D:
+            world, observed = np.asarray(points_3d, np.float64)[known], np.asarray(points2, np.float64)[known]
+            camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+
+            def cost(candidates):
+                R = _axis_rotations(self.axis, candidates)
+                t = self.center - R @ self.center
+                projected = np.einsum('ij,tmj->tmi', camera_matrix, np.einsum('tij,mj->tmi', R, world) + t[:, np.newaxis])
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    squared = np.sum((projected[..., :2] / projected[..., 2:] - observed) ** 2, axis=2)
+                squared = np.where(projected[..., 2] > 0, np.nan_to_num(squared, nan=np.inf), np.inf)
+                return np.sum(np.minimum(squared, reprojection_threshold ** 2), axis=1)
+        else:
+            def cost(candidates):
+                return np.sum(np.minimum(sampson(candidates), limit), axis=1)
+
+        # Coarse pass over the whole window, then a fine pass around the winner
+        candidates = predicted + np.linspace(-search_range, search_range, samples)
+        best = candidates[np.argmin(cost(candidates))]
+        spacing = 2 * search_range / (samples - 1)
+        candidates = best + np.linspace(-spacing, spacing, 21)
+        angle = float(candidates[np.argmin(cost(candidates))])
+        return angle, sampson(np.array([angle]))[0] < limit
@@ -0,0 +1,158 @@
+"""
+Visual Hull Module
+
+Space carving from silhouettes: a voxel is kept only if it projects onto the
+foreground mask in every view that sees it. Voxel centres are projected into
+all views with one batched matrix product per chunk, and the grid is refined
+as an octree - only voxels on the boundary between kept and carved space are
+split into eight children at the next level, so the fine resolution is paid
+for near the surface only.
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+# Face neighbours of a voxel
+_NEIGHBOURS = np.array([[1, 0, 0], [-1, 0, 0], [0, 1, 0], [0, -1, 0], [0, 0, 1], [0, 0, -1]])
+# Child offsets of an octree cell
+_CHILDREN = np.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)])
+
+
+class VisualHull:
+    """Octree space carving from calibrated foreground masks."""
+
+    def __init__(self, resolution: int = 32, levels: int = 3, tolerance: int = 0,
+                 chunk_size: int = 65536):
+        """
+        Initialize the carving engine.
+
+        Args:
+            resolution: Voxels per axis of the coarsest grid
+            levels: Octree refinements near the surface (finest grid: resolution * 2**levels)
+            tolerance: Views that may see a voxel on the background before it is carved
+            chunk_size: Voxels projected per batch
+        """
+        self.resolution = resolution
+        self.levels = levels
+        self.tolerance = tolerance
+        self.chunk_size = chunk_size
+
+    def carve(self, masks: Dict[int, np.ndarray], poses: Dict[int, Tuple[np.ndarray, np.ndarray]],
+              camera_matrix: np.ndarray, bounds: Tuple[np.ndarray, np.ndarray]
+              ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Carve the visual hull of the masked object.
+
+        Args:
+            masks: Foreground mask of each view (non-zero = object), all the same size
+            poses: World-to-camera (R, t) of each view
+            camera_matrix: 3x3 camera intrinsic matrix
+            bounds: (min corner, max corner) of the box to carve in world coordinates
+
+        Returns:
+            Tuple of ((N, 3) centres of the kept voxels, (N,) their edge lengths,
+            (N,) True for finest-level voxels on the hull surface)
+        """
+        views = [v for v in sorted(masks) if v in poses]
+        if not views:
+            raise ValueError("Need at least one view with a mask and a pose to carve")
+
+        K = np.asarray(camera_matrix, dtype=np.float64)
+        projections = np.array([K @ np.hstack([poses[v][0], np.asarray(poses[v][1]).reshape(3, 1)])
+                                for v in views])
+        silhouettes = np.stack([masks[v] > 0 for v in views])
+
+        low = np.asarray(bounds[0], dtype=np.float64)
+        # Cubic voxels: the grid spans the longest side of the box
+        extent = float(np.max(np.asarray(bounds[1], dtype=np.float64) - low))
+
+        # Coarsest level: classify the full grid
+        size = self.resolution
+        coords = np.indices((size,) * 3).reshape(3, -1).T
+        levels = []
+        centers, edges, surface = [], [], []
+
+        for level in range(self.levels + 1):
+            edge = extent / size
+            occupied = self._classify(low + (coords + 0.5) * edge, projections, silhouettes)
+            keys = self._keys(coords, size)
+            order = np.argsort(keys)
+            levels.append((keys[order], occupied[order], size))
+
+            # Boundary voxels: kept with a carved neighbour or carved with a kept neighbour
+            neighbour_state = np.stack([self._state(coords + offset, levels) for offset in _NEIGHBOURS], axis=1)
+            boundary = np.where(occupied[:, np.newaxis], ~neighbour_state, neighbour_state).any(axis=1)
+
+            if level == self.levels:
+                centers.append(low + (coords[occupied] + 0.5) * edge)
+                edges.append(np.full(np.count_nonzero(occupied), edge))
+                surface.append(boundary[occupied])
+                break
+
+            # Interior voxels are final; boundary voxels are split
+            interior = occupied & ~boundary
+            centers.append(low + (coords[interior] + 0.5) * edge)
+            edges.append(np.full(np.count_nonzero(interior), edge))
+            surface.append(np.zeros(np.count_nonzero(interior), dtype=bool))
+            coords = (2 * coords[boundary][:, np.newaxis, :] + _CHILDREN).reshape(-1, 3)
+            size *= 2
+
+        centers = np.vstack(centers)
+        edges = np.concatenate(edges)
+        surface = np.concatenate(surface)
+        print(f"Visual hull: {len(centers)} voxels kept from {len(views)} silhouettes, "
+              f"{np.count_nonzero(surface)} on the surface at {size}^3")
+        return centers, edges, surface
+
+    def _classify(self, points: np.ndarray, projections: np.ndarray, silhouettes: np.ndarray) -> np.ndarray:
+        """True for points inside the silhouette in all but tolerance of the views that see them."""
+        views, height, width = silhouettes.shape
+        kept = np.empty(len(points), dtype=bool)
+        view_index = np.arange(views)[:, np.newaxis]
+
+        for start in range(0, len(points), self.chunk_size):
+            chunk = points[start:start + self.chunk_size]
+            homogeneous = np.hstack([chunk, np.ones((len(chunk), 1))])
+            # All views at once: (V, 3, 4) @ (4, N) -> (V, 3, N)
+            projected = projections @ homogeneous.T
+            depth = projected[:, 2]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                u = np.floor(projected[:, 0] / depth + 0.5)
+                v = np.floor(projected[:, 1] / depth + 0.5)
+            visible = (depth > 0) & (u >= 0) & (u < width) & (v >= 0) & (v < height)
+
+            inside = silhouettes[view_index, np.where(visible, v, 0).astype(np.int64),
+                                 np.where(visible, u, 0).astype(np.int64)]
+            misses = np.sum(visible & ~inside, axis=0)
+            kept[start:start + len(chunk)] = misses <= self.tolerance
+        return kept
+
+    @staticmethod
+    def _keys(coords: np.ndarray, size: int) -> np.ndarray:
+        """Linear index of integer voxel coordinates in a size^3 grid."""
+        return (coords[:, 0] * size + coords[:, 1]) * size + coords[:, 2]
+
+    def _state(self, coords: np.ndarray, levels) -> np.ndarray:
+        """
+        Kept/carved state of voxels, looked up at the finest level that classified them.
+
+        Voxels that were not classified at their own level lie inside a
+        coarser leaf, whose state they inherit; voxels outside the box are carved.
+        """
+        size = levels[-1][2]
+        state = np.zeros(len(coords), dtype=bool)
+        pending = np.all((coords >= 0) & (coords < size), axis=1)
+        coords = coords.copy()
+
+        for keys, occupied, level_size in reversed(levels):
+            if not np.any(pending):
+                break
+            scale = size // level_size
+            lookup = self._keys(coords[pending] // scale, level_size)
+            position = np.minimum(np.searchsorted(keys, lookup), len(keys) - 1)
+            found = keys[position] == lookup
+            indices = np.flatnonzero(pending)
+            state[indices[found]] = occupied[position[found]]
+            pending[indices[found]] = False
+        return state
@@ -0,0 +1,151 @@
+"""
+Voxel Accumulator Module
+
+Merges point clouds into a voxel grid as they are produced instead of
+stacking them all at the end. Each point is hashed to the integer
+coordinates of its voxel, packed into one 64-bit key, and every occupied
+voxel keeps a running sum of positions (and colours) plus a count, so the
+merged cloud holds one mean point per voxel. Memory grows with the occupied
+scene volume, not with the number of pairs or frames, and near-duplicate
+points from overlapping pairs collapse into one.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+# Bits per axis of a packed voxel key; coordinates are offset to be non-negative
+_KEY_BITS = 21
+_KEY_OFFSET = 1 << (_KEY_BITS - 1)
+
+
+class VoxelAccumulator:
+    """Streaming voxel-hash merge of point clouds with running means, counts and colours."""
+
+    def __init__(self, voxel_size: Optional[float] = None, resolution: int = 256, min_count: int = 1):
+        """
+        Initialize the accumulator.
+
+        Args:
+            voxel_size: Voxel edge length in scene units, or None to derive it from the first cloud
+            resolution: Voxels along the longest side of the first cloud's extent (when voxel_size is None)
+            min_count: Fewest merged points a voxel needs to be returned
+        """
+        self.voxel_size = voxel_size
+        self.resolution = resolution
+        self.min_count = min_count
+        self.clear()
+
+    def clear(self):
+        """Drop all voxels (and a voxel size derived from the previous clouds)."""
+        self._size = self.voxel_size
+        self._origin: Optional[np.ndarray] = None
+        self._keys = np.empty(0, dtype=np.int64)
+        self._sums = np.empty((0, 3), dtype=np.float64)
+        self._counts = np.empty(0, dtype=np.int64)
+        self._color_sums = np.empty((0, 3), dtype=np.float64)
+        self._color_counts = np.empty(0, dtype=np.int64)
+        self.points_added = 0
+        self.points_dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def size(self) -> Optional[float]:
+        """Voxel edge length in use (None until the first cloud when derived)."""
+        return self._size
+
+    def add(self, points: np.ndarray, colors: Optional[np.ndarray] = None) -> int:
+        """
+        Merge a point cloud into the grid.
+
+        Args:
+            points: (N, 3) points
+            colors: Optional (N, 3) colours of the points (any consistent range, e.g. 0-255)
+
+        Returns:
+            Number of voxels the cloud newly occupied
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        finite = np.all(np.isfinite(points), axis=1)
+        if colors is not None:
+            colors = np.asarray(colors, dtype=np.float64).reshape(-1, 3)[finite]
+        points = points[finite]
+        self.points_dropped += int(np.count_nonzero(~finite))
+        if len(points) == 0:
+            return 0
+
+        if self._origin is None:
+            self._origin = np.median(points, axis=0)
+            if self._size is None:
+                extent = np.percentile(points, 98, axis=0) - np.percentile(points, 2, axis=0)
+                self._size = max(float(np.max(extent)), 1e-9) / self.resolution
+
+        coords = np.floor((points - self._origin) / self._size).astype(np.int64) + _KEY_OFFSET
+        inside = np.all((coords >= 0) & (coords < (1 << _KEY_BITS)), axis=1)
+        self.points_dropped += int(np.count_nonzero(~inside))
+        coords, points = coords[inside], points[inside]
+        if colors is not None:
+            colors = colors[inside]
+        self.points_added += len(points)
+        if len(points) == 0:
+            return 0
+
+        # Per-voxel sums of this cloud
+        keys = (coords[:, 0] << (2 * _KEY_BITS)) | (coords[:, 1] << _KEY_BITS) | coords[:, 2]
+        keys, inverse = np.unique(keys, return_inverse=True)
+        inverse = inverse.ravel()
+        sums = np.column_stack([np.bincount(inverse, points[:, axis], len(keys)) for axis in range(3)])
+        counts = np.bincount(inverse, minlength=len(keys))
+        color_sums = np.zeros((len(keys), 3))
+        color_counts = np.zeros(len(keys), dtype=np.int64)
+        if colors is not None:
+            color_sums = np.column_stack([np.bincount(inverse, colors[:, axis], len(keys)) for axis in range(3)])
+            color_counts = counts.copy()
+
+        # Fold into the existing voxels; unseen keys are appended and the table re-sorted
+        position = np.minimum(np.searchsorted(self._keys, keys), max(len(self._keys) - 1, 0))
+        found = (self._keys[position] == keys) if len(self._keys) else np.zeros(len(keys), dtype=bool)
+        hit = position[found]
+        self._sums[hit] += sums[found]
+        self._counts[hit] += counts[found]
+        if colors is not None:
+            self._color_sums[hit] += color_sums[found]
+            self._color_counts[hit] += color_counts[found]
+
+        new = ~found
+        if np.any(new):
+            keys = np.concatenate([self._keys, keys[new]])
+            order = np.argsort(keys, kind='stable')
+            self._keys = keys[order]
+            self._sums = np.concatenate([self._sums, sums[new]])[order]
+            self._counts = np.concatenate([self._counts, counts[new]])[order]
+            self._color_sums = np.concatenate([self._color_sums, color_sums[new]])[order]
+            self._color_counts = np.concatenate([self._color_counts, color_counts[new]])[order]
+        return int(np.count_nonzero(new))
+
+    @property
+    def counts(self) -> np.ndarray:
+        """Points merged into each returned voxel."""
+        return self._counts[self._counts >= self.min_count]
+
+    @property
+    def points(self) -> np.ndarray:
+        """(M, 3) mean point of each voxel with at least min_count points."""
+        kept = self._counts >= self.min_count
+        return self._sums[kept] / self._counts[kept, np.newaxis]
+
+    @property
+    def colors(self) -> Optional[np.ndarray]:
+        """(M, 3) mean colour of each returned voxel, or None if no colours were added."""
+        if not np.any(self._color_counts):
+            return None
+        kept = self._counts >= self.min_count
+        return self._color_sums[kept] / np.maximum(self._color_counts[kept], 1)[:, np.newaxis]
+
+    def summary(self) -> str:
+        """Human-readable merge statistics."""
+        size = f"{self._size:.4g}" if self._size is not None else "unset"
+        return (f"{self.points_added} points merged into {len(self.counts)} voxels "
+                f"(voxel size {size}, {self.points_dropped} dropped)")
@@ -18,6 +18,7 @@ import glob
 from core.image_capture import ImageCapture
 from core.grid_calibration import GridDetector
 from core.reconstruction import StereoReconstructor
+from core.masking import ForegroundMasker
 from core.stl_export import STLExporter
 
 class MainApplication:
@@ -191,6 +192,19 @@ class MainApplication:
         self.match_threshold_var = tk.StringVar(value="0.7")
         ttk.Entry(params_frame, textvariable=self.match_threshold_var, width=10).grid(row=0, column=1, padx=5, pady=5)
         
+        # ORB/AKAZE trade some accuracy for much faster preview reconstructions
+        ttk.Label(params_frame, text="Feature Backend:").grid(row=1, column=0, padx=5, pady=5)
+        self.feature_backend_var = tk.StringVar(value="sift")
+        ttk.Combobox(params_frame, textvariable=self.feature_backend_var, values=["sift", "orb", "akaze"],
+                     state="readonly", width=8).grid(row=1, column=1, padx=5, pady=5)
+        
+        # Sparse modes (incremental, grid, turntable, pyramid) chain all views into one frame;
+        # dense and mvs add depth maps on those poses, hull carves the masked object's silhouettes
+        ttk.Label(params_frame, text="Reconstruction Mode:").grid(row=2, column=0, padx=5, pady=5)
+        self.recon_mode_var = tk.StringVar(value="pairwise")
+        ttk.Combobox(params_frame, textvariable=self.recon_mode_var, values=["pairwise", "incremental", "grid", "turntable", "pyramid", "dense", "mvs", "hull"],
+                     state="readonly", width=12).grid(row=2, column=1, padx=5, pady=5)
+        
         # Progress and status
         self.progress_var = tk.DoubleVar()
         self.progress_bar = ttk.Progressbar(self.reconstruction_frame, variable=self.progress_var)
@@ -445,8 +459,23 @@ class MainApplication:
                     else:
                         images.append(item)
                 
+                # Apply selected feature backend
+                if self.reconstructor.feature_backend != self.feature_backend_var.get():
+                    self.reconstructor.set_feature_backend(self.feature_backend_var.get())
+                
+                # Hull mode carves silhouettes; without a background shot, segment by border colour
+                mode = self.recon_mode_var.get()
+                temporary_masker = mode == "hull" and self.reconstructor.masker is None
+                if temporary_masker:
+                    self.reconstructor.masker = ForegroundMasker(method="color")
+                
                 # Perform reconstruction
-                self.point_cloud = self.reconstructor.reconstruct_from_images(images)
+                try:
+                    self.point_cloud = self.reconstructor.reconstruct_from_images(images, mode=mode)
+                finally:
+                    # Other modes keep detecting features on the full images
+                    if temporary_masker:
+                        self.reconstructor.masker = None
                 
                 # Get point count (handle both Open3D and fallback)
                 if hasattr(self.point_cloud, 'points'):
@@ -0,0 +1,72 @@
+"""
+Tests for feature and match storage.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.features import Features, Matches
+
+
+def _features():
+    rng = np.random.default_rng(0)
+    return Features(rng.uniform(0, 640, (200, 2)), rng.random((200, 128), dtype=np.float32))
+
+
+def test_features_round_trip(tmp_path):
+    features = _features()
+    path = str(tmp_path / "features.npz")
+    features.save(path)
+
+    loaded = Features.load(path)
+    assert len(loaded) == len(features)
+    assert loaded.points.dtype == np.float32
+    assert np.array_equal(loaded.points, features.points)
+    assert np.array_equal(loaded.descriptors, features.descriptors)
+
+
+def test_features_memory_mapped_load(tmp_path):
+    features = _features()
+    path = str(tmp_path / "features.npz")
+    features.save(path)
+
+    loaded = Features.load(path, mmap_mode='r')
+    assert isinstance(loaded.descriptors, np.memmap)
+    assert np.array_equal(loaded.points, features.points)
+    assert np.array_equal(loaded.descriptors, features.descriptors)
+
+
+def test_empty_features_round_trip(tmp_path):
+    path = str(tmp_path / "empty.npz")
+    Features(np.empty((0, 2)), None).save(path)
+
+    loaded = Features.load(path, mmap_mode='r')
+    assert len(loaded) == 0
+    assert loaded.descriptors.shape == (0, 0)
+
+
+def test_matches_round_trip(tmp_path):
+    matches = Matches(np.array([[0, 3], [1, 7], [4, 2]]), np.array([0.1, 0.5, 0.25]))
+    path = str(tmp_path / "matches.npz")
+    matches.save(path)
+
+    for mmap_mode in (None, 'r'):
+        loaded = Matches.load(path, mmap_mode=mmap_mode)
+        assert np.array_equal(loaded.query_idx, [0, 1, 4])
+        assert np.array_equal(loaded.train_idx, [3, 7, 2])
+        assert np.allclose(loaded.distances, matches.distances)
+
+
+def test_compressed_archive_cannot_be_memory_mapped(tmp_path):
+    path = str(tmp_path / "compressed.npz")
+    np.savez_compressed(path, pairs=np.zeros((4, 2), np.int32), distances=np.zeros(4, np.float32))
+
+    assert len(Matches.load(path)) == 4
+    with pytest.raises(ValueError):
+        Matches.load(path, mmap_mode='r')
@@ -0,0 +1,141 @@
+"""
+Tests for feature track merging and multi-view triangulation.
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.features import Matches
+from core.tracks import TrackBuilder
+from core.triangulation import triangulate_multiview
+
+K = np.array([[800.0, 0.0, 320.0], [0.0, 800.0, 240.0], [0.0, 0.0, 1.0]])
+
+
+def _matches(pairs):
+    return Matches(np.array(pairs), np.zeros(len(pairs)))
+
+
+def _tracks_as_sets(tracks):
+    return {tuple(zip(*(a.tolist() for a in tracks.track(i)))) for i in range(len(tracks))}
+
+
+def _cameras(count=4):
+    """Poses of cameras on an arc looking at the origin, and their projection matrices."""
+    poses = {}
+    for v in range(count):
+        angle = np.radians(10.0 * v)
+        R = np.array([[np.cos(angle), 0.0, -np.sin(angle)], [0.0, 1.0, 0.0],
+                      [np.sin(angle), 0.0, np.cos(angle)]])
+        poses[v] = (R, np.array([0.0, 0.0, 5.0]))
+    P = np.array([K @ np.hstack([R, t.reshape(3, 1)]) for R, t in poses.values()])
+    return poses, P
+
+
+def _project(P, points):
+    h = np.hstack([points, np.ones((len(points), 1))]) @ P.T
+    return h[:, :2] / h[:, 2:]
+
+
+def test_matches_merge_transitively():
+    builder = TrackBuilder()
+    for image in range(3):
+        builder.add_image(image, 5)
+    builder.add_matches(0, 1, _matches([[0, 1], [2, 3]]))
+    builder.add_matches(1, 2, _matches([[1, 4], [3, 0]]))
+    builder.add_matches(0, 2, _matches([[4, 2]]))
+
+    tracks = builder.build()
+    assert _tracks_as_sets(tracks) == {((0, 0), (1, 1), (2, 4)),
+                                       ((0, 2), (1, 3), (2, 0)),
+                                       ((0, 4), (2, 2))}
+    assert sorted(tracks.lengths.tolist()) == [2, 3, 3]
+
+
+def test_loop_closure_joins_tracks():
+    # 0-1 and 2-3 are separate tracks until a correspondence links images 1 and 2
+    builder = TrackBuilder()
+    for image in range(4):
+        builder.add_image(image, 3)
+    builder.add_matches(0, 1, _matches([[0, 0]]))
+    builder.add_matches(2, 3, _matches([[1, 1]]))
+    assert len(builder.build()) == 2
+
+    builder.add_correspondences(np.array([1]), np.array([0]), np.array([2]), np.array([1]))
+    tracks = builder.build()
+    assert _tracks_as_sets(tracks) == {((0, 0), (1, 0), (2, 1), (3, 1))}
+
+
+def test_inconsistent_tracks_are_dropped():
+    builder = TrackBuilder()
+    for image in range(3):
+        builder.add_image(image, 4)
+    builder.add_matches(0, 1, _matches([[0, 0], [1, 2]]))
+    # Keypoints 0 and 1 of image 2 both reach keypoint 0 of image 0
+    builder.add_matches(1, 2, _matches([[0, 0], [2, 3]]))
+    builder.add_matches(0, 2, _matches([[0, 1]]))
+
+    tracks = builder.build()
+    assert _tracks_as_sets(tracks) == {((0, 1), (1, 2), (2, 3))}
+
+
+def test_min_length_filters_short_tracks():
+    builder = TrackBuilder()
+    for image in range(3):
+        builder.add_image(image, 2)
+    builder.add_matches(0, 1, _matches([[0, 0], [1, 1]]))
+    builder.add_matches(1, 2, _matches([[0, 0]]))
+
+    assert _tracks_as_sets(builder.build(min_length=3)) == {((0, 0), (1, 0), (2, 0))}
+
+
+def test_triangulate_multiview_recovers_points():
+    rng = np.random.default_rng(0)
+    _, P = _cameras()
+    points = rng.uniform(-1.0, 1.0, (50, 3))
+
+    # Track i is seen by views i % 3 .. 3, so tracks have 2 to 4 observations
+    views = [np.arange(i % 3, 4) for i in range(len(points))]
+    offsets = np.concatenate([[0], np.cumsum([len(v) for v in views])])
+    points_2d = np.vstack([[_project(P[j], points[i:i + 1])[0] for j in v] for i, v in enumerate(views)])
+
+    estimated, errors, angles = triangulate_multiview(P, offsets, np.concatenate(views), points_2d)
+    assert np.allclose(estimated, points, atol=1e-6)
+    assert np.all(errors < 1e-6)
+    assert np.all(angles > 5.0)
+
+
+def test_triangulate_multiview_skips_single_observations():
+    _, P = _cameras()
+    points_2d = _project(P[0], np.array([[0.1, 0.2, 0.3]]))
+
+    points, errors, angles = triangulate_multiview(P, np.array([0, 1]), np.array([0]), points_2d)
+    assert np.all(np.isnan(points))
+    assert np.isinf(errors[0]) and angles[0] == 0.0
+
+
+def test_tracks_triangulate_ignores_unposed_images():
+    rng = np.random.default_rng(1)
+    poses, P = _cameras()
+    points = rng.uniform(-1.0, 1.0, (20, 3))
+    keypoints = {v: _project(P[v], points) for v in poses}
+
+    builder = TrackBuilder()
+    for v in poses:
+        builder.add_image(v, len(points))
+    for v in range(1, len(poses)):
+        builder.add_matches(v - 1, v, _matches(np.column_stack([np.arange(20), np.arange(20)])))
+    tracks = builder.build()
+
+    # Image 3 is left unposed; every track still has three posed elements
+    posed = {v: poses[v] for v in range(3)}
+    estimated, errors, _ = tracks.triangulate(K, posed, keypoints)
+    first = np.array([tracks.track(i)[1][0] for i in range(len(tracks))])
+    # Keypoints are stored as float32
+    assert np.allclose(estimated, points[first], atol=1e-4)
+    assert np.all(errors < 1e-3)
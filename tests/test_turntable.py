@@ -0,0 +1,77 @@
+"""
+Tests for the turntable motion model.
+"""
+
+import sys
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.turntable import TurntableModel
+
+
+def _look_at(center):
+    """World-to-camera pose of a camera at center looking at the origin."""
+    z = -center / np.linalg.norm(center)
+    x = np.cross(z, [0.0, 0.0, 1.0])
+    x /= np.linalg.norm(x)
+    R = np.stack([x, np.cross(z, x), z])
+    return R, (-R @ center).reshape(3, 1)
+
+
+def _turntable_poses(step, count=4, radius=5.0, height=1.5):
+    """Camera poses on a circle about the world z axis, every step radians."""
+    return [_look_at(np.array([radius * np.cos(step * i), radius * np.sin(step * i), height]))
+            for i in range(count)]
+
+
+def _relative_poses(poses, rng, rotation_noise=0.0, direction_noise=0.0):
+    """Consecutive relative poses with unit translations, optionally perturbed."""
+    relative = []
+    for (R1, t1), (R2, t2) in zip(poses[:-1], poses[1:]):
+        R = cv2.Rodrigues(rng.normal(0.0, rotation_noise, 3))[0] @ R2 @ R1.T
+        t = (t2 - R2 @ R1.T @ t1).ravel()
+        t = t / np.linalg.norm(t) + rng.normal(0.0, direction_noise, 3)
+        relative.append((R, t / np.linalg.norm(t)))
+    return relative
+
+
+@pytest.mark.parametrize("step_degrees", [2.0, 6.0, 12.0])
+def test_fit_recovers_axis_centre_and_step(step_degrees):
+    rng = np.random.default_rng(0)
+    step = np.radians(step_degrees)
+    poses = _turntable_poses(step)
+
+    for _ in range(20):
+        model = TurntableModel.fit(_relative_poses(poses, rng, np.radians(0.02), 0.002))
+
+        # Axis and centre in the first camera's frame
+        axis = poses[0][0] @ np.array([0.0, 0.0, 1.0])
+        center = poses[0][1].ravel() - (poses[0][1].ravel() @ axis) * axis
+        assert abs(model.axis @ axis) > np.cos(np.radians(2.0))
+        assert np.linalg.norm(model.center - center / np.linalg.norm(center)) < 0.05
+        assert abs(model.step - step) < np.radians(0.1)
+
+
+def test_fit_model_reproduces_relative_poses():
+    rng = np.random.default_rng(1)
+    relative = _relative_poses(_turntable_poses(np.radians(6.0)), rng)
+    model = TurntableModel.fit(relative)
+
+    R, t = model.relative_pose(0.0, model.step)
+    assert np.allclose(R, relative[0][0], atol=1e-6)
+    assert np.allclose(t.ravel() / np.linalg.norm(t), relative[0][1], atol=1e-6)
+
+
+def test_fit_rejects_non_turntable_motion():
+    rng = np.random.default_rng(2)
+    # Sideways translation with a turn: not a rotation about a fixed axis
+    relative = [(cv2.Rodrigues(np.array([0.0, np.radians(6.0), 0.0]))[0],
+                 np.array([0.0, 1.0, 0.0]) + rng.normal(0.0, 0.01, 3)) for _ in range(3)]
+    with pytest.raises(ValueError):
+        TurntableModel.fit(relative)